@@ -0,0 +1,14 @@
+"""
+bench — MESURES DE PERFORMANCE (BASE POSTGRESQL LOCALE UNIQUEMENT)
+
+✔ donnees.py   : école synthétique (élèves, paiements, dépenses, inscriptions)
+✔ run.py       : chronométrage des routes chaudes et des imports → rapport JSON
+✔ classeurs.py : classeurs Excel synthétiques (THZBD, INSC, DEPENSES) + données sales
+✔ imports.py   : débit lecture / chargement des importeurs (10k → 500k lignes)
+✔ demarrage.py : import de server_flask à froid (durée, RSS, modules lourds)
+✔ rendu.py     : coût de rendu des pages HTML (gabarit chaîne vs fichier)
+✔ charge.py    : test de charge dashboard + e-mails, gunicorn sync vs gthread
+✔ paiements.py : paiements concurrents au guichet (unicité, reçus, soldes)
+✔ sync.py      : synchro mobile complète / delta vs fiche par élève
+✔ reponses.py  : taille des réponses JSON (objets / colonnes, gzip / Brotli)
+"""
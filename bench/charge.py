@@ -0,0 +1,308 @@
+"""
+bench/charge.py — TEST DE CHARGE : DASHBOARD + E-MAILS (SYNC vs GTHREAD)
+
+Usage (depuis la racine du projet) :
+  python -m bench.charge [--modes sync,gthread] [--workers 2] [--threads 8]
+      [--clients 16] [--duree 20] [--part-mail 0.2] [--delai-smtp-ms 800]
+      [--sans-base] [--sortie rapport.json] [--comparer ancien_rapport.json]
+
+✔ gunicorn lancé avec gunicorn.conf.py pour chaque mode (même nombre
+  de workers ; gthread ajoute --threads par worker)
+✔ Serveur SMTP local simulé (latence --delai-smtp-ms par message) :
+  aucun e-mail réel n'est envoyé
+✔ Clients en boucle fermée : dashboard (/api/dashboard/finance, ou la
+  page /admin/dashboard/finance avec --sans-base) et /send_notification
+✔ Débit (requêtes/s) et latences par type de requête → rapport JSON
+
+Base requise pour /api/dashboard/finance (DATABASE_URL locale,
+préparée par bench.run) ; --sans-base : la page dashboard seule.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from bench.run import log, resume, commit_git, comparer
+
+MOT_DE_PASSE = "bench-charge"
+
+
+# ======================================================
+# SERVEUR SMTP SIMULÉ
+# ======================================================
+
+class _SessionSMTP(socketserver.StreamRequestHandler):
+    """
+    Juste assez de SMTP pour smtplib (EHLO, AUTH, MAIL, RCPT, DATA).
+    """
+
+    delai = 0.8
+
+    def repondre(self, ligne):
+        self.wfile.write(ligne.encode() + b"\r\n")
+
+    def handle(self):
+        self.repondre("220 bench ESMTP")
+        for brut in self.rfile:
+            commande = brut.decode(errors="replace").strip().upper()
+            if commande.startswith(("EHLO", "HELO")):
+                self.repondre("250-bench")
+                self.repondre("250 AUTH PLAIN LOGIN")
+            elif commande.startswith("AUTH"):
+                self.repondre("235 ok")
+            elif commande.startswith("DATA"):
+                self.repondre("354 fin par <CRLF>.<CRLF>")
+                for ligne in self.rfile:
+                    if ligne in (b".\r\n", b".\n"):
+                        break
+                time.sleep(self.delai)
+                self.repondre("250 ok")
+            elif commande.startswith("QUIT"):
+                self.repondre("221 bye")
+                return
+            else:
+                self.repondre("250 ok")
+
+
+def demarrer_smtp(delai):
+    gestionnaire = type("Session", (_SessionSMTP,), {"delai": delai})
+    serveur = socketserver.ThreadingTCPServer(("127.0.0.1", 0), gestionnaire)
+    serveur.daemon_threads = True
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur
+
+
+# ======================================================
+# GUNICORN
+# ======================================================
+
+def port_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def lancer_gunicorn(mode, workers, threads, port, port_smtp, journal):
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "postgresql://localhost:1/charge")
+    env.update({
+        "PORT": str(port),
+        "WEB_CONCURRENCY": str(workers),
+        "GUNICORN_WORKER_CLASS": mode,
+        "GUNICORN_THREADS": str(threads if mode == "gthread" else 1),
+        "ADMIN_PASSWORDS": MOT_DE_PASSE,
+        "MAIL_USERNAME": "bench@localhost",
+        "MAIL_PASSWORD": "bench",
+        "MAIL_SMTP_HOTE": "127.0.0.1",
+        "MAIL_SMTP_PORT": str(port_smtp),
+        "MAIL_SMTP_TLS": "0",
+    })
+    processus = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+         "server_flask:app"],
+        cwd=RACINE, env=env, stdout=journal, stderr=subprocess.STDOUT
+    )
+
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if processus.poll() is not None:
+            raise RuntimeError("❌ gunicorn s'est arrêté (voir le journal)")
+        try:
+            if requete(port, "GET", "/api/ping")[0] == 200:
+                return processus
+        except OSError:
+            time.sleep(0.2)
+    processus.kill()
+    raise RuntimeError("❌ gunicorn ne répond pas")
+
+
+def arreter(processus):
+    processus.terminate()
+    try:
+        processus.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        processus.kill()
+
+
+# ======================================================
+# CLIENTS
+# ======================================================
+
+def requete(port, methode, chemin, corps=None, entetes=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    try:
+        conn.request(methode, chemin, body=corps, headers=entetes or {})
+        r = conn.getresponse()
+        r.read()
+        return r.status, r.getheader("Set-Cookie")
+    finally:
+        conn.close()
+
+
+def session_admin(port):
+    statut, cookie = requete(
+        port, "POST", "/admin/login",
+        corps=f"password={MOT_DE_PASSE}",
+        entetes={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    if statut != 302 or not cookie:
+        raise RuntimeError(f"❌ Connexion admin impossible ({statut})")
+    return cookie.split(";", 1)[0]
+
+
+def charger(port, clients, duree, part_mail, route_dashboard, graine):
+    cookie = session_admin(port)
+    mail = json.dumps({
+        "to": "parent@bench.invalid",
+        "subject": "Test de charge",
+        "message": "Message généré par bench.charge",
+    })
+
+    mesures = []
+    verrou = threading.Lock()
+    fin = time.monotonic() + duree
+
+    def client(n):
+        rng = random.Random(graine + n)
+        locales = []
+        while time.monotonic() < fin:
+            if rng.random() < part_mail:
+                type_, args = "mail", ("POST", "/send_notification", mail, {
+                    "Content-Type": "application/json", "Cookie": cookie})
+            else:
+                type_, args = "dashboard", ("GET", route_dashboard, None, {
+                    "Cookie": cookie})
+            t0 = time.perf_counter()
+            try:
+                statut = requete(port, *args)[0]
+            except OSError:
+                statut = None
+            locales.append((type_, time.perf_counter() - t0, statut))
+        with verrou:
+            mesures.extend(locales)
+
+    fils = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    t0 = time.perf_counter()
+    for f in fils:
+        f.start()
+    for f in fils:
+        f.join()
+    return mesures, time.perf_counter() - t0
+
+
+# ======================================================
+# MAIN
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", default="sync,gthread")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duree", type=float, default=20)
+    parser.add_argument("--part-mail", type=float, default=0.2)
+    parser.add_argument("--delai-smtp-ms", type=float, default=800)
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--sans-base", action="store_true")
+    parser.add_argument("--sortie")
+    parser.add_argument("--comparer")
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL", "")
+    if not args.sans_base and not url:
+        raise RuntimeError("❌ DATABASE_URL non définie (ou --sans-base)")
+    if "render.com" in url:
+        raise RuntimeError("❌ Benchmark interdit sur la base de production")
+
+    route_dashboard = (
+        "/admin/dashboard/finance" if args.sans_base else "/api/dashboard/finance"
+    )
+    smtp = demarrer_smtp(args.delai_smtp_ms / 1000)
+    dossier = os.path.join(RACINE, "bench", "resultats")
+    os.makedirs(dossier, exist_ok=True)
+
+    resultats = {}
+    try:
+        for mode in [m.strip() for m in args.modes.split(",")]:
+            port = port_libre()
+            nom_journal = os.path.join(dossier, f"gunicorn_{mode}.log")
+            with open(nom_journal, "w") as journal:
+                log(f"{mode} : {args.workers} workers"
+                    + (f" × {args.threads} threads" if mode == "gthread" else "")
+                    + f", {args.clients} clients, {args.duree:.0f} s")
+                processus = lancer_gunicorn(
+                    mode, args.workers, args.threads, port,
+                    smtp.server_address[1], journal
+                )
+                try:
+                    mesures, ecoule = charger(
+                        port, args.clients, args.duree, args.part_mail,
+                        route_dashboard, args.graine
+                    )
+                finally:
+                    arreter(processus)
+
+            for type_ in ("dashboard", "mail"):
+                serie = [m for m in mesures if m[0] == type_]
+                if not serie:
+                    continue
+                r = resume([d for _, d, _ in serie])
+                r["debit_rps"] = round(len(serie) / ecoule, 1)
+                r["erreurs"] = sum(1 for *_, s in serie if s != 200)
+                resultats[f"{mode} {type_}"] = r
+                log(f"  {type_:<10} {r['debit_rps']:>7} req/s   "
+                    f"médiane {r['mediane_ms']:>8} ms   p95 {r['p95_ms']:>8} ms   "
+                    f"erreurs {r['erreurs']}")
+            log(f"  total      {len(mesures) / ecoule:>7.1f} req/s")
+    finally:
+        smtp.shutdown()
+
+    rapport = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_git(),
+            "python": platform.python_version(),
+            "workers": args.workers,
+            "threads": args.threads,
+            "clients": args.clients,
+            "duree_s": args.duree,
+            "part_mail": args.part_mail,
+            "delai_smtp_ms": args.delai_smtp_ms,
+            "route_dashboard": route_dashboard,
+        },
+        "charge": resultats,
+    }
+
+    sortie = args.sortie or os.path.join(
+        dossier, f"charge_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+    log(f"✅ Rapport : {sortie}")
+
+    lentes = 0
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            lentes = comparer(json.load(f), rapport)
+
+    sys.exit(1 if lentes else 0)
+
+
+if __name__ == "__main__":
+    main()
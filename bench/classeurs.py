@@ -0,0 +1,347 @@
+"""
+bench/classeurs.py — CLASSEURS EXCEL SYNTHÉTIQUES (IMPORTS)
+
+✔ THZBD (import_excel_pg)       : en-têtes ligne 8, colonne A
+✔ INSC (import_inscription_pg)  : en-têtes ligne 8, colonne B
+✔ DEPENSES (import_depenses_2026_pg) : Feuil1, ligne 13, colonnes C → Q
+✔ Taille arbitraire (écriture openpyxl write_only, en flux)
+✔ Taux contrôlés de données sales :
+  dates invalides, dates texte, virgules décimales,
+  espaces insécables, matricules invalides
+✔ Retourne les volumes ATTENDUS après lecture par l'importeur
+
+Usage :
+  python -m bench.classeurs thzbd 100000 THZBD2526GA.xlsx
+  python -m bench.classeurs depenses 10000 DEPENSES_2026.xlsx --taux dates_invalides=0.01
+"""
+
+import argparse
+import math
+import random
+from datetime import datetime
+
+from openpyxl import Workbook
+
+from metier import CLASSES_VALIDES
+from tarifs_fip import TARIFS_FIP_DEFAUT
+from bench.donnees import (
+    MOIS_CALENDRIER, section_de_classe, classe_brute, mois_brut,
+    date_du_mois, jours_ouvrables,
+)
+
+# ======================================================
+# MISES EN PAGE (MIROIR DES IMPORTEURS)
+# ======================================================
+
+HEADER_LINE = 8          # THZBD + INSC
+START_ROW_DEPENSES = 13  # DEPENSES (Feuil1)
+
+# Même ordre que import_excel_pg.REQUIRED_COLS
+COLONNES_THZBD = [
+    "Matricule", "Nom", "Sexe", "Classe", "Categorie", "Section",
+    "Telephone", "Email", "NumRecu", "Mois",
+    "FIP", "FF", "Obs", "Jour", "DatePaiement", "AnneeScolaire"
+]
+
+# Même ordre que import_inscription_pg.REQUIRED_COLS
+COLONNES_INSC = [
+    "Num", "Matricule", "NumRecu", "Telephone", "Sexe", "Categorie",
+    "Nom", "Classe", "Finsc", "Jour", "Mois", "DateInsc",
+    "Adresse", "Obs", "LieuDnss", "Respo", "AnneeScolaire",
+    "Section", "Email"
+]
+
+TAUX_DEFAUT = {
+    "dates_invalides": 0.0,       # bloque THZBD et INSC (comportement voulu)
+    "dates_texte": 0.10,          # « 06/11/2025 » au lieu d'une date Excel
+    "virgules": 0.05,             # « 27,5 »
+    "espaces_insecables": 0.05,   # « PL00012\xa0 », « 1\xa0250,00 »
+    "matricules_invalides": 0.0,  # ignorées (THZBD) / bloquantes (INSC)
+}
+
+NBSP = "\u00a0"
+
+
+def _entete(ws, nb_lignes_vides, titre):
+    ws.append([titre])
+    for _ in range(nb_lignes_vides - 1):
+        ws.append([])
+
+
+class _Salete:
+    """
+    Tirages de données sales + comptage par type.
+    """
+
+    def __init__(self, taux, graine):
+        self.taux = {**TAUX_DEFAUT, **(taux or {})}
+        inconnus = set(self.taux) - set(TAUX_DEFAUT)
+        if inconnus:
+            raise ValueError(f"Taux inconnu(s) : {sorted(inconnus)}")
+        self.rng = random.Random(graine)
+        self.compte = {k: 0 for k in TAUX_DEFAUT}
+        self.date_invalide = False
+
+    def tirer(self, nom):
+        if self.rng.random() < self.taux[nom]:
+            self.compte[nom] += 1
+            return True
+        return False
+
+    def date(self, d, fmt="%d/%m/%Y"):
+        self.date_invalide = self.tirer("dates_invalides")
+        if self.date_invalide:
+            return self.rng.choice(["31/02/2026", "??", "2025-13-45"])
+        if self.tirer("dates_texte"):
+            return d.strftime(fmt)
+        return datetime(d.year, d.month, d.day)
+
+    def montant(self, v):
+        if self.tirer("espaces_insecables"):
+            return f"{v:,.2f}".replace(",", NBSP).replace(".", ",")
+        if self.tirer("virgules"):
+            return f"{v:.2f}".replace(".", ",")
+        return v
+
+    def texte(self, s):
+        if s and self.tirer("espaces_insecables"):
+            return s + NBSP
+        return s
+
+    def matricule(self, m):
+        if self.tirer("matricules_invalides"):
+            return self.rng.choice([m.replace("PL", "PX"), m[2:], "N/A"])
+        return self.texte(m)
+
+
+# ======================================================
+# THZBD (PAIEMENTS)
+# ======================================================
+
+def ecrire_thzbd(chemin, nb_lignes, annee="2025-2026", taux=None, graine=2526):
+    """
+    nb_lignes paiements (≈ 10 par élève).
+    Retourne les volumes attendus après charger_excel_strict().
+    """
+    sale = _Salete(taux, graine)
+    rng = sale.rng
+    classes = sorted(CLASSES_VALIDES)
+    mois_scolaires = list(MOIS_CALENDRIER)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("THZBD")
+    _entete(ws, HEADER_LINE - 1, "COMPLEXE SCOLAIRE THZ — PAIEMENTS")
+    ws.append(COLONNES_THZBD)
+
+    matricules_ignores = 0
+
+    for i in range(nb_lignes):
+        num_eleve = i // 10 + 1
+        classe = classes[num_eleve % len(classes)]
+        section = section_de_classe(classe)
+        mois = mois_scolaires[i % 10]
+        d = date_du_mois(annee, mois, rng)
+        fip = TARIFS_FIP_DEFAUT.get(classe, 40)
+
+        matricule = sale.matricule(
+            f"{'LT' if section == 'SEC' else 'PL'}{num_eleve:06d}"
+        )
+        if not matricule.strip().startswith(("PL", "LT")):
+            matricules_ignores += 1
+
+        ws.append([
+            matricule,
+            sale.texte(f"ELEVE {num_eleve:06d}"),
+            "M" if num_eleve % 2 else "F",
+            classe_brute(classe, rng),
+            "PY",
+            section,
+            f"08{num_eleve:08d}",
+            None,
+            f"R{i + 1:07d}",
+            mois_brut(mois, rng, rng.choice([None, None, ["Ac."], ["Sld."]])),
+            sale.montant(fip),
+            0,
+            None,
+            d.day,
+            sale.date(d),
+            annee,
+        ])
+
+    wb.save(chemin)
+
+    return {
+        "lignes": nb_lignes,
+        "attendues": nb_lignes - matricules_ignores,
+        "bloque": sale.compte["dates_invalides"] > 0,
+        "sales": sale.compte,
+    }
+
+
+# ======================================================
+# INSC (INSCRIPTIONS)
+# ======================================================
+
+def ecrire_insc(chemin, nb_lignes, annee="2025-2026", taux=None, graine=2526):
+    """
+    nb_lignes inscriptions (1 par élève, colonne A vide).
+    Retourne les volumes attendus après charger_excel().
+    """
+    sale = _Salete(taux, graine)
+    rng = sale.rng
+    classes = sorted(CLASSES_VALIDES)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("INSC")
+    _entete(ws, HEADER_LINE - 1, "COMPLEXE SCOLAIRE THZ — INSCRIPTIONS")
+    ws.append([None, *COLONNES_INSC])
+
+    for i in range(nb_lignes):
+        num = i + 1
+        classe = classes[num % len(classes)]
+        section = section_de_classe(classe)
+        d = datetime(int(annee[:4]), rng.choice([8, 9]), rng.randint(1, 28))
+
+        ws.append([
+            None,
+            num,
+            sale.matricule(f"{'LT' if section == 'SEC' else 'PL'}{num:06d}"),
+            f"I{num:07d}",
+            f"08{num:08d}",
+            "M" if num % 2 else "F",
+            rng.choice(["PY", "Payant", "NP", "AB"]),
+            sale.texte(f"ELEVE {num:06d}"),
+            classe_brute(classe, rng),
+            sale.montant(10),
+            d.day,
+            d.month,
+            sale.date(d, rng.choice(["%d/%m/%Y", "%Y-%m-%d"])),
+            "Lubumbashi",
+            None,
+            "Lubumbashi",
+            "RESPONSABLE",
+            annee,
+            rng.choice([section, section.lower(), {"MAT": "Maternelle",
+                        "PRM": "Primaire", "SEC": "Secondaire"}[section]]),
+            # Dernière colonne toujours remplie : un classeur write_only
+            # n'a pas de dimension, la lecture read_only couperait la ligne
+            f"eleve{num:06d}@exemple.cd",
+        ])
+
+    wb.save(chemin)
+
+    bloquantes = sale.compte["dates_invalides"] + sale.compte["matricules_invalides"]
+    return {
+        "lignes": nb_lignes,
+        "attendues": nb_lignes,
+        "bloque": bloquantes > 0,
+        "sales": sale.compte,
+    }
+
+
+# ======================================================
+# DEPENSES (CAISSE + DÉPENSES)
+# ======================================================
+
+def ligne_depenses(ref, d, caisse, libelle, montant, banque, annee,
+                   lb_obs=None, tt_obs=None):
+    """
+    Une ligne Feuil1 (colonnes A → Q) au format DEPENSES_2026.xlsx.
+    caisse : [report, bloc1, bloc2, bus1, bus2] ou None (ligne suivante
+    d'un même jour : la caisse n'est lue qu'une fois par date).
+    """
+    return [
+        None, None, ref, d,
+        *(caisse or [None] * 5),
+        None, libelle, montant, banque, None,
+        lb_obs, tt_obs, annee
+    ]
+
+
+def ecrire_depenses(chemin, nb_lignes, annee="2025-2026", taux=None, graine=2526):
+    """
+    nb_lignes dépenses réparties sur les jours ouvrables de l'année.
+    Retourne les volumes attendus après lecture par le script d'import.
+    """
+    sale = _Salete(taux, graine)
+    rng = sale.rng
+
+    jours = list(jours_ouvrables(annee, 10))
+    par_jour = max(1, math.ceil(nb_lignes / len(jours)))
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Feuil1")
+    _entete(ws, START_ROW_DEPENSES - 1, "COMPLEXE SCOLAIRE THZ — CAISSE ET DÉPENSES")
+
+    dates_valides = set()
+    depenses_valides = 0
+
+    for i in range(nb_lignes):
+        d = jours[min(i // par_jour, len(jours) - 1)]
+        premiere = i % par_jour == 0
+
+        cellule_date = sale.date(d)
+        if not sale.date_invalide:
+            dates_valides.add(d)
+            depenses_valides += 1
+
+        caisse = None
+        if premiere or rng.random() < 0.1:
+            caisse = [sale.montant(round(rng.uniform(20, 300), 2)) for _ in range(5)]
+
+        ws.append(ligne_depenses(
+            f"DP{i + 1:07d}", cellule_date, caisse,
+            sale.texte("Carburant bus"),
+            sale.montant(round(rng.uniform(5, 250), 2)),
+            0, annee
+        ))
+
+    wb.save(chemin)
+
+    return {
+        "lignes": nb_lignes,
+        "attendues": depenses_valides,
+        "jours": len(dates_valides),
+        "bloque": False,
+        "sales": sale.compte,
+    }
+
+
+ECRIVAINS = {
+    "thzbd": ecrire_thzbd,
+    "insc": ecrire_insc,
+    "depenses": ecrire_depenses,
+}
+
+
+def lire_taux(valeurs):
+    """
+    ["virgules=0.1", "dates_invalides=0"] → {"virgules": 0.1, …}
+    """
+    taux = {}
+    for v in valeurs or []:
+        nom, _, valeur = v.partition("=")
+        taux[nom.strip()] = float(valeur)
+    return taux
+
+
+# ======================================================
+# MAIN
+# ======================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classeur Excel synthétique")
+    parser.add_argument("type", choices=sorted(ECRIVAINS))
+    parser.add_argument("lignes", type=int)
+    parser.add_argument("fichier")
+    parser.add_argument("--annee", default="2025-2026")
+    parser.add_argument("--graine", type=int, default=2526)
+    parser.add_argument("--taux", nargs="*", metavar="NOM=VALEUR",
+                        help=f"parmi {', '.join(TAUX_DEFAUT)}")
+    args = parser.parse_args()
+
+    volumes = ECRIVAINS[args.type](
+        args.fichier, args.lignes, args.annee,
+        taux=lire_taux(args.taux), graine=args.graine
+    )
+    print(f"✅ {args.fichier} : {volumes}")
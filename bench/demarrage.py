@@ -0,0 +1,123 @@
+"""
+bench/demarrage.py — DÉMARRAGE À FROID D'UN WORKER (IMPORT + MÉMOIRE)
+
+Usage (depuis la racine du projet) :
+  python -m bench.demarrage [--runs 7] [--module server_flask]
+      [--sortie rapport.json] [--comparer ancien_rapport.json]
+
+✔ Processus neuf à chaque run : `import server_flask` chronométré
+✔ RSS du processus après import (VmRSS, /proc ; sinon ru_maxrss)
+✔ Modules lourds chargés à l'import (reportlab, openpyxl, smtplib…)
+✔ Rapport JSON comparable (--comparer)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from bench.run import log, commit_git
+
+MODULES_LOURDS = ("reportlab", "openpyxl", "smtplib", "import_excel_pg",
+                  "import_inscription_pg", "mail_service")
+
+# Exécuté dans le processus mesuré
+_SONDE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+duree = time.perf_counter() - t0
+
+rss_ko = None
+try:
+    with open("/proc/self/status") as f:
+        for ligne in f:
+            if ligne.startswith("VmRSS:"):
+                rss_ko = int(ligne.split()[1])
+except OSError:
+    import resource
+    rss_ko = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+print(json.dumps({{
+    "import_ms": duree * 1000,
+    "rss_mo": rss_ko / 1024 if rss_ko else None,
+    "modules": len(sys.modules),
+    "lourds": sorted(m for m in {lourds!r} if m in sys.modules),
+}}))
+"""
+
+
+def mesurer(module, runs):
+    env = dict(os.environ)
+    # Base injoignable par défaut : mesure du code, pas du réseau
+    env.setdefault("DATABASE_URL", "postgresql://localhost:1/demarrage")
+
+    mesures = []
+    for _ in range(runs):
+        r = subprocess.run(
+            [sys.executable, "-c", _SONDE.format(module=module, lourds=MODULES_LOURDS)],
+            cwd=RACINE, env=env, capture_output=True, text=True
+        )
+        if r.returncode != 0:
+            raise RuntimeError(f"❌ Import impossible :\n{r.stderr[-2000:]}")
+        mesures.append(json.loads(r.stdout.strip().splitlines()[-1]))
+    return mesures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="server_flask")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--sortie")
+    parser.add_argument("--comparer")
+    args = parser.parse_args()
+
+    mesures = mesurer(args.module, args.runs)
+
+    rapport = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_git(),
+            "python": sys.version.split()[0],
+            "module": args.module,
+            "runs": args.runs,
+        },
+        "demarrage": {
+            "import_ms_mediane": round(statistics.median(m["import_ms"] for m in mesures), 1),
+            "import_ms_min": round(min(m["import_ms"] for m in mesures), 1),
+            "rss_mo_mediane": round(statistics.median(m["rss_mo"] for m in mesures), 1),
+            "modules": mesures[-1]["modules"],
+            "lourds_charges": mesures[-1]["lourds"],
+        },
+    }
+
+    d = rapport["demarrage"]
+    log(f"import {args.module} : {d['import_ms_mediane']} ms (min {d['import_ms_min']}) "
+        f"— RSS {d['rss_mo_mediane']} Mo — {d['modules']} modules")
+    log(f"modules lourds chargés : {', '.join(d['lourds_charges']) or 'aucun'}")
+
+    sortie = args.sortie or os.path.join(
+        RACINE, "bench", "resultats", f"demarrage_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+    log(f"✅ Rapport : {sortie}")
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            avant = json.load(f)["demarrage"]
+        for cle in ("import_ms_mediane", "rss_mo_mediane", "modules"):
+            log(f"  {cle:<18} {avant[cle]:>8} → {d[cle]:>8}  "
+                f"({(d[cle] - avant[cle]) / avant[cle] * 100:+.0f} %)")
+
+
+if __name__ == "__main__":
+    main()
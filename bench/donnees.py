@@ -0,0 +1,330 @@
+"""
+bench/donnees.py — ÉCOLE SYNTHÉTIQUE (BENCHMARKS)
+
+✔ N élèves par classe sur toute la liste metier.CLASSES_VALIDES
+✔ Classes saisies « comme à la caisse » (1°P, 3░Sc, 1 P…)
+✔ Paiements mensuels avec mois bruts (Ac.Sept, Sld Oct, sept.…)
+✔ Caisse journalière + dépenses par jour ouvrable
+✔ Inscriptions (1 par élève)
+✔ Génération déterministe (graine) → runs comparables
+✔ Chargement par COPY dans une base PostgreSQL LOCALE
+"""
+
+import random
+from datetime import date, timedelta
+
+from metier import CLASSES_VALIDES, categorie_depense
+from schema_annee import assurer_partitions
+from data_version import DOMAINES, init_data_version, bump_version
+
+# ======================================================
+# PARAMÈTRES
+# ======================================================
+
+PARAMETRES_DEFAUT = {
+    "eleves_par_classe": 30,
+    "nb_mois": 10,              # Sept → Juin
+    "taux_paiement": 0.85,      # probabilité qu'un mois soit payé
+    "taux_acompte": 0.25,       # mois payés en 2 fois (Ac. + Sld.)
+    "depenses_par_jour": 4,     # moyenne
+    "graine": 2526,
+}
+
+# Mois scolaires → mois calendaires
+MOIS_CALENDRIER = {
+    "Sept": 9, "Oct": 10, "Nov": 11, "Dec": 12, "Janv": 1,
+    "Fevr": 2, "Mars": 3, "Avr": 4, "Mai": 5, "Juin": 6,
+}
+
+# Variantes réellement rencontrées dans les fichiers Excel
+_VARIANTES_MOIS = {
+    "Sept": ["Sept", "sept.", "SEPT", "Sept."],
+    "Oct": ["Oct", "oct.", "OCT"],
+    "Nov": ["Nov", "nov.", "NOV"],
+    "Dec": ["Dec", "dec.", "DEC", "Dec."],
+    "Janv": ["Janv", "janv.", "JANV"],
+    "Fevr": ["Fevr", "févr.", "Fev", "FEV"],
+    "Mars": ["Mars", "mars", "MARS"],
+    "Avr": ["Avr", "avr.", "AVR"],
+    "Mai": ["Mai", "mai", "MAI"],
+    "Juin": ["Juin", "juin", "JUIN"],
+}
+_PREFIXES_ACOMPTE = ["Ac.", "Ac-", "AC. ", "ac."]
+_PREFIXES_SOLDE = ["Sld.", "Sld ", "SLD-", "sld."]
+
+_JOURS = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+
+_NOMS = [
+    "KABILA", "MUKENDI", "TSHIBANDA", "ILUNGA", "KASONGO", "MBUYI",
+    "KALALA", "NGOY", "MWAMBA", "KAPINGA", "LUMBU", "BANZA", "KYUNGU",
+]
+_PRENOMS = [
+    "Grace", "Josué", "Merveille", "Daniel", "Esther", "Patrick",
+    "Ruth", "Christian", "Divine", "Samuel", "Ornella", "Jonathan",
+]
+
+_LIBELLES_DEPENSE = [
+    "Carburant bus", "Fournitures bureau", "Entretien bâtiment",
+    "Électricité", "Eau", "Prime enseignant", "Craies et marqueurs",
+    "Frais bancaires", "Réparation bus", "Transport administratif",
+]
+
+
+# ======================================================
+# OUTILS
+# ======================================================
+
+def section_de_classe(classe):
+    """
+    Section officielle (MAT / PRM / SEC) d'une classe canonique.
+    """
+    if classe.endswith("M") and classe[:-1].isdigit():
+        return "MAT"
+    if classe.endswith("P") and classe[:-1].isdigit():
+        return "PRM"
+    return "SEC"
+
+
+def classe_brute(classe, rng):
+    """
+    Classe telle que saisie dans les fichiers (1°P, 1░P, 1 P, 3°Sc…).
+    """
+    niveau = classe.rstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    suite = classe[len(niveau):]
+    return rng.choice([
+        classe,
+        f"{niveau}°{suite}",
+        f"{niveau}░{suite}",
+        f"{niveau} {suite}",
+        f"{niveau}°{suite.capitalize()}",
+    ])
+
+
+def mois_brut(mois, rng, prefixes=None):
+    variante = rng.choice(_VARIANTES_MOIS[mois])
+    if prefixes:
+        return rng.choice(prefixes) + variante
+    return variante
+
+
+def date_du_mois(annee, mois, rng):
+    """
+    Date de paiement plausible dans le mois scolaire de l'année donnée.
+    Septembre commence le 06 (règle annee_scolaire_from_date).
+    """
+    debut, fin = (int(a) for a in annee.split("-"))
+    m = MOIS_CALENDRIER[mois]
+    an = debut if m >= 9 else fin
+    return date(an, m, rng.randint(6 if m == 9 else 1, 28))
+
+
+def jours_ouvrables(annee, nb_mois):
+    """
+    Jours du lundi au vendredi, du 06 septembre à la fin du dernier mois.
+    """
+    debut = date(int(annee[:4]), 9, 6)
+    dernier_mois = list(MOIS_CALENDRIER)[nb_mois - 1]
+    m = MOIS_CALENDRIER[dernier_mois]
+    an = debut.year if m >= 9 else debut.year + 1
+    fin = (date(an + (m == 12), m % 12 + 1, 1)) - timedelta(days=1)
+
+    d = debut
+    while d <= fin:
+        if d.weekday() < 5:
+            yield d
+        d += timedelta(days=1)
+
+
+# ======================================================
+# GÉNÉRATION
+# ======================================================
+
+def generer_ecole(annee, tarifs, **parametres):
+    """
+    Génère une école complète pour une année scolaire.
+
+    tarifs : {classe: FIP mensuel} (tarifs_fip.charger_tarifs).
+    Retourne un dict de listes de tuples, dans l'ordre des colonnes
+    des tables (eleves, paiements, inscriptions, caisse, depenses).
+    """
+    p = {**PARAMETRES_DEFAUT, **parametres}
+    rng = random.Random(p["graine"])
+
+    mois_scolaires = list(MOIS_CALENDRIER)[:p["nb_mois"]]
+
+    eleves = []
+    paiements = []
+    inscriptions = []
+    num_recu = 0
+
+    for classe in sorted(CLASSES_VALIDES):
+        section = section_de_classe(classe)
+        prefixe = "LT" if section == "SEC" else "PL"
+        fip = tarifs.get(classe, 40)
+
+        for _ in range(p["eleves_par_classe"]):
+            num = len(eleves) + 1
+            matricule = f"{prefixe}{num:05d}"
+            nom = f"{rng.choice(_NOMS)} {rng.choice(_NOMS)} {rng.choice(_PRENOMS)}"
+            sexe = rng.choice("MF")
+            categorie = rng.choices(["PY", "NPY", "ABD"], [90, 8, 2])[0]
+            telephone = f"08{rng.randint(10000000, 99999999)}"
+            email = f"{matricule.lower()}@exemple.cd" if rng.random() < 0.3 else None
+
+            eleves.append((
+                matricule, nom, sexe, classe_brute(classe, rng),
+                categorie, section, telephone, email
+            ))
+
+            # ---------- INSCRIPTION ----------
+            num_recu += 1
+            d_insc = date(int(annee[:4]), rng.choice([8, 9]), rng.randint(1, 28))
+            inscriptions.append((
+                num, matricule, f"I{num_recu:07d}", telephone, sexe,
+                categorie, nom, classe, 10, d_insc.day, d_insc.month,
+                d_insc, "Lubumbashi", None, "Lubumbashi",
+                f"{rng.choice(_PRENOMS)} {rng.choice(_NOMS)}",
+                annee, section, email
+            ))
+
+            # ---------- PAIEMENTS ----------
+            for mois in mois_scolaires:
+                if rng.random() > p["taux_paiement"]:
+                    continue
+
+                if rng.random() < p["taux_acompte"]:
+                    acompte = round(fip * rng.choice([0.25, 0.5, 0.75]), 2)
+                    tranches = [
+                        (_PREFIXES_ACOMPTE, acompte),
+                        (_PREFIXES_SOLDE, round(fip - acompte, 2)),
+                    ]
+                else:
+                    tranches = [(None, fip)]
+
+                for prefixes, montant in tranches:
+                    num_recu += 1
+                    d = date_du_mois(annee, mois, rng)
+                    paiements.append((
+                        matricule, f"R{num_recu:07d}",
+                        mois_brut(mois, rng, prefixes),
+                        montant, 0, None, _JOURS[d.weekday()], d, annee
+                    ))
+
+    # ---------- CAISSE + DÉPENSES ----------
+    caisse = []
+    depenses = []
+    report = 0.0
+
+    for i, d in enumerate(jours_ouvrables(annee, p["nb_mois"])):
+        blocs = [round(rng.uniform(20, 300), 2) for _ in range(4)]
+        caisse.append((d, report, *blocs, annee))
+
+        sorties = 0.0
+        for j in range(rng.randint(0, 2 * p["depenses_par_jour"])):
+            montant = round(rng.uniform(5, 250), 2)
+            banque = round(rng.uniform(0, 100), 2) if rng.random() < 0.2 else 0
+            libelle = rng.choice(_LIBELLES_DEPENSE)
+            depenses.append((
+                f"DP{i:04d}-{j:02d}", d, libelle,
+                montant, banque, annee, categorie_depense(libelle)
+            ))
+            sorties += montant + banque
+
+        report = round(max(report + sum(blocs) - sorties, 0), 2)
+
+    return {
+        "eleves": eleves,
+        "paiements": paiements,
+        "inscriptions": inscriptions,
+        "caisse": caisse,
+        "depenses": depenses,
+    }
+
+
+# ======================================================
+# CHARGEMENT (COPY)
+# ======================================================
+
+COLONNES_INSCRIPTION = (
+    "num, matricule, numrecu, telephone, sexe, categorie, nom, classe, "
+    "finsc, jour, mois, dateinsc, adresse, obs, lieudnss, respo, "
+    "annee_scolaire, section, email"
+)
+
+
+def vider_tables(conn):
+    """
+    ⚠️ Vide toutes les tables métier (base de benchmark uniquement).
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            TRUNCATE eleves, paiements, inscription, depense,
+                     caisse_journaliere, observation
+            RESTART IDENTITY CASCADE
+        """)
+    conn.commit()
+
+
+def charger_ecole(conn, ecole, annee):
+    """
+    Charge l'école générée après avoir VIDÉ les tables métier.
+    Le schéma doit être à jour (migrations.appliquer).
+    Retourne le nombre de lignes par table.
+    """
+    init_data_version(conn)
+    vider_tables(conn)
+    for table in ("paiements", "depense", "caisse_journaliere"):
+        assurer_partitions(conn, table, {annee})
+
+    with conn.cursor() as cur:
+
+        with cur.copy("""
+            COPY eleves (matricule, nom, sexe, classe,
+                         categorie, section, telephone, email)
+            FROM STDIN
+        """) as copy:
+            for r in ecole["eleves"]:
+                copy.write_row(r)
+
+        cur.execute("SELECT matricule, id FROM eleves")
+        ids = dict(cur.fetchall())
+
+        with cur.copy("""
+            COPY paiements (eleve_id, numrecu, mois, fip, ff,
+                            obs, jour, datepaiement, annee_scolaire)
+            FROM STDIN
+        """) as copy:
+            for matricule, *reste in ecole["paiements"]:
+                copy.write_row((ids[matricule], *reste))
+
+        with cur.copy(
+            f"COPY inscription ({COLONNES_INSCRIPTION}) FROM STDIN"
+        ) as copy:
+            for r in ecole["inscriptions"]:
+                copy.write_row(r)
+
+        with cur.copy("""
+            COPY caisse_journaliere (date_operation, report, bloc1, bloc2,
+                                     bus1, bus2, annee_scolaire)
+            FROM STDIN
+        """) as copy:
+            for r in ecole["caisse"]:
+                copy.write_row(r)
+
+        with cur.copy("""
+            COPY depense (ref_dp, date_depense, libelle, montant,
+                          banque, annee_scolaire, categorie)
+            FROM STDIN
+        """) as copy:
+            for r in ecole["depenses"]:
+                copy.write_row(r)
+
+        bump_version(conn, *DOMAINES)
+
+    conn.commit()
+
+    with conn.cursor() as cur:
+        cur.execute("ANALYZE")
+    conn.commit()
+
+    return {table: len(lignes) for table, lignes in ecole.items()}
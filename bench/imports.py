@@ -0,0 +1,241 @@
+"""
+bench/imports.py — DÉBIT DES IMPORTEURS (LECTURE + CHARGEMENT)
+
+Usage (depuis la racine du projet) :
+  DATABASE_URL=postgresql://localhost/thz_bench python -m bench.imports
+      [--tailles 10000,100000,500000] [--types thzbd,insc,depenses]
+      [--taux virgules=0.1 ...] [--repetitions 1] [--sans-base]
+      [--sortie rapport.json] [--comparer ancien_rapport.json]
+
+✔ Classeurs générés par bench.classeurs (hors chronométrage)
+✔ Lecture : charger_excel_strict() / charger_excel() / lire_excel() (sans base)
+✔ Chargement : inserer_donnees() / inserer_donnees_copy() / inserer()
+✔ Contrôle de non-régression : lignes lues == lignes attendues,
+  import bloqué si et seulement si le classeur contient des erreurs bloquantes
+✔ Rapport JSON au format de bench.run (--comparer compatible)
+
+--sans-base : lecture seule (DATABASE_URL inutile).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from bench.classeurs import ECRIVAINS, TAUX_DEFAUT, lire_taux
+from bench.run import log, connexion, resume, commit_git, comparer
+
+FICHIERS = {
+    "thzbd": "THZBD2526GA.xlsx",
+    "insc": "INSC_THZ2526.xlsx",
+    "depenses": "DEPENSES_2026.xlsx",
+}
+
+
+# ======================================================
+# MESURES PAR TYPE DE CLASSEUR
+# ======================================================
+
+def _chrono(fonction):
+    t0 = time.perf_counter()
+    valeur = fonction()
+    return time.perf_counter() - t0, valeur
+
+
+def _lecture(module, fonction, chemin, attendu):
+    """
+    Chronomètre la lecture ; (durée, lignes lues ou None si bloqué, ok).
+    """
+    module.EXCEL_FILE = chemin
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            duree, lignes = _chrono(getattr(module, fonction))
+    except RuntimeError:
+        return None, None, attendu["bloque"]
+
+    ok = not attendu["bloque"] and len(lignes) == attendu["attendues"]
+    return duree, lignes, ok
+
+
+def mesurer_thzbd(chemin, attendu, avec_base):
+    import import_excel_pg
+
+    lecture, lignes, ok = _lecture(
+        import_excel_pg, "charger_excel_strict", chemin, attendu
+    )
+    mesures = {"lecture": lecture, "ok": ok, "lues": len(lignes or [])}
+
+    if avec_base and lignes:
+        def charger():
+            with connexion() as conn, contextlib.redirect_stdout(io.StringIO()):
+                import_excel_pg.inserer_donnees(lignes, conn)
+        mesures["chargement"], _ = _chrono(charger)
+
+    return mesures
+
+
+def mesurer_insc(chemin, attendu, avec_base):
+    import import_inscription_pg
+
+    lecture, lignes, ok = _lecture(
+        import_inscription_pg, "charger_excel", chemin, attendu
+    )
+    mesures = {"lecture": lecture, "ok": ok, "lues": len(lignes or [])}
+
+    if avec_base and lignes:
+        with connexion() as conn:
+            conn.execute("TRUNCATE TABLE inscription RESTART IDENTITY CASCADE")
+
+        def charger():
+            with connexion() as conn:
+                import_inscription_pg.inserer_donnees_copy(lignes, conn)
+        mesures["chargement"], _ = _chrono(charger)
+
+    return mesures
+
+
+def mesurer_depenses(chemin, attendu, avec_base):
+    import import_depenses_2026_pg
+
+    lecture, (caisse, depenses, obs, _) = _chrono(
+        lambda: import_depenses_2026_pg.lire_excel(chemin)
+    )
+    ok = (
+        len(depenses) == attendu["attendues"]
+        and len(caisse) == attendu["jours"]
+    )
+    mesures = {"lecture": lecture, "ok": ok, "lues": len(depenses)}
+
+    if avec_base:
+        def charger():
+            with contextlib.redirect_stdout(io.StringIO()):
+                import_depenses_2026_pg.inserer(caisse, depenses, obs)
+        mesures["chargement"], _ = _chrono(charger)
+
+    return mesures
+
+
+MESURES = {
+    "thzbd": mesurer_thzbd,
+    "insc": mesurer_insc,
+    "depenses": mesurer_depenses,
+}
+
+
+# ======================================================
+# MAIN
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tailles", default="10000,100000,500000")
+    parser.add_argument("--types", default="thzbd,insc,depenses")
+    parser.add_argument("--taux", nargs="*", metavar="NOM=VALEUR",
+                        help=f"parmi {', '.join(TAUX_DEFAUT)}")
+    parser.add_argument("--annee", default="2025-2026")
+    parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--sans-base", action="store_true")
+    parser.add_argument("--sortie")
+    parser.add_argument("--comparer")
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL")
+    avec_base = not args.sans_base
+    if avec_base and not url:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+    if avec_base and "render.com" in url:
+        raise RuntimeError("❌ Benchmark interdit sur la base de production")
+
+    tailles = [int(t) for t in args.tailles.split(",")]
+    types = [t.strip() for t in args.types.split(",")]
+    taux = lire_taux(args.taux)
+
+    if avec_base:
+        from migrations import appliquer
+        from bench.donnees import vider_tables
+        with connexion() as conn:
+            appliquer(conn)
+
+    resultats = {}
+    regressions = []
+
+    with tempfile.TemporaryDirectory() as dossier:
+        for type_ in types:
+            chemin = os.path.join(dossier, FICHIERS[type_])
+
+            for taille in tailles:
+                log(f"{type_} @ {taille} : génération du classeur…")
+                attendu = ECRIVAINS[type_](chemin, taille, args.annee, taux=taux)
+
+                series = {}
+                for _ in range(args.repetitions):
+                    if avec_base:
+                        with connexion() as conn:
+                            vider_tables(conn)
+
+                    mesures = MESURES[type_](chemin, attendu, avec_base)
+                    if not mesures.pop("ok", True):
+                        regressions.append(f"{type_}@{taille}")
+                    lues = mesures.pop("lues", 0)
+
+                    for etape, duree in mesures.items():
+                        if duree is not None:
+                            series.setdefault(etape, []).append(duree)
+
+                for etape, durees in series.items():
+                    r = resume(durees)
+                    r["lignes"] = taille
+                    r["lignes_par_s"] = round(taille / (r["mediane_ms"] / 1000))
+                    resultats[f"{type_}@{taille} [{etape}]"] = r
+                    log(f"  {etape:<11} {r['mediane_ms']:>10} ms "
+                        f"({r['lignes_par_s']} lignes/s)")
+
+                log(f"  attendu {attendu['attendues']} / lu {lues} "
+                    f"— bloqué attendu : {attendu['bloque']} — {attendu['sales']}")
+
+    rapport = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_git(),
+            "python": platform.python_version(),
+            "annee": args.annee,
+            "tailles": tailles,
+            "taux": {**TAUX_DEFAUT, **taux},
+            "avec_base": avec_base,
+            "repetitions": args.repetitions,
+            "regressions": regressions,
+        },
+        "imports": resultats,
+    }
+
+    sortie = args.sortie or os.path.join(
+        RACINE, "bench", "resultats", f"imports_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+    log(f"✅ Rapport : {sortie}")
+
+    if regressions:
+        log(f"❌ Volumes lus incorrects : {', '.join(regressions)}")
+
+    lentes = 0
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            lentes = comparer(json.load(f), rapport)
+
+    sys.exit(1 if regressions or lentes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+bench/paiements.py — PAIEMENTS CONCURRENTS AU GUICHET (COURSES + LATENCE)
+
+⚠️ Base PostgreSQL LOCALE uniquement (un élève de test est créé,
+   puis effacé avec ses paiements).
+
+Usage (depuis la racine du projet) :
+  DATABASE_URL=postgresql://localhost/thz_bench python -m bench.paiements
+      [--threads 32] [--tours 5] [--montant 45000] [--lot 300]
+      [--sortie rapport.json] [--comparer ancien_rapport.json]
+
+✔ N threads (1 connexion chacun) démarrés ensemble : tous tentent de
+  payer les 10 mois du même élève, dans un ordre aléatoire
+✔ paiements.enregistrer_paiement + VERSIONS.bump + COMMIT, comme
+  /admin/paiement
+✔ Invariants vérifiés à chaque tour : 1 seul succès par mois, 10 lignes
+  en base, reçus distincts, total = 10 × montant, soldes renvoyés
+  cohérents
+✔ Saisie de fin de journée de --lot reçus : 1 connexion + 1 transaction
+  par reçu (formulaire /admin/paiement) vs enregistrer_lot en une fois
+  (POST /api/paiements/lot)
+✔ Latence par tentative (succès / refus) → rapport JSON (--comparer)
+  Code de sortie 1 si un invariant est violé
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from datetime import date, datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from bench.run import log, connexion, resume, commit_git, comparer
+from data_version import bump_version
+from metier import annee_scolaire_from_date
+from migrations import appliquer
+from paiements import enregistrer_paiement, enregistrer_lot
+from schema_annee import assurer_partitions
+from tarifs_fip import initialiser_annee
+
+MATRICULE = "BENCH-GUICHET"
+PREFIXE_LOT = "BENCH-LOT-"
+CLASSE = "4CG"
+MOIS = ["Sept", "Oct", "Nov", "Dec", "Janv", "Fevr", "Mars", "Avr", "Mai", "Juin"]
+
+
+# ======================================================
+# PRÉPARATION
+# ======================================================
+
+def preparer(conn, annee):
+    """
+    Élève de test sans paiement, partition et tarifs de l'année.
+    Retourne l'id de l'élève.
+    """
+    assurer_partitions(conn, "paiements", [annee])
+    initialiser_annee(conn, annee)
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO eleves (matricule, nom, classe, section)
+            VALUES (%s, 'ÉLÈVE BENCH GUICHET', %s, 'CG')
+            ON CONFLICT (matricule) DO UPDATE SET classe = EXCLUDED.classe
+            RETURNING id
+        """, (MATRICULE, CLASSE))
+        eleve_id = cur.fetchone()[0]
+        cur.execute("DELETE FROM paiements WHERE eleve_id = %s", (eleve_id,))
+    conn.commit()
+    return eleve_id
+
+
+def preparer_lot(conn, taille, montant, jour):
+    """
+    Élèves de test sans paiement (10 mois chacun) ; retourne les
+    `taille` lignes de reçus papier à saisir.
+    """
+    nb_eleves = -(-taille // len(MOIS))
+    matricules = [f"{PREFIXE_LOT}{k:04d}" for k in range(nb_eleves)]
+
+    with conn.cursor() as cur:
+        cur.executemany("""
+            INSERT INTO eleves (matricule, nom, classe, section)
+            VALUES (%s, 'ÉLÈVE BENCH LOT', %s, 'CG')
+            ON CONFLICT (matricule) DO NOTHING
+        """, [(m, CLASSE) for m in matricules])
+        cur.execute("""
+            DELETE FROM paiements
+            WHERE eleve_id IN (SELECT id FROM eleves WHERE matricule LIKE %s)
+        """, (PREFIXE_LOT + "%",))
+    conn.commit()
+
+    lignes = [
+        {"matricule": m, "mois": mois, "montant": montant,
+         "date": jour.isoformat()}
+        for m in matricules for mois in MOIS
+    ]
+    return lignes[:taille]
+
+
+def nettoyer(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM paiements
+            WHERE eleve_id IN (SELECT id FROM eleves WHERE matricule LIKE 'BENCH-%%')
+        """)
+        cur.execute("DELETE FROM eleves WHERE matricule LIKE 'BENCH-%%'")
+    conn.commit()
+
+
+# ======================================================
+# TOUR DE COURSE
+# ======================================================
+
+def tour(threads, montant, jour, graine):
+    """
+    Tous les threads paient tous les mois en même temps.
+    Retourne la liste (mois, durée s, resultat ou exception).
+    """
+    depart = threading.Barrier(threads)
+    mesures = []
+    verrou = threading.Lock()
+
+    def caissier(n):
+        rng = random.Random(graine + n)
+        ordre = MOIS[:]
+        rng.shuffle(ordre)
+        locales = []
+
+        with connexion() as conn:
+            depart.wait()
+            for mois in ordre:
+                t0 = time.perf_counter()
+                try:
+                    r = enregistrer_paiement(conn, MATRICULE, mois, montant, jour)
+                    if r and r["numrecu"]:
+                        bump_version(conn, "paiements")
+                        conn.commit()
+                    else:
+                        conn.rollback()
+                except Exception as e:
+                    conn.rollback()
+                    r = e
+                locales.append((mois, time.perf_counter() - t0, r))
+
+        with verrou:
+            mesures.extend(locales)
+
+    fils = [threading.Thread(target=caissier, args=(n,)) for n in range(threads)]
+    for f in fils:
+        f.start()
+    for f in fils:
+        f.join()
+    return mesures
+
+
+# ======================================================
+# SAISIE DE FIN DE JOURNÉE : UNITAIRE vs LOT
+# ======================================================
+
+def mesurer_lot(conn, taille, montant, jour, repetitions=3):
+    """
+    Durée totale de saisie de `taille` reçus, reçu par reçu puis par lot.
+    Retourne ({mesure: résumé}, violations).
+    """
+    durees = {"unitaire": [], "par lot": []}
+    violations = []
+
+    for _ in range(repetitions):
+        lignes = preparer_lot(conn, taille, montant, jour)
+        t0 = time.perf_counter()
+        for ligne in lignes:
+            # Comme /admin/paiement : 1 requête HTTP = 1 connexion
+            with connexion() as c:
+                enregistrer_paiement(c, ligne["matricule"], ligne["mois"],
+                                     montant, jour)
+                bump_version(c, "paiements")
+                c.commit()
+        durees["unitaire"].append(time.perf_counter() - t0)
+
+        lignes = preparer_lot(conn, taille, montant, jour)
+        t0 = time.perf_counter()
+        with connexion() as c:
+            resultats, _ = enregistrer_lot(c, lignes)
+            bump_version(c, "paiements")
+            c.commit()
+        durees["par lot"].append(time.perf_counter() - t0)
+
+        refus = [r for r in resultats if r["statut"] != "enregistre"]
+        if refus:
+            violations.append(f"lot : {len(refus)} ligne(s) refusée(s) : {refus[0]}")
+
+    resultats = {
+        f"saisie {mode} [{taille} reçus]": resume(d) for mode, d in durees.items()
+    }
+    for nom, r in resultats.items():
+        log(f"  {nom:<30} médiane {r['mediane_ms']:>9} ms")
+    return resultats, violations
+
+
+def verifier(conn, eleve_id, mesures, montant, annee):
+    """
+    Invariants du tour ; retourne la liste des violations.
+    """
+    erreurs = [r for _, _, r in mesures if isinstance(r, Exception)]
+    succes = [(m, r) for m, _, r in mesures if isinstance(r, dict) and r["numrecu"]]
+
+    violations = [f"exception : {e}" for e in erreurs[:5]]
+
+    par_mois = {}
+    for mois, _ in succes:
+        par_mois[mois] = par_mois.get(mois, 0) + 1
+    for mois in MOIS:
+        if par_mois.get(mois, 0) != 1:
+            violations.append(f"{mois} : {par_mois.get(mois, 0)} succès")
+
+    recus = [r["numrecu"] for _, r in succes]
+    if len(set(recus)) != len(recus):
+        violations.append("numéros de reçu en double")
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT COUNT(*), COUNT(DISTINCT mois_unique), COALESCE(SUM(fip), 0)
+            FROM paiements
+            WHERE eleve_id = %s AND annee_scolaire = %s
+        """, (eleve_id, annee))
+        lignes, mois_distincts, total = cur.fetchone()
+
+    if lignes != len(MOIS) or mois_distincts != len(MOIS):
+        violations.append(f"{lignes} lignes / {mois_distincts} mois en base")
+
+    if float(total) != montant * len(MOIS):
+        violations.append(f"total en base {total} ≠ {montant * len(MOIS)}")
+
+    # Solde renvoyé : inclut le paiement, jamais plus que la base
+    # (les paiements concurrents non encore validés n'y sont pas)
+    for _, r in succes:
+        if not montant <= r["total_paye"] <= float(total):
+            violations.append(f"total renvoyé {r['total_paye']} hors bornes")
+            break
+
+    return violations
+
+
+# ======================================================
+# MAIN
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--tours", type=int, default=5)
+    parser.add_argument("--montant", type=float, default=45000)
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--lot", type=int, default=300,
+                        help="reçus de la saisie de fin de journée (0 : non mesurée)")
+    parser.add_argument("--sortie")
+    parser.add_argument("--comparer")
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+    if "render.com" in url:
+        raise RuntimeError("❌ Benchmark interdit sur la base de production")
+
+    jour = date.today()
+    annee = annee_scolaire_from_date(jour)
+
+    with connexion() as conn:
+        appliquer(conn)
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            version_pg = cur.fetchone()[0]
+
+        toutes, violations = [], []
+        t0 = time.perf_counter()
+        for n in range(args.tours):
+            eleve_id = preparer(conn, annee)
+            mesures = tour(args.threads, args.montant, jour, args.graine + 1000 * n)
+            v = verifier(conn, eleve_id, mesures, args.montant, annee)
+            log(f"Tour {n + 1}/{args.tours} : {len(mesures)} tentatives, "
+                + ("✅ invariants respectés" if not v else f"❌ {'; '.join(v)}"))
+            violations += v
+            toutes += mesures
+        ecoule = time.perf_counter() - t0
+
+        saisie = {}
+        if args.lot:
+            log(f"Saisie de fin de journée : {args.lot} reçus…")
+            saisie, v = mesurer_lot(conn, args.lot, args.montant, jour)
+            violations += v
+
+        nettoyer(conn)
+
+    resultats = {}
+    for type_, garder in (
+        ("succes", lambda r: isinstance(r, dict) and r["numrecu"]),
+        ("refus", lambda r: isinstance(r, dict) and not r["numrecu"]),
+    ):
+        serie = [d for _, d, r in toutes if garder(r)]
+        if serie:
+            resultats[f"paiement [{type_}]"] = resume(serie)
+            log(f"  {type_:<7} {resultats[f'paiement [{type_}]']}")
+    log(f"  débit   {len(toutes) / ecoule:.0f} tentatives/s "
+        f"({args.threads} threads)")
+    resultats.update(saisie)
+
+    rapport = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_git(),
+            "python": platform.python_version(),
+            "postgresql": version_pg,
+            "threads": args.threads,
+            "tours": args.tours,
+            "lot": args.lot,
+            "violations": violations,
+        },
+        "paiements": resultats,
+    }
+
+    sortie = args.sortie or os.path.join(
+        RACINE, "bench", "resultats",
+        f"paiements_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+    log(f"✅ Rapport : {sortie}")
+
+    lentes = 0
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            lentes = comparer(json.load(f), rapport)
+
+    sys.exit(1 if violations or lentes else 0)
+
+
+if __name__ == "__main__":
+    main()
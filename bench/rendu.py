@@ -0,0 +1,144 @@
+"""
+bench/rendu.py — COÛT DE RENDU DES PAGES HTML (PAR REQUÊTE)
+
+Usage (depuis la racine du projet) :
+  python -m bench.rendu [--repetitions 200] [--lignes 300]
+      [--sortie rapport.json] [--comparer ancien_rapport.json]
+
+✔ Aucune base requise : contextes de rendu synthétiques
+✔ « chaine »  : render_template_string(source) — ancien comportement,
+  le gabarit est analysé et compilé à chaque requête
+✔ « fichier » : render_template(nom) — compilé une fois, mis en cache
+  par Jinja (TEMPLATES_AUTO_RELOAD désactivé hors debug)
+✔ Rapport JSON au format de bench.run (--comparer compatible)
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost:1/rendu")
+
+from bench.run import log, resume, chronometrer, commit_git, comparer
+
+
+# ======================================================
+# PAGES MESURÉES (GABARIT → CONTEXTE)
+# ======================================================
+
+def contextes(lignes):
+    journal = [
+        {
+            "matricule": f"THZ{i:05d}", "nom": f"ÉLÈVE {i}", "classe": "4CG",
+            "section": "CG", "mois": "Sept", "fip": 45000, "numrecu": f"R{i}",
+        }
+        for i in range(lignes)
+    ]
+    return {
+        "home.html": {},
+        "dashboard.html": {},
+        "dashboard_finance.html": {},
+        "journal.html": {},
+        "gestion_eleve.html": {},
+        "admin1_panel.html": {},
+        "login_form.html": {"error": None},
+        "fip_eleve_result.html": {
+            "data": {
+                "annee_scolaire": "2025-2026", "ff_mensuel": 5000,
+                "total_attendu_ff": 50000, "ff_total": 20000.0,
+                "solde_ff": 30000.0,
+            },
+            "eleve": {
+                "matricule": "THZ00001", "nom": "ÉLÈVE 1", "sexe": "F",
+                "classe": "4CG", "section": "CG", "categorie": "N",
+                "telephone": "0000",
+            },
+            "fip_mensuel": 45000, "total_attendu": 450000,
+            "total_paye": 180000.0, "solde_fip": 270000.0,
+            "mois_payes": ["Sept", "Oct", "Nov", "Dec"],
+            "mois_non_payes": ["Janv", "Fevr", "Mars", "Avr", "Mai", "Juin"],
+        },
+        "journal_result.html": {
+            "date_input": "2025-10-06",
+            "results": journal,
+            "total_jour": sum(r["fip"] for r in journal),
+        },
+    }
+
+
+def mesurer(repetitions, lignes):
+    from flask import render_template, render_template_string
+    from server_flask import app
+
+    resultats = {}
+    for nom, contexte in contextes(lignes).items():
+        chemin = os.path.join(app.root_path, app.template_folder, nom)
+        with open(chemin, encoding="utf-8") as f:
+            source = f.read()
+
+        with app.test_request_context("/"):
+            # Première compilation hors mesure (cache Jinja chaud)
+            render_template(nom, **contexte)
+
+            modes = {
+                "chaine": lambda: render_template_string(source, **contexte),
+                "fichier": lambda: render_template(nom, **contexte),
+            }
+            for mode, fonction in modes.items():
+                r = resume(chronometrer(fonction, repetitions))
+                r["octets"] = len(source.encode())
+                resultats[f"{nom} [{mode}]"] = r
+
+        chaine = resultats[f"{nom} [chaine]"]["mediane_ms"]
+        fichier = resultats[f"{nom} [fichier]"]["mediane_ms"]
+        log(f"  {nom:<26} chaine {chaine:>8} ms   fichier {fichier:>8} ms   "
+            f"(× {chaine / fichier if fichier else 0:.0f})")
+
+    return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repetitions", type=int, default=200)
+    parser.add_argument("--lignes", type=int, default=300,
+                        help="lignes du journal_result.html")
+    parser.add_argument("--sortie")
+    parser.add_argument("--comparer")
+    args = parser.parse_args()
+
+    rapport = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_git(),
+            "python": platform.python_version(),
+            "repetitions": args.repetitions,
+            "lignes": args.lignes,
+        },
+        "rendu": mesurer(args.repetitions, args.lignes),
+    }
+
+    sortie = args.sortie or os.path.join(
+        RACINE, "bench", "resultats", f"rendu_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+    log(f"✅ Rapport : {sortie}")
+
+    lentes = 0
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            lentes = comparer(json.load(f), rapport)
+
+    sys.exit(1 if lentes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+bench/reponses.py — TAILLE DES RÉPONSES JSON : OBJETS vs COLONNES, GZIP vs BROTLI
+
+⚠️ Base PostgreSQL LOCALE uniquement (lecture seule, école chargée par
+   bench.run ; classe de 45 élèves : bench.run --eleves-par-classe 45).
+
+Usage (depuis la racine du projet) :
+  DATABASE_URL=postgresql://localhost/thz_bench python -m bench.reponses
+      [--annee 2025-2026] [--classe 4CG] [--mois 2025-10]
+      [--repetitions 20] [--sortie rapport.json] [--comparer ancien_rapport.json]
+
+✔ /api/classe/<classe> et /api/journal d'un mois complet (du 1er au
+  dernier jour), en objets puis en ?format=colonnes
+✔ Octets transférés : sans compression, gzip, Brotli (si installé)
+✔ Durée de la requête complète (compression comprise) par encodage
+"""
+
+import argparse
+import calendar
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from bench.run import log, resume, commit_git, comparer
+from metier import annee_en_cours
+import compression
+
+MOT_DE_PASSE = "bench-reponses"
+
+
+def mesurer(client, url, encodage, repetitions):
+    """
+    (octets transférés, durées s) de `repetitions` GET (1 de chauffe).
+    """
+    entetes = {"Accept-Encoding": encodage} if encodage else {}
+    durees = []
+    for n in range(repetitions + 1):
+        t0 = time.perf_counter()
+        r = client.get(url, headers=entetes)
+        duree = time.perf_counter() - t0
+        if r.status_code != 200:
+            raise RuntimeError(f"❌ {url} → {r.status_code}")
+        if r.headers.get("Content-Encoding", "") != (encodage or ""):
+            raise RuntimeError(f"❌ {url} : encodage {encodage} non appliqué")
+        if n:
+            durees.append(duree)
+    return len(r.get_data()), durees
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--annee", default=annee_en_cours())
+    parser.add_argument("--classe", default="4CG")
+    parser.add_argument("--mois", help="AAAA-MM (défaut : octobre de --annee)")
+    parser.add_argument("--repetitions", type=int, default=20)
+    parser.add_argument("--sortie")
+    parser.add_argument("--comparer")
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+    if "render.com" in url:
+        raise RuntimeError("❌ Benchmark interdit sur la base de production")
+
+    os.environ["ADMIN_PASSWORDS"] = MOT_DE_PASSE
+    from server_flask import app
+
+    client = app.test_client()
+    client.post("/admin/login", data={"password": MOT_DE_PASSE})
+
+    an, mois = map(int, (args.mois or f"{args.annee[:4]}-10").split("-"))
+    dernier = calendar.monthrange(an, mois)[1]
+    routes = {
+        "api_classe": f"/api/classe/{args.classe}?annee={args.annee}",
+        "api_journal": f"/api/journal?du={an}-{mois:02d}-01"
+                       f"&au={an}-{mois:02d}-{dernier}",
+    }
+
+    encodages = [None, "gzip"] + (["br"] if compression.brotli else [])
+    if not compression.brotli:
+        log("⚠️ module brotli absent : gzip seul")
+
+    resultats = {}
+    tailles = {}
+    for nom, base in routes.items():
+        d = client.get(base).get_json()
+        taille = d.get("nb_eleves", d.get("nb"))
+        log(f"{nom} : {taille} lignes")
+        for format_ in ("objets", "colonnes"):
+            url_ = base + ("&format=colonnes" if format_ == "colonnes" else "")
+            for encodage in encodages:
+                octets, durees = mesurer(client, url_, encodage, args.repetitions)
+                cle = f"{nom} [{format_}, {encodage or 'identity'}]"
+                r = resume(durees)
+                r["octets"] = octets
+                r["lignes"] = taille
+                resultats[cle] = r
+                tailles[cle] = octets
+                log(f"  {format_:<8} {encodage or 'identity':<8} "
+                    f"{octets:>8} o   médiane {r['mediane_ms']:>7} ms")
+
+        brut = tailles[f"{nom} [objets, identity]"]
+        meilleur = min(v for k, v in tailles.items() if k.startswith(nom))
+        log(f"  → {brut} o → {meilleur} o ({brut / meilleur:.1f}×)")
+
+    rapport = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_git(),
+            "python": platform.python_version(),
+            "annee": args.annee,
+            "classe": args.classe,
+            "mois": f"{an}-{mois:02d}",
+            "seuil": compression.SEUIL,
+            "niveau_gzip": compression.NIVEAU_GZIP,
+            "qualite_brotli": compression.QUALITE_BROTLI if compression.brotli else None,
+        },
+        "reponses": resultats,
+    }
+
+    sortie = args.sortie or os.path.join(
+        RACINE, "bench", "resultats",
+        f"reponses_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+    log(f"✅ Rapport : {sortie}")
+
+    lentes = 0
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            lentes = comparer(json.load(f), rapport)
+
+    sys.exit(1 if lentes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+"""
+bench/run.py — CHRONOMÉTRAGE DES ROUTES CHAUDES ET DES IMPORTS
+
+⚠️ Base PostgreSQL LOCALE uniquement : les tables métier sont VIDÉES.
+
+Usage (depuis la racine du projet) :
+  DATABASE_URL=postgresql://localhost/thz_bench python -m bench.run
+      [--eleves-par-classe 30] [--repetitions 5] [--annee 2025-2026]
+      [--classe 4CG] [--sans-generation] [--sortie rapport.json]
+      [--comparer ancien_rapport.json]
+
+✔ Schéma à jour (migrations.appliquer) + école synthétique (bench.donnees)
+✔ Routes : api_classe, rapport_pdf_classe, api_dashboard_finance,
+  admin_journal_result, resume_journalier, api_impayes,
+  api_finance_cube, api_depenses_analyse (cache froid / cache chaud)
+✔ Imports : import_excel_pg, import_inscription_pg (chargement),
+  import_depenses_2026_pg (lecture + insertion d'un classeur généré)
+  → débit lecture / chargement par taille : bench.imports
+✔ Rapport JSON (min / médiane / p95 / max en ms) comparable entre runs
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import psycopg
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from bench.donnees import PARAMETRES_DEFAUT, generer_ecole, charger_ecole
+from bench.classeurs import START_ROW_DEPENSES, ligne_depenses
+from tarifs_fip import charger_tarifs, initialiser_annee
+from migrations import appliquer
+from metier import annee_en_cours
+
+# ======================================================
+# ROUTES MESURÉES
+# ======================================================
+
+ROUTES = [
+    ("api_classe", "/api/classe/{classe}?annee={annee}"),
+    ("rapport_pdf_classe", "/api/rapport_classe/{classe}?annee={annee}&type=impaye"),
+    ("api_dashboard_finance", "/api/dashboard/finance?annee={annee}"),
+    ("admin_journal_result", "/admin/journal_result?date={jour}"),
+    ("resume_journalier", "/resume-journalier?annee={annee}"),
+    ("api_impayes", "/api/impayes?annee={annee}&mois=Juin&eleves=0"),
+    ("api_finance_cube", "/api/finance/cube?annee={annee}&dims=mois,section"),
+    ("api_depenses_analyse", "/api/depenses/analyse?annee={annee}&grain=jour"),
+]
+
+# Un écart de médiane au-delà de ce ratio est signalé par --comparer
+SEUIL_REGRESSION = 1.20
+
+
+def log(msg):
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {msg}")
+
+
+def connexion():
+    url = os.environ["DATABASE_URL"]
+    return psycopg.connect(
+        url,
+        sslmode="require" if "render.com" in url else "disable"
+    )
+
+
+# ======================================================
+# MESURE
+# ======================================================
+
+def resume(durees):
+    """
+    Statistiques (ms) d'une série de durées en secondes.
+    """
+    ms = sorted(d * 1000 for d in durees)
+    p95 = ms[min(len(ms) - 1, round(0.95 * (len(ms) - 1)))]
+    return {
+        "n": len(ms),
+        "min_ms": round(ms[0], 2),
+        "mediane_ms": round(statistics.median(ms), 2),
+        "p95_ms": round(p95, 2),
+        "max_ms": round(ms[-1], 2),
+    }
+
+
+def chronometrer(fonction, repetitions, avant=None):
+    durees = []
+    for _ in range(repetitions):
+        if avant:
+            avant()
+        t0 = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - t0)
+    return durees
+
+
+# ======================================================
+# ROUTES (CLIENT DE TEST FLASK, MÊME PROCESSUS)
+# ======================================================
+
+def vider_caches():
+    """
+    Cache froid : caches par version (VERSIONS.cache) + PDF déjà générés.
+    """
+    from commun import VERSIONS
+
+    VERSIONS.vider_caches()
+    VERSIONS.invalider()
+
+    for chemin in glob.glob(os.path.join("temp", "*_v*.pdf")):
+        os.remove(chemin)
+
+
+def mesurer_routes(params, repetitions):
+    import server_flask as sf
+
+    client = sf.app.test_client()
+    with client.session_transaction() as s:
+        s["role"] = "admin"
+
+    resultats = {}
+
+    for nom, modele in ROUTES:
+        url = modele.format(**params)
+        statuts = set()
+
+        def appel():
+            r = client.get(url)
+            r.get_data()
+            statuts.add(r.status_code)
+            r.close()
+
+        froid = chronometrer(appel, repetitions, avant=vider_caches)
+        appel()   # préchauffage
+        chaud = chronometrer(appel, repetitions)
+
+        resultats[nom] = {
+            "url": url,
+            "statuts": sorted(statuts),
+            "froid": resume(froid),
+            "chaud": resume(chaud),
+        }
+        log(f"  {nom:<24} froid {resultats[nom]['froid']['mediane_ms']:>9} ms"
+            f" | chaud {resultats[nom]['chaud']['mediane_ms']:>9} ms"
+            f" | HTTP {sorted(statuts)}")
+
+    return resultats
+
+
+# ======================================================
+# IMPORTS
+# ======================================================
+
+def lignes_thzbd(ecole):
+    """
+    Lignes au format de import_excel_pg.charger_excel_strict().
+    """
+    eleves = {e[0]: e for e in ecole["eleves"]}
+    lignes = []
+    for matricule, numrecu, mois, fip, ff, obs, jour, d, annee in ecole["paiements"]:
+        _, nom, sexe, classe, categorie, section, tel, email = eleves[matricule]
+        lignes.append({
+            "Matricule": matricule, "Nom": nom, "Sexe": sexe,
+            "Classe": classe, "Categorie": categorie, "Section": section,
+            "Telephone": tel, "Email": email, "NumRecu": numrecu,
+            "Mois": mois, "FIP": float(fip), "FF": float(ff), "Obs": obs,
+            "Jour": jour, "DatePaiement": d, "AnneeScolaire": annee,
+        })
+    return lignes
+
+
+def ecrire_classeur_depenses(chemin, ecole):
+    """
+    Classeur au format DEPENSES_2026.xlsx (Feuil1, ligne 13, colonnes C→Q).
+    """
+    from openpyxl import Workbook
+
+    par_jour = defaultdict(list)
+    for r in ecole["depenses"]:
+        par_jour[r[1]].append(r)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Feuil1")
+    for _ in range(START_ROW_DEPENSES - 1):
+        ws.append([])
+
+    for d, report, bloc1, bloc2, bus1, bus2, annee in ecole["caisse"]:
+        for i, dep in enumerate(par_jour.get(d) or [None]):
+            ref, libelle, montant, banque = (
+                (dep[0], dep[2], dep[3], dep[4]) if dep else (None, None, 0, 0)
+            )
+            ws.append(ligne_depenses(
+                ref, datetime(d.year, d.month, d.day),
+                [report, bloc1, bloc2, bus1, bus2] if i == 0 else None,
+                libelle, montant, banque, annee
+            ))
+
+    wb.save(chemin)
+
+
+def mesurer_imports(ecole, repetitions):
+    import import_excel_pg
+    import import_inscription_pg
+
+    resultats = {}
+
+    # ---------- import_excel_pg (upsert élèves + paiements) ----------
+    lignes = lignes_thzbd(ecole)
+
+    def excel():
+        with connexion() as conn:
+            import_excel_pg.inserer_donnees(lignes, conn)
+
+    resultats["import_excel_pg.inserer_donnees"] = {
+        "lignes": len(lignes),
+        **resume(chronometrer(excel, repetitions)),
+    }
+
+    # ---------- import_inscription_pg (TRUNCATE + COPY) ----------
+    inscriptions = [
+        dict(zip(import_inscription_pg.REQUIRED_COLS, r))
+        for r in ecole["inscriptions"]
+    ]
+
+    def vider_inscription():
+        with connexion() as conn:
+            conn.execute("TRUNCATE TABLE inscription RESTART IDENTITY CASCADE")
+
+    def inscription():
+        with connexion() as conn:
+            import_inscription_pg.inserer_donnees_copy(inscriptions, conn)
+
+    resultats["import_inscription_pg.inserer_donnees_copy"] = {
+        "lignes": len(inscriptions),
+        **resume(chronometrer(inscription, repetitions, avant=vider_inscription)),
+    }
+
+    # ---------- import_depenses_2026_pg (lecture + insertion) ----------
+    import import_depenses_2026_pg
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "DEPENSES_2026.xlsx")
+        ecrire_classeur_depenses(chemin, ecole)
+
+        def depenses():
+            caisse, lignes, obs, _ = import_depenses_2026_pg.lire_excel(chemin)
+            with contextlib.redirect_stdout(io.StringIO()):
+                import_depenses_2026_pg.inserer(caisse, lignes, obs)
+
+        resultats["import_depenses_2026_pg"] = {
+            "lignes": len(ecole["caisse"]) + len(ecole["depenses"]),
+            **resume(chronometrer(depenses, repetitions)),
+        }
+
+    for nom, r in resultats.items():
+        log(f"  {nom:<44} {r['mediane_ms']:>9} ms ({r['lignes']} lignes)")
+
+    return resultats
+
+
+# ======================================================
+# RAPPORT
+# ======================================================
+
+def commit_git():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=RACINE, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def medianes(rapport):
+    """
+    {mesure: médiane ms} à plat (routes froid/chaud, imports, rendu, charge,
+    paiements, sync, reponses).
+    """
+    valeurs = {}
+    for nom, r in rapport.get("routes", {}).items():
+        for mode in ("froid", "chaud"):
+            valeurs[f"{nom} [{mode}]"] = r[mode]["mediane_ms"]
+    for section in ("imports", "rendu", "charge", "paiements", "sync",
+                    "reponses"):
+        for nom, r in rapport.get(section, {}).items():
+            valeurs[nom] = r["mediane_ms"]
+    return valeurs
+
+
+def comparer(ancien, nouveau):
+    """
+    Affiche les médianes des deux runs ; retourne le nombre de régressions.
+    """
+    avant = medianes(ancien)
+    regressions = 0
+
+    log(f"Comparaison avec {ancien['meta'].get('commit')} "
+        f"({ancien['meta'].get('date')})")
+
+    for nom, ms in medianes(nouveau).items():
+        if nom not in avant or not avant[nom]:
+            continue
+        ratio = ms / avant[nom]
+        alerte = ratio > SEUIL_REGRESSION
+        regressions += alerte
+        log(f"  {'⚠️' if alerte else '  '} {nom:<48} "
+            f"{avant[nom]:>9} → {ms:>9} ms  (x{ratio:.2f})")
+
+    return regressions
+
+
+# ======================================================
+# MAIN
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--annee", default=annee_en_cours())
+    parser.add_argument("--eleves-par-classe", type=int,
+                        default=PARAMETRES_DEFAUT["eleves_par_classe"])
+    parser.add_argument("--graine", type=int, default=PARAMETRES_DEFAUT["graine"])
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--classe", default="4CG")
+    parser.add_argument("--sans-generation", action="store_true",
+                        help="réutilise l'école déjà chargée (imports non mesurés)")
+    parser.add_argument("--sortie")
+    parser.add_argument("--comparer")
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+    if "render.com" in url:
+        raise RuntimeError("❌ Benchmark interdit sur la base de production")
+
+    # temp/ (PDF) relatif au dossier du serveur
+    os.chdir(RACINE)
+
+    parametres = {
+        "eleves_par_classe": args.eleves_par_classe,
+        "graine": args.graine,
+    }
+
+    ecole = None
+    with connexion() as conn:
+        appliquer(conn)
+
+        if not args.sans_generation:
+            log(f"Génération : {args.eleves_par_classe} élèves/classe, {args.annee}")
+            initialiser_annee(conn, args.annee)
+            ecole = generer_ecole(args.annee, charger_tarifs(conn, args.annee), **parametres)
+            volumes = charger_ecole(conn, ecole, args.annee)
+            log(f"  {volumes}")
+
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            version_pg = cur.fetchone()[0]
+
+            # Jour le plus chargé : cas défavorable du journal
+            cur.execute("""
+                SELECT datepaiement FROM paiements
+                WHERE annee_scolaire = %s
+                GROUP BY datepaiement
+                ORDER BY COUNT(*) DESC, datepaiement
+                LIMIT 1
+            """, (args.annee,))
+            ligne = cur.fetchone()
+            jour = ligne[0].isoformat() if ligne else f"{args.annee[:4]}-09-15"
+
+            volumes = {}
+            for table in ("eleves", "paiements", "inscription",
+                          "depense", "caisse_journaliere"):
+                cur.execute(f"SELECT COUNT(*) FROM {table}")
+                volumes[table] = cur.fetchone()[0]
+
+    rapport = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_git(),
+            "python": platform.python_version(),
+            "postgresql": version_pg,
+            "annee": args.annee,
+            "classe": args.classe,
+            "jour_journal": jour,
+            "repetitions": args.repetitions,
+            "parametres": {**PARAMETRES_DEFAUT, **parametres},
+            "volumes": volumes,
+        },
+    }
+
+    log("Routes…")
+    rapport["routes"] = mesurer_routes(
+        {"annee": args.annee, "classe": args.classe, "jour": jour},
+        args.repetitions
+    )
+
+    if ecole:
+        log("Imports…")
+        rapport["imports"] = mesurer_imports(ecole, args.repetitions)
+
+    sortie = args.sortie or os.path.join(
+        RACINE, "bench", "resultats", f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False, default=str)
+    log(f"✅ Rapport : {sortie}")
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            if comparer(json.load(f), rapport):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
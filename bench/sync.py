@@ -0,0 +1,177 @@
+"""
+bench/sync.py — SYNCHRO MOBILE : TOUT L'ÉCOLE vs DELTA vs FICHE PAR ÉLÈVE
+
+⚠️ Base PostgreSQL LOCALE uniquement (école chargée par bench.run ;
+   quelques paiements d'acompte de test sont ajoutés puis effacés).
+
+Usage (depuis la racine du projet) :
+  DATABASE_URL=postgresql://localhost/thz_bench python -m bench.sync
+      [--annee 2025-2026] [--limite 500] [--paiements 5]
+      [--sortie rapport.json] [--comparer ancien_rapport.json]
+
+✔ « fiches »  : /api/mobile/eleve/<matricule> pour chaque élève
+  (ancien fonctionnement : 1 requête par élève)
+✔ « complete » : /api/mobile/sync sans jeton, toutes les pages
+✔ « delta »    : /api/mobile/sync?jeton=… après --paiements paiements
+✔ Requêtes, octets JSON et octets gzip transférés, durée totale
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from bench.run import log, connexion, resume, commit_git, comparer
+from metier import annee_en_cours
+
+MOT_DE_PASSE = "bench-sync"
+
+
+def _get(client, url):
+    r = client.get(url, headers={"Accept-Encoding": "gzip"})
+    brut = r.get_data()
+    corps = gzip.decompress(brut) if r.headers.get("Content-Encoding") == "gzip" else brut
+    return r.status_code, len(brut), len(corps), json.loads(corps)
+
+
+def synchro(client, annee, limite, jeton=None):
+    """
+    Toutes les pages d'une synchro ; retourne (mesures, jeton de la synchro suivante).
+    """
+    requetes = octets = octets_json = eleves = 0
+    suite = None
+    t0 = time.perf_counter()
+    while True:
+        url = f"/api/mobile/sync?annee={annee}&limite={limite}"
+        url += f"&jeton={jeton}" if jeton else ""
+        url += f"&suite={suite}" if suite else ""
+        statut, n, n_json, d = _get(client, url)
+        if statut != 200:
+            raise RuntimeError(f"❌ /api/mobile/sync → {statut}")
+        requetes += 1
+        octets += n
+        octets_json += n_json
+        eleves += len(d["eleves"])
+        suite = d["suite"]
+        if not suite:
+            break
+    mesures = {
+        "requetes": requetes, "eleves": eleves, "octets": octets,
+        "octets_json": octets_json, "duree_s": time.perf_counter() - t0,
+    }
+    return mesures, d["jeton"]
+
+
+def fiches(client, annee, matricules):
+    octets = 0
+    t0 = time.perf_counter()
+    for m in matricules:
+        statut, n, _, _ = _get(client, f"/api/mobile/eleve/{m}?annee={annee}")
+        octets += n
+    return {
+        "requetes": len(matricules), "eleves": len(matricules),
+        "octets": octets, "octets_json": octets,
+        "duree_s": time.perf_counter() - t0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--annee", default=annee_en_cours())
+    parser.add_argument("--limite", type=int, default=500)
+    parser.add_argument("--paiements", type=int, default=5)
+    parser.add_argument("--sortie")
+    parser.add_argument("--comparer")
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL")
+    if not url:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+    if "render.com" in url:
+        raise RuntimeError("❌ Benchmark interdit sur la base de production")
+
+    os.environ["ADMIN_PASSWORDS"] = MOT_DE_PASSE
+    from server_flask import app
+
+    client = app.test_client()
+    client.post("/admin/login", data={"password": MOT_DE_PASSE})
+
+    with connexion() as conn:
+        matricules = [m for (m,) in conn.execute(
+            "SELECT matricule FROM eleves ORDER BY id"
+        ).fetchall()]
+    if not matricules:
+        raise RuntimeError("❌ Aucun élève : lancer d'abord bench.run")
+
+    annee = args.annee
+    mesures = {}
+
+    log(f"{len(matricules)} élèves, {annee}")
+    mesures["fiches"] = fiches(client, annee, matricules)
+    mesures["complete"], jeton = synchro(client, annee, args.limite)
+
+    # Acomptes de test (hors contrainte 1 paiement / mois), puis delta
+    date_test = f"{annee[5:]}-06-01"
+    lot = [
+        {"matricule": m, "mois": "Ac. Juin", "montant": 1,
+         "recu": f"BENCH-SYNC-{i}", "date": date_test}
+        for i, m in enumerate(matricules[:args.paiements])
+    ]
+    r = client.post("/api/paiements/lot", json={"paiements": lot})
+    if r.status_code != 200:
+        raise RuntimeError(f"❌ /api/paiements/lot → {r.status_code}")
+    try:
+        mesures["delta"], _ = synchro(client, annee, args.limite, jeton)
+    finally:
+        with connexion() as conn:
+            conn.execute(
+                "DELETE FROM paiements WHERE numrecu LIKE %s", ("BENCH-SYNC-%",)
+            )
+
+    resultats = {}
+    for mode, m in mesures.items():
+        r = resume([m["duree_s"]])
+        r.update({k: v for k, v in m.items() if k != "duree_s"})
+        resultats[f"sync {mode}"] = r
+        log(f"  {mode:<9} {m['requetes']:>5} requêtes  {m['eleves']:>5} élèves  "
+            f"{m['octets_json']:>9} o JSON  {m['octets']:>9} o transférés  "
+            f"{m['duree_s'] * 1000:>8.0f} ms")
+
+    rapport = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_git(),
+            "python": platform.python_version(),
+            "annee": annee,
+            "limite": args.limite,
+            "paiements": args.paiements,
+        },
+        "sync": resultats,
+    }
+
+    sortie = args.sortie or os.path.join(
+        RACINE, "bench", "resultats", f"sync_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+    log(f"✅ Rapport : {sortie}")
+
+    lentes = 0
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            lentes = comparer(json.load(f), rapport)
+
+    sys.exit(1 if lentes else 0)
+
+
+if __name__ == "__main__":
+    main()
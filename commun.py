@@ -0,0 +1,616 @@
+"""
+commun.py — SOCLE PARTAGÉ PAR LES BLUEPRINTS (routes/)
+
+✔ Configuration (DATABASE_URL, mots de passe admin / compta)
+✔ Connexion PostgreSQL instrumentée + fetch_all / fetch_one
+✔ Versions de données (VERSIONS) : caches des workers
+✔ Sécurité : require_role / require_api_role, année demandée
+✔ Fonctions métier FIP (tarifs, mois canoniques, calculs élève /
+  section / mois) utilisées par plusieurs blueprints
+"""
+
+from flask import jsonify, request, redirect, session, abort, make_response
+
+from functools import wraps
+import os
+import re
+import psycopg
+from psycopg.rows import dict_row
+
+from dotenv import load_dotenv
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
+from data_version import VersionsDonnees
+from metier import (
+    annee_en_cours, canonical_month, CLASSES_VALIDES, MOIS_SCOLAIRE
+)
+from tarifs_fip import charger_tarifs
+from impayes import lire_impayes, agreger, en_retard
+from schema_annee import annee_valide
+from migrations import verifier_schema
+from instrumentation import CurseurInstrumente, connexion_ouverte
+
+
+# ===============================================================
+# 🔹 CONFIGURATION GLOBALE (OBLIGATOIRE ICI)
+# ===============================================================
+
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+
+
+def canonical_classe(raw):
+    """
+    Normalise toutes les classes Excel / utilisateur vers
+    les classes officielles du Complexe Scolaire THZ.
+
+    Exemples :
+    1°P, 1░P, 1 P  -> 1P
+    3°Sc, 3░SC    -> 3SC
+    1°Elctro      -> 1ELCTRO
+    7°EB          -> 7EB
+    """
+    if not raw:
+        return None
+
+    s = str(raw).upper().strip()
+
+    # Supprime symboles parasites : ° ░ espace / -
+    s = re.sub(r"[^A-Z0-9]", "", s)
+
+    # Corrections orthographiques connues
+    corrections = {
+        "ELCTRO": "ELCTRO",
+        "ELECTRO": "ELCTRO",
+        "SC": "SC",
+        "SCIENCE": "SC",
+        "LITTERATURE": "LIT",
+        "LITT": "LIT",
+        "CONS": "CONS",
+        "CONSTRUCTION": "CONS",
+    }
+
+    # Sépare numéro / section
+    match = re.match(r"^([0-9]+)([A-Z]+)$", s)
+    if not match:
+        return None
+
+    niveau, section = match.groups()
+
+    section = corrections.get(section, section)
+
+    classe_norm = f"{niveau}{section}"
+
+    # 🔒 LISTE BLANCHE (sécurité) — metier.CLASSES_VALIDES
+    return classe_norm if classe_norm in CLASSES_VALIDES else None
+
+
+#==================
+# PSYCOPG
+#==================
+
+def fetch_all(query, params=None):
+    conn = get_db_connection()
+    try:
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(query, params or ())
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def fetch_one(query, params=None):
+    conn = get_db_connection()
+    try:
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(query, params or ())
+            return cur.fetchone()
+    finally:
+        conn.close()
+
+
+
+# ===============================================================
+# 🔐 VARIABLES D’ENVIRONNEMENT — À DÉFINIR AVANT LES ROUTES
+# ===============================================================
+
+# =========================
+# MOTS DE PASSE ADMIN
+# =========================
+ADMIN_PASSWORDS = [
+    p.strip()
+    for p in os.environ.get("ADMIN_PASSWORDS", "").split(",")
+    if p.strip()
+]
+
+# =========================
+# MOTS DE PASSE COMPTABILITE
+# =========================
+COMPTA_PASSWORDS = [
+    p.strip()
+    for p in os.environ.get("COMPTA_PASSWORD", "").split(",")
+    if p.strip()
+    
+]
+
+# =========================
+# CLE SECRETE FLASK
+# =========================
+FLASK_SECRET_KEY = os.environ.get(
+    "FLASK_SECRET_KEY",
+    "BJ2KEL24"
+)
+
+
+
+def login_user(role):
+    session["role"] = role
+
+def logout_user():
+    session.pop("role", None)
+
+def current_role():
+    return session.get("role")
+
+#==============================
+# DÉCORATEURS DE SÉCURITÉ (PRO)
+#===============================
+
+def require_role(*roles):
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            role = session.get("role")
+            if role not in roles:
+                return redirect("/admin/login")
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
+    
+
+#==================
+# DÉCORATEURS API
+#==================
+
+def require_api_role(*roles):
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            role = session.get("role")
+            if role not in roles:
+                return jsonify({"error": "Unauthorized"}), 401
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+
+#==================
+# ANNÉE SCOLAIRE DEMANDÉE
+#==================
+
+ERREUR_ANNEE = "Année scolaire invalide (format : 2025-2026)"
+
+
+def _annee_invalide():
+    """
+    Interrompt la requête en 400 : corps JSON pour les routes /api/,
+    page d'erreur pour les pages HTML.
+    """
+    if request.path.startswith("/api/"):
+        abort(make_response(jsonify({"error": ERREUR_ANNEE}), 400))
+    abort(400, description=ERREUR_ANNEE)
+
+
+def annee_demandee():
+    """
+    ?annee=2025-2026 → "2025-2026" ; absent → année en cours.
+    Valeur invalide → 400 (JSON sur /api/).
+    """
+    annee = request.args.get("annee", "").strip()
+    if not annee:
+        return annee_en_cours()
+    if not annee_valide(annee):
+        _annee_invalide()
+    return annee
+
+
+def annees_demandees():
+    """
+    ?annee=2024-2025,2025-2026 → tuple trié ; ?annee=toutes → None ;
+    une seule année ou absent → comme annee_demandee().
+    Invalide → 400 (JSON sur /api/).
+    """
+    brut = request.args.get("annee", "").strip()
+    if brut.lower() == "toutes":
+        return None
+    if "," not in brut:
+        return (annee_demandee(),)
+    annees = tuple(sorted({a.strip() for a in brut.split(",") if a.strip()}))
+    if not annees or not all(annee_valide(a) for a in annees):
+        _annee_invalide()
+    return annees
+
+
+# Mois officiels : MOIS_SCOLAIRE (metier.py)
+
+
+
+# ===============================================================
+# 🔹 Connexion base de données (SQLite / PostgreSQL auto)
+# ===============================================================
+
+def get_db_connection():
+    """
+    Ouvre une connexion PostgreSQL sécurisée.
+    Compatible Render (SSL) et local.
+    """
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL manquant")
+
+    conn = psycopg.connect(
+        DATABASE_URL,
+        sslmode="require" if "render.com" in DATABASE_URL else "disable",
+        cursor_factory=CurseurInstrumente
+    )
+    connexion_ouverte()
+    return conn
+
+
+# Alias utilisé par les routes caisse / solde / dépenses
+get_conn = get_db_connection
+
+
+# ===============================================================
+# 🔹 Versions de données (invalidation des caches entre workers)
+# ===============================================================
+
+VERSIONS = VersionsDonnees(get_db_connection)
+
+
+# ===============================================================
+# 🔹 Contrôle du schéma au démarrage (migrations.py)
+# ===============================================================
+
+def verifier_schema_au_demarrage():
+    """
+    Signale les migrations en attente (MIGRATIONS_AUTO=1 : les applique).
+    N'empêche jamais le démarrage.
+    """
+    if not DATABASE_URL:
+        return
+
+    try:
+        conn = get_db_connection()
+        try:
+            attente = verifier_schema(
+                conn,
+                appliquer_auto=os.environ.get("MIGRATIONS_AUTO") == "1"
+            )
+        finally:
+            conn.close()
+
+        if attente:
+            print(
+                "⚠️ SCHÉMA EN RETARD — migrations en attente :",
+                ", ".join(f"{v:03d} {nom}" for v, nom, _ in attente),
+                "→ python migrations.py appliquer"
+            )
+
+    except Exception as e:
+        print("❌ CONTRÔLE SCHÉMA IMPOSSIBLE :", e)
+
+
+def chemin_pdf_versionne(nom, domaines):
+    """
+    Chemin temp/ d'un PDF suffixé par les versions des domaines utilisés.
+    Retourne (chemin, deja_genere) : tant que les données ne changent pas,
+    le PDF déjà généré est renvoyé sans requête ni rendu.
+    """
+    os.makedirs("temp", exist_ok=True)
+
+    sig = VERSIONS.signature(domaines)
+    if sig is None:
+        return f"temp/{nom}.pdf", False
+
+    path = f"temp/{nom}_v{'-'.join(str(v) for v in sig)}.pdf"
+    return path, os.path.exists(path)
+
+
+# ===============================================================
+# 🔵 1. Détermination FIP / FF mensuels selon classe
+# ===============================================================
+
+@VERSIONS.cache("tarif_fip")
+def tarifs_fip(annee, frais="fip"):
+    """
+    Tarifs de l'année : {classe canonique: FIP mensuel}
+    (frais="ff" : FF mensuel).
+    Une seule requête par worker tant que tarif_fip ne change pas.
+    """
+    conn = get_db_connection()
+    try:
+        return charger_tarifs(conn, annee, frais)
+    finally:
+        conn.close()
+
+
+def get_fip_par_classe(classe, annee=None, frais="fip"):
+    classe = canonical_classe(classe)
+    if not classe:
+        return 0
+
+    return tarifs_fip(annee or annee_en_cours(), frais).get(classe, 0)
+
+
+# ===============================================================
+# 🔵 2. Normalisation des mois
+# ===============================================================
+# canonical_month : metier.py (partagé avec les imports Excel)
+
+
+# ===============================================================
+# 🔵 3. Calcul FIP pour un élève
+# ===============================================================
+def calcul_fip_eleve(matricule, annee=None):
+    """
+    Calcule le FIP d'un élève pour une année scolaire
+    (par défaut : l'année en cours).
+    Fonction MÉTIER pure (aucun HTML).
+    """
+    return _calcul_fip_eleve(matricule, annee or annee_en_cours())
+
+
+@VERSIONS.cache("eleves", "paiements", "tarif_fip")
+def _calcul_fip_eleve(matricule, annee):
+    conn = get_db_connection()
+    cur = conn.cursor(row_factory=dict_row)
+
+    # Élève
+    cur.execute("""
+        SELECT id, matricule, nom, sexe, classe,
+               section, categorie, telephone
+        FROM eleves
+        WHERE LOWER(matricule)=LOWER(%s)
+        LIMIT 1
+    """, (matricule,))
+    eleve = cur.fetchone()
+
+    if not eleve:
+        conn.close()
+        return None
+
+    fip_mensuel = get_fip_par_classe(eleve["classe"], annee)
+    total_attendu = fip_mensuel * len(MOIS_SCOLAIRE)
+    ff_mensuel = get_fip_par_classe(eleve["classe"], annee, "ff")
+    total_attendu_ff = ff_mensuel * len(MOIS_SCOLAIRE)
+
+    # Paiements de l'année (index annee_scolaire, eleve_id) : FIP et FF
+    # dans la même lecture
+    cur.execute("""
+        SELECT mois, COALESCE(fip,0) AS fip, COALESCE(ff,0) AS ff
+        FROM paiements
+        WHERE annee_scolaire=%s
+          AND eleve_id=%s
+    """, (annee, eleve["id"]))
+    rows = cur.fetchall()
+    conn.close()
+
+    pay_by_month = {}
+    total_ff = 0.0
+
+    for r in rows:
+        mois = canonical_month(r["mois"])
+        if mois:
+            pay_by_month[mois] = pay_by_month.get(mois, 0) + float(r["fip"])
+            total_ff += float(r["ff"])
+
+    total_paye = 0
+    mois_payes, mois_non_payes = [], []
+
+    for m in MOIS_SCOLAIRE:
+        montant = pay_by_month.get(m, 0)
+        if montant == 0:
+            mois_non_payes.append(m)
+        else:
+            total_paye += montant
+            mois_payes.append(m if montant >= fip_mensuel else f"Ac.{m}")
+
+    return {
+       **eleve,
+       "annee_scolaire": annee,
+       "fip_mensuel": fip_mensuel,
+       "total_attendu": total_attendu,
+       "fip_total": round(total_paye, 2),
+       "solde_fip": round(total_attendu - total_paye, 2),
+       "mois_payes": mois_payes,
+       "mois_non_payes": mois_non_payes,
+       "ff_mensuel": ff_mensuel,
+       "total_attendu_ff": total_attendu_ff,
+       "ff_total": round(total_ff, 2),
+       "solde_ff": round(total_attendu_ff - total_ff, 2)
+    }
+
+
+# ===============================================================
+# 🔵 3bis. Fonctions utilitaires pour FIP par section et par mois
+# ===============================================================
+
+def mois_bruts(cur, annee, mois_voulus):
+    """
+    Valeurs brutes de paiements.mois (« Ac.Sept », « sept. »…) de l'année
+    dont la forme canonique est dans mois_voulus.
+    Permet de filtrer en SQL (mois = ANY(...)) sur l'index
+    (annee_scolaire, mois) au lieu de normaliser chaque paiement en Python.
+    """
+    cur.execute("""
+        SELECT DISTINCT mois
+        FROM paiements
+        WHERE annee_scolaire = %s
+    """, (annee,))
+    return [m for (m,) in cur.fetchall() if canonical_month(m) in mois_voulus]
+
+
+@VERSIONS.cache("eleves", "paiements")
+def serie_fip_sections(annee):
+    """
+    Série cumulée de l'année pour chaque section (1 requête, fenêtre SQL) :
+    {SECTION: [{"mois", "montant", "cumul"}, … Sept → Juin]}.
+    Sert tous les mois limites et le graphique.
+    """
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                WITH mois AS (
+                    SELECT m, rang
+                    FROM unnest(%(mois)s::text[]) WITH ORDINALITY AS t(m, rang)
+                ),
+                -- mois_canonique() : 1 appel par libellé distinct
+                libelles AS MATERIALIZED (
+                    SELECT d.mois, mo.rang
+                    FROM (
+                        SELECT DISTINCT mois
+                        FROM paiements
+                        WHERE annee_scolaire = %(annee)s
+                    ) d
+                    JOIN mois mo ON mo.m = mois_canonique(d.mois)
+                ),
+                par_mois AS (
+                    SELECT UPPER(e.section) AS section, l.rang,
+                           SUM(p.fip) AS montant
+                    FROM paiements p
+                    JOIN libelles l USING (mois)
+                    JOIN eleves e ON e.id = p.eleve_id
+                    WHERE p.annee_scolaire = %(annee)s
+                      AND p.fip > 0
+                      AND e.section IS NOT NULL
+                    GROUP BY 1, 2
+                )
+                SELECT s.section, mo.m,
+                       COALESCE(pm.montant, 0)::float,
+                       SUM(COALESCE(pm.montant, 0)) OVER (
+                           PARTITION BY s.section ORDER BY mo.rang
+                       )::float
+                FROM (SELECT DISTINCT section FROM par_mois) s
+                CROSS JOIN mois mo
+                LEFT JOIN par_mois pm
+                  ON pm.section = s.section AND pm.rang = mo.rang
+                ORDER BY s.section, mo.rang
+            """, {"annee": annee, "mois": MOIS_SCOLAIRE})
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    series = {}
+    for section, mois, montant, cumul in rows:
+        series.setdefault(section, []).append({
+            "mois": mois, "montant": round(montant, 2), "cumul": round(cumul, 2)
+        })
+    return series
+
+
+def calcul_fip_section(section, mois=None, annee=None):
+    """
+    Calcule le total FIP payé pour une section sur une année scolaire
+    (par défaut : l'année en cours).
+    Si mois est fourni, cumule jusqu'à ce mois inclus.
+    "serie" : série cumulée complète de la section (Sept → Juin).
+    """
+    mois_cible = canonical_month(mois) if mois else None
+    annee = annee or annee_en_cours()
+
+    serie = serie_fip_sections(annee).get(section.upper()) or [
+        {"mois": m, "montant": 0.0, "cumul": 0.0} for m in MOIS_SCOLAIRE
+    ]
+    jusqua = serie[:MOIS_SCOLAIRE.index(mois_cible) + 1] if mois_cible else serie
+
+    return {
+        "section": section.upper(),
+        "annee_scolaire": annee,
+        "mois_cible": mois_cible,
+        "mois_cumul": [p["mois"] for p in jusqua if p["montant"] > 0],
+        "total_paye": jusqua[-1]["cumul"],
+        "serie": serie
+    }
+
+
+
+def calcul_fip_par_mois(mois, annee=None):
+    """
+    Calcule le total FIP payé pour un mois donné d'une année scolaire
+    (par défaut : l'année en cours), avec détail par section.
+    """
+    mois_cible = canonical_month(mois)
+    if not mois_cible:
+        raise ValueError("Mois invalide")
+
+    annee = annee or annee_en_cours()
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    cur.execute("""
+        SELECT
+            e.section,
+            COALESCE(SUM(p.fip), 0)
+        FROM paiements p
+        JOIN eleves e ON p.eleve_id = e.id
+        WHERE p.annee_scolaire = %s
+          AND p.mois = ANY(%s::text[])
+        GROUP BY e.section
+    """, (annee, mois_bruts(cur, annee, [mois_cible])))
+
+    rows = cur.fetchall()
+    conn.close()
+
+    total_general = 0.0
+    details_sections = {}
+
+    for section, fip in rows:
+        montant = float(fip)
+        total_general += montant
+
+        section = section or "Non définie"
+        details_sections[section] = (
+            details_sections.get(section, 0.0) + montant
+        )
+
+    return {
+        "mois": mois_cible,
+        "annee_scolaire": annee,
+        "total_general": round(total_general, 2),
+        "details_sections": {
+            sec: round(val, 2)
+            for sec, val in details_sections.items()
+        }
+    }
+
+
+# ===============================================================
+# 🔵 3ter. Impayés de toute l'école
+# ===============================================================
+
+@VERSIONS.cache("eleves", "paiements", "tarif_fip")
+def calcul_impayes(annee, mois_limite):
+    """
+    Impayés de l'année jusqu'à mois_limite inclus (None : aucun mois dû) :
+    agrégats par groupe + élèves en retard, FIP ou FF (impayes.py).
+    Partagé entre requêtes : ne pas modifier le résultat.
+    """
+    nb_mois = MOIS_SCOLAIRE.index(mois_limite) + 1 if mois_limite else 0
+
+    eleves = []
+    if nb_mois:
+        conn = get_db_connection()
+        try:
+            eleves = lire_impayes(conn, annee, mois_limite)
+        finally:
+            conn.close()
+
+    return {
+        "annee_scolaire": annee,
+        "mois_limite": mois_limite,
+        "mois": MOIS_SCOLAIRE[:nb_mois],
+        "groupes": agreger(eleves, nb_mois),
+        "eleves": [e for e in eleves if en_retard(e)],
+    }
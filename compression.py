@@ -0,0 +1,142 @@
+"""
+compression.py — COMPRESSION DES RÉPONSES + JSON EN COLONNES
+
+✔ Brotli (module brotli, facultatif) ou gzip selon Accept-Encoding,
+  q=0 respecté ; sans Brotli installé : gzip seul
+✔ Seuil COMPRESSION_SEUIL octets (défaut 1024) : petites réponses en clair
+  (l'en-tête et le CPU coûtent plus que le gain)
+✔ Types texte seulement (JSON, HTML, CSS, JS, SVG, texte) : PDF et images
+  sont déjà compressés ; réponses streamées (SSE, fichiers) jamais
+  touchées
+✔ Format « colonnes » (?format=colonnes) pour les listes : noms de champs
+  une fois, lignes en tableaux (même forme que /api/mobile/sync)
+"""
+
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ======================================================
+# CONFIGURATION
+# ======================================================
+
+SEUIL = int(os.environ.get("COMPRESSION_SEUIL", "1024"))
+NIVEAU_GZIP = int(os.environ.get("COMPRESSION_NIVEAU_GZIP", "6"))
+# Qualité Brotli 4-5 : déjà mieux que gzip 6, pour un coût CPU voisin
+# (11 = fichiers statiques, beaucoup trop lent par requête)
+QUALITE_BROTLI = int(os.environ.get("COMPRESSION_QUALITE_BROTLI", "5"))
+
+TYPES = {
+    "application/json", "application/javascript", "text/html", "text/css",
+    "text/plain", "text/csv", "text/javascript", "image/svg+xml",
+}
+
+
+# ======================================================
+# NÉGOCIATION
+# ======================================================
+
+def _encodages_acceptes(entete):
+    """
+    Accept-Encoding → ensemble des encodages acceptés (q > 0).
+    """
+    acceptes = set()
+    for element in entete.lower().split(","):
+        nom, _, params = element.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if nom and q > 0:
+            acceptes.add(nom.strip())
+    return acceptes
+
+
+def choisir_encodage(entete):
+    """
+    "br", "gzip" ou None pour un en-tête Accept-Encoding.
+    """
+    acceptes = _encodages_acceptes(entete or "")
+    if brotli is not None and ("br" in acceptes or "*" in acceptes):
+        return "br"
+    if "gzip" in acceptes or "*" in acceptes:
+        return "gzip"
+    return None
+
+
+def compresser(corps, encodage):
+    if encodage == "br":
+        return brotli.compress(corps, quality=QUALITE_BROTLI)
+    return gzip.compress(corps, NIVEAU_GZIP)
+
+
+# ======================================================
+# MIDDLEWARE
+# ======================================================
+
+def _compresser_reponse(response):
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.mimetype not in TYPES
+        or "Content-Encoding" in response.headers
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+    ):
+        return response
+
+    # Le corps dépend d'Accept-Encoding (caches, proxys)
+    response.vary.add("Accept-Encoding")
+
+    corps = response.get_data()
+    if len(corps) < SEUIL:
+        return response
+
+    encodage = choisir_encodage(request.headers.get("Accept-Encoding"))
+    if encodage is None:
+        return response
+
+    response.set_data(compresser(corps, encodage))
+    response.headers["Content-Encoding"] = encodage
+    # Un ETag fort désigne la représentation non compressée
+    etag, faible = response.get_etag()
+    if etag and not faible:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def installer(app):
+    """
+    Active la compression des réponses de l'application.
+    """
+    app.after_request(_compresser_reponse)
+
+
+# ======================================================
+# JSON EN COLONNES
+# ======================================================
+
+def format_colonnes():
+    """
+    True si le client demande ?format=colonnes.
+    """
+    return request.args.get("format", "").strip().lower() == "colonnes"
+
+
+def en_colonnes(lignes):
+    """
+    Liste de dicts (mêmes clés) → (champs, lignes en tableaux).
+    """
+    if not lignes:
+        return [], []
+    champs = list(lignes[0])
+    return champs, [[ligne.get(c) for c in champs] for ligne in lignes]
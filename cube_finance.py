@@ -0,0 +1,387 @@
+"""
+cube_finance.py — CUBE FINANCIER (TABLE DE CUMULS + REQUÊTE PAR DIMENSIONS)
+
+✔ Table cube_paiements : FIP, FF et nombre de paiements cumulés par
+  (année, mois canonique, date de paiement, classe canonique, section,
+  catégorie) — quelques milliers de lignes au lieu de tous les paiements
+✔ Tenue à jour par triggers d'instruction (tables de transition) :
+  INSERT ajoute, DELETE retranche, UPDATE fait les deux ; changement de
+  classe / section / catégorie d'un élève : ses paiements changent de
+  case. 1 upsert par instruction, même pour un COPY
+✔ Normalisation mois / classe : 1 appel par libellé distinct du lot
+✔ lire_cube() : regroupement par n'importe quelles dimensions, mesures
+  fip, ff, nb, attendu (tarif × élèves × mois), solde (attendu − fip),
+  attendu_ff / solde_ff (même lecture que le FIP)
+✔ reconstruire_cube() : recalcul complet (contrôle, réparation)
+"""
+
+from psycopg import sql
+
+from metier import MOIS_SCOLAIRE
+from cumuls import cumuler, creer_triggers, union
+
+# Dimension demandée → colonne de cube_paiements
+DIMENSIONS = {
+    "annee": "annee_scolaire",
+    "mois": "mois",
+    "date": "datepaiement",
+    "classe": "classe",
+    "section": "section",
+    "categorie": "categorie",
+}
+
+MESURES = ("fip", "ff", "nb", "attendu", "solde", "attendu_ff", "solde_ff")
+
+# Mesures calculées depuis les tarifs (FIP et FF dans la même requête)
+_MESURES_TARIF = {"attendu", "solde", "attendu_ff", "solde_ff"}
+
+# Valeur absente dans la clé du cube (clé primaire : pas de NULL)
+SANS_DATE = "-infinity"
+
+
+# ======================================================
+# CUMUL D'UN LOT DE PAIEMENTS
+# ======================================================
+
+# {source} : lignes (annee_scolaire, mois, datepaiement, classe, section,
+# categorie, fip, ff, nb), montants déjà signés (+ ajout, − retrait)
+_LOT = """
+    WITH lot AS MATERIALIZED (
+        SELECT s.annee_scolaire,
+               COALESCE(s.mois, '') AS mois,
+               COALESCE(s.datepaiement, '-infinity'::date) AS datepaiement,
+               COALESCE(s.classe, '') AS classe,
+               COALESCE(s.section, '') AS section,
+               COALESCE(s.categorie, '') AS categorie,
+               SUM(COALESCE(s.fip, 0)) AS fip,
+               SUM(COALESCE(s.ff, 0)) AS ff,
+               SUM(s.nb) AS nb
+        FROM ({source}) s
+        GROUP BY 1, 2, 3, 4, 5, 6
+    ),
+    -- mois_canonique() / classe_canonique() : 1 appel par libellé distinct
+    mois_c AS MATERIALIZED (
+        SELECT mois, COALESCE(mois_canonique(mois), '') AS canon
+        FROM (SELECT DISTINCT mois FROM lot) d
+    ),
+    classe_c AS MATERIALIZED (
+        SELECT classe, COALESCE(classe_canonique(classe), '') AS canon
+        FROM (SELECT DISTINCT classe FROM lot) d
+    )
+    SELECT l.annee_scolaire, m.canon, l.datepaiement, k.canon,
+           l.section, l.categorie,
+           SUM(l.fip), SUM(l.ff), SUM(l.nb)
+    FROM lot l
+    JOIN mois_c m USING (mois)
+    JOIN classe_c k USING (classe)
+    GROUP BY 1, 2, 3, 4, 5, 6
+"""
+
+# Clé primaire de cube_paiements
+_CLE_CUBE = (
+    "annee_scolaire", "mois", "datepaiement", "classe", "section", "categorie"
+)
+
+_PAIEMENTS = """
+    SELECT p.annee_scolaire, p.mois, p.datepaiement,
+           e.classe, e.section, e.categorie,
+           {signe}p.fip AS fip, {signe}p.ff AS ff, {signe}1 AS nb
+    FROM {table} p
+    LEFT JOIN eleves e ON e.id = p.eleve_id
+"""
+
+# Colonnes d'un paiement qui comptent pour le cube
+_CLES = "eleve_id, annee_scolaire, mois, datepaiement, fip, ff"
+
+# Élèves dont la classe, la section ou la catégorie a changé
+_DEPLACES = """
+    SELECT p.annee_scolaire, p.mois, p.datepaiement,
+           x.classe, x.section, x.categorie,
+           {signe}p.fip AS fip, {signe}p.ff AS ff, {signe}1 AS nb
+    FROM anciennes a
+    JOIN nouvelles n USING (id)
+    JOIN {table} x ON x.id = a.id
+    JOIN paiements p ON p.eleve_id = a.id
+    WHERE (a.classe, a.section, a.categorie)
+          IS DISTINCT FROM (n.classe, n.section, n.categorie)
+"""
+
+
+def _cumuler(*sources):
+    return cumuler(
+        "cube_paiements", _CLE_CUBE, ("fip", "ff", "nb"),
+        _LOT.format(source=union(*sources))
+    )
+
+
+# ======================================================
+# SCHÉMA
+# ======================================================
+
+def init_cube_finance(conn):
+    """
+    Table cube_paiements, triggers sur paiements et eleves, remplissage
+    initial (idempotent).
+    """
+    with conn.cursor() as cur:
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS cube_paiements (
+                annee_scolaire TEXT NOT NULL,
+                mois           TEXT NOT NULL,
+                datepaiement   DATE NOT NULL,
+                classe         TEXT NOT NULL,
+                section        TEXT NOT NULL,
+                categorie      TEXT NOT NULL,
+                fip            NUMERIC NOT NULL DEFAULT 0,
+                ff             NUMERIC NOT NULL DEFAULT 0,
+                nb             BIGINT NOT NULL DEFAULT 0,
+                PRIMARY KEY (annee_scolaire, mois, datepaiement,
+                             classe, section, categorie)
+            );
+        """)
+        # Cases vidées par un retrait : supprimées sans parcourir le cube
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS cube_paiements_vides_idx
+            ON cube_paiements (annee_scolaire) WHERE nb = 0
+        """)
+
+        # ---------- paiements : INSERT / UPDATE / DELETE / TRUNCATE ----------
+        creer_triggers(
+            cur, "paiements", "cube_paiements", "cube_depuis_paiements",
+            "paiements_cube", _cumuler, _PAIEMENTS, _CLES
+        )
+
+        # ---------- eleves : changement de classe / section / catégorie ----------
+        deplacement = _cumuler(
+            _DEPLACES.format(signe="-", table="anciennes"),
+            _DEPLACES.format(signe="", table="nouvelles"),
+        )
+        cur.execute(f"""
+            CREATE OR REPLACE FUNCTION cube_depuis_eleves()
+            RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1
+                    FROM anciennes a
+                    JOIN nouvelles n USING (id)
+                    WHERE (a.classe, a.section, a.categorie)
+                          IS DISTINCT FROM (n.classe, n.section, n.categorie)
+                ) THEN
+                    {deplacement}
+                END IF;
+                RETURN NULL;
+            END
+            $$;
+        """)
+
+        # Un élève avec paiements ne peut pas être supprimé (clé étrangère) :
+        # seul UPDATE déplace des montants
+        cur.execute("DROP TRIGGER IF EXISTS eleves_cube_update ON eleves")
+        cur.execute("""
+            CREATE TRIGGER eleves_cube_update
+            AFTER UPDATE ON eleves
+            REFERENCING OLD TABLE AS anciennes NEW TABLE AS nouvelles
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION cube_depuis_eleves()
+        """)
+
+    reconstruire_cube(conn)
+
+
+def reconstruire_cube(conn):
+    """
+    Recalcule tout le cube depuis paiements (remplissage initial,
+    contrôle ou réparation). Verrouille paiements en écriture le temps
+    du calcul.
+    """
+    with conn.cursor() as cur:
+        cur.execute("LOCK TABLE paiements IN SHARE MODE")
+        cur.execute("DELETE FROM cube_paiements")
+        cur.execute(_cumuler(_PAIEMENTS.format(signe="", table="paiements")))
+    conn.commit()
+
+
+# ======================================================
+# LECTURE
+# ======================================================
+
+def _filtrer(filtres, annees):
+    """
+    (conditions SQL, paramètres) communes aux deux requêtes.
+    """
+    conditions, params = [], {}
+    if annees is not None:
+        conditions.append(sql.SQL("annee_scolaire = ANY(%(annees)s)"))
+        params["annees"] = list(annees)
+    if filtres.get("mois"):
+        conditions.append(sql.SQL("mois = %(mois)s"))
+        params["mois"] = filtres["mois"]
+    if filtres.get("classe"):
+        conditions.append(sql.SQL("classe = %(classe)s"))
+        params["classe"] = filtres["classe"]
+    for g in ("section", "categorie"):
+        if filtres.get(g):
+            conditions.append(sql.SQL("UPPER({}) = %({})s").format(
+                sql.Identifier(g), sql.SQL(g)
+            ))
+            params[g] = filtres[g].upper()
+    return conditions, params
+
+
+def _where(conditions):
+    if not conditions:
+        return sql.SQL("")
+    return sql.SQL("WHERE ") + sql.SQL(" AND ").join(conditions)
+
+
+def _group_by(colonnes):
+    if not colonnes:
+        return sql.SQL("")
+    return sql.SQL("GROUP BY ") + sql.SQL(", ").join(colonnes)
+
+
+def _lire_paiements(cur, dims, annees, filtres):
+    colonnes = [
+        sql.SQL("NULLIF(datepaiement, {})").format(sql.Literal(SANS_DATE))
+        if d == "date" else sql.Identifier(DIMENSIONS[d])
+        for d in dims
+    ]
+    conditions, params = _filtrer(filtres, annees)
+    if filtres.get("du"):
+        conditions.append(sql.SQL("datepaiement >= %(du)s"))
+        params["du"] = filtres["du"]
+    if filtres.get("au"):
+        conditions.append(sql.SQL("datepaiement <= %(au)s"))
+        params["au"] = filtres["au"]
+
+    cur.execute(sql.SQL("""
+        SELECT {colonnes}
+        FROM cube_paiements
+        {where}
+        {group_by}
+    """).format(
+        colonnes=sql.SQL(", ").join(colonnes + [sql.SQL(
+            # Sans dimension, 1 ligne même sur 0 case : sommes à 0, pas NULL
+            "COALESCE(SUM(fip), 0)::float, COALESCE(SUM(ff), 0)::float, "
+            "COALESCE(SUM(nb), 0)::bigint"
+        )]),
+        where=_where(conditions),
+        group_by=_group_by([sql.Literal(i + 1) for i in range(len(dims))]),
+    ), params)
+    return {tuple(r[:len(dims)]): r[len(dims):] for r in cur.fetchall()}
+
+
+def _lire_attendu(cur, dims, annees, filtres):
+    """
+    FIP et FF attendus : tarif mensuel × élèves actuels × mois du
+    périmètre (les élèves n'ont pas d'historique de classe).
+    """
+    mois = [filtres["mois"]] if filtres.get("mois") else MOIS_SCOLAIRE
+    colonnes = [
+        sql.SQL("m.mois") if d == "mois" else sql.Identifier(DIMENSIONS[d])
+        for d in dims
+    ]
+    conditions, params = _filtrer(
+        {k: v for k, v in filtres.items() if k != "mois"}, annees
+    )
+    params["liste_mois"] = mois
+
+    cur.execute(sql.SQL("""
+        WITH classes AS MATERIALIZED (
+            SELECT classe, COALESCE(classe_canonique(classe), '') AS canon
+            FROM (SELECT DISTINCT COALESCE(classe, '') AS classe FROM eleves) d
+        ),
+        effectifs AS (
+            SELECT k.canon AS classe,
+                   COALESCE(e.section, '') AS section,
+                   COALESCE(e.categorie, '') AS categorie,
+                   COUNT(*) AS nb
+            FROM eleves e
+            JOIN classes k ON k.classe = COALESCE(e.classe, '')
+            GROUP BY 1, 2, 3
+        ),
+        base AS (
+            SELECT t.annee_scolaire, f.classe, f.section, f.categorie,
+                   f.nb * t.fip_mensuel AS mensuel,
+                   f.nb * t.ff_mensuel AS mensuel_ff
+            FROM effectifs f
+            JOIN tarif_fip t ON t.classe = f.classe
+        )
+        SELECT {colonnes}
+        FROM base
+        {mois}
+        {where}
+        {group_by}
+    """).format(
+        colonnes=sql.SQL(", ").join(colonnes + [
+            sql.SQL("COALESCE(SUM({}), 0)::float").format(sql.Identifier(c))
+            if "mois" in dims else
+            sql.SQL("(COALESCE(SUM({}), 0) * {})::float").format(
+                sql.Identifier(c), sql.Literal(len(mois))
+            )
+            for c in ("mensuel", "mensuel_ff")
+        ]),
+        mois=sql.SQL(
+            "CROSS JOIN unnest(%(liste_mois)s::text[]) AS m(mois)"
+            if "mois" in dims else ""
+        ),
+        where=_where(conditions),
+        group_by=_group_by([sql.Literal(i + 1) for i in range(len(dims))]),
+    ), params)
+    return {tuple(r[:-2]): r[-2:] for r in cur.fetchall()}
+
+
+def _cle_tri(dims):
+    rang = {m: i for i, m in enumerate(MOIS_SCOLAIRE)}
+
+    def cle(ligne):
+        return tuple(
+            (rang.get(v, len(rang)), "") if d == "mois"
+            else (v is None, v if v is not None else "")
+            for d, v in zip(dims, ligne)
+        )
+    return cle
+
+
+def lire_cube(conn, dims, mesures, annees=None, filtres=None):
+    """
+    Lignes du cube regroupées par `dims` (clés de DIMENSIONS), avec les
+    `mesures` demandées (MESURES). annees=None : toutes les années.
+
+    filtres : mois (canonique), classe (canonique), section, categorie,
+    du / au (dates de paiement). Attendus et soldes : None si la date de
+    paiement est une dimension ou un filtre (le tarif est mensuel).
+
+    Retourne une liste de dicts triée par dimensions (mois dans l'ordre
+    scolaire), valeurs absentes (section vide, mois non reconnu) → None.
+    """
+    filtres = filtres or {}
+    avec_attendu = bool(_MESURES_TARIF & set(mesures)) and not (
+        "date" in dims or filtres.get("du") or filtres.get("au")
+    )
+
+    with conn.cursor() as cur:
+        payes = _lire_paiements(cur, dims, annees, filtres)
+        attendus = _lire_attendu(cur, dims, annees, filtres) if avec_attendu else {}
+
+    lignes = []
+    for cle in sorted(payes.keys() | attendus.keys(), key=_cle_tri(dims)):
+        fip, ff, nb = payes.get(cle, (0.0, 0.0, 0))
+        valeurs = {"fip": round(fip, 2), "ff": round(ff, 2), "nb": nb}
+        if _MESURES_TARIF & set(mesures):
+            attendu, attendu_ff = (
+                attendus.get(cle, (0.0, 0.0)) if avec_attendu else (None, None)
+            )
+            for m, a, paye in (("", attendu, fip), ("_ff", attendu_ff, ff)):
+                valeurs["attendu" + m] = None if a is None else round(a, 2)
+                valeurs["solde" + m] = None if a is None else round(a - paye, 2)
+
+        ligne = {d: (v if v != "" else None) for d, v in zip(dims, cle)}
+        if "date" in ligne and ligne["date"] is not None:
+            ligne["date"] = ligne["date"].isoformat()
+        ligne.update((m, valeurs[m]) for m in mesures)
+        lignes.append(ligne)
+    return lignes
@@ -0,0 +1,93 @@
+"""
+cumuls.py — TABLES DE CUMULS TENUES PAR TRIGGERS D'INSTRUCTION
+
+✔ cumuler() : upsert d'un lot de lignes signées (+ ajout, − retrait)
+  dans une table de cumuls ; cases vidées (nb = 0) supprimées
+✔ creer_triggers() : fonction plpgsql + triggers INSERT / UPDATE /
+  DELETE / TRUNCATE (tables de transition nouvelles / anciennes) ;
+  1 upsert par instruction, même pour un COPY ; instructions vides ou
+  sans effet sur les colonnes cumulées ignorées
+✔ Utilisé par cube_finance.py (paiements) et depenses.py (depense)
+"""
+
+
+def union(*sources):
+    return "\nUNION ALL\n".join(sources)
+
+
+def cumuler(table, cles, sommes, lot):
+    """
+    SQL qui ajoute à `table` les lignes de `lot` (requête : colonnes
+    `cles` puis `sommes`, 1 ligne par clé, montants signés).
+    La table a une colonne nb (nombre de lignes cumulées).
+    """
+    ajouts = ",\n        ".join(f"{s} = c.{s} + EXCLUDED.{s}" for s in sommes)
+    return f"""
+    INSERT INTO {table} AS c ({", ".join(cles + sommes)})
+    {lot}
+    ON CONFLICT ({", ".join(cles)})
+    DO UPDATE SET
+        {ajouts};
+    DELETE FROM {table} WHERE nb = 0;
+    """
+
+
+def creer_triggers(cur, table, table_cumuls, fonction, prefixe, cumul,
+                   source, colonnes):
+    """
+    Fonction `fonction` et triggers d'instruction `{prefixe}_insert`…
+    sur `table` qui tiennent `table_cumuls` à jour (idempotent).
+
+    cumul(*sources) : SQL qui cumule l'union des sources ;
+    source : SELECT des lignes signées, gabarit {signe} / {table} ;
+    colonnes : colonnes de `table` qui comptent pour les cumuls (un
+    UPDATE qui n'en change aucune ne coûte qu'une comparaison).
+    """
+    ajout = source.format(signe="", table="nouvelles")
+    retrait = source.format(signe="-", table="anciennes")
+
+    cur.execute(f"""
+        CREATE OR REPLACE FUNCTION {fonction}()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            -- Instructions vides ou sans effet sur les montants (upsert
+            -- en conflit, réimport à l'identique) : rien à cumuler
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM {table_cumuls};
+            ELSIF TG_OP = 'INSERT' THEN
+                IF EXISTS (SELECT 1 FROM nouvelles) THEN
+                    {cumul(ajout)}
+                END IF;
+            ELSIF TG_OP = 'UPDATE' THEN
+                IF EXISTS (
+                    SELECT {colonnes} FROM nouvelles
+                    EXCEPT ALL
+                    SELECT {colonnes} FROM anciennes
+                ) THEN
+                    {cumul(retrait, ajout)}
+                END IF;
+            ELSIF EXISTS (SELECT 1 FROM anciennes) THEN
+                {cumul(retrait)}
+            END IF;
+            RETURN NULL;
+        END
+        $$;
+    """)
+
+    for evenement, transition in (
+        ("INSERT", "REFERENCING NEW TABLE AS nouvelles"),
+        ("UPDATE", "REFERENCING OLD TABLE AS anciennes NEW TABLE AS nouvelles"),
+        ("DELETE", "REFERENCING OLD TABLE AS anciennes"),
+        ("TRUNCATE", ""),
+    ):
+        nom = f"{prefixe}_{evenement.lower()}"
+        cur.execute(f"DROP TRIGGER IF EXISTS {nom} ON {table}")
+        cur.execute(f"""
+            CREATE TRIGGER {nom}
+            AFTER {evenement} ON {table}
+            {transition}
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION {fonction}()
+        """)
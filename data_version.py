@@ -0,0 +1,359 @@
+"""
+data_version.py — VERSIONS DE DONNÉES PAR DOMAINE
+
+✔ 1 compteur par domaine (paiements, eleves, inscription, depense,
+  caisse_journaliere, tarif_fip)
+✔ Incrémenté par les imports et les routes d'écriture (même transaction)
+✔ NOTIFY PostgreSQL à chaque changement (canal data_version)
+✔ Lecture bon marché côté worker gunicorn (TTL court ou LISTEN)
+✔ Cache local invalidé précisément par domaine
+✔ attendre() : réveil des flux SSE au NOTIFY (routes/finance.py)
+"""
+
+import os
+import threading
+import time
+from functools import wraps
+
+
+# ======================================================
+# CONFIGURATION
+# ======================================================
+
+DOMAINES = (
+    "paiements",
+    "eleves",
+    "inscription",
+    "depense",
+    "caisse_journaliere",
+    "tarif_fip",
+)
+
+CANAL_NOTIFY = "data_version"
+
+# Durée (secondes) pendant laquelle un worker réutilise les versions lues
+TTL_LECTURE = float(os.environ.get("DATA_VERSION_TTL", "2"))
+
+# LISTEN/NOTIFY : les versions sont poussées au worker au lieu d'être relues
+ECOUTE_NOTIFY = os.environ.get("DATA_VERSION_LISTEN", "0") == "1"
+
+# Nombre maximal d'entrées par fonction mise en cache
+CACHE_MAX_ENTREES = int(os.environ.get("DATA_VERSION_CACHE_MAX", "512"))
+
+
+# ======================================================
+# SCHÉMA
+# ======================================================
+
+def init_data_version(conn):
+    """
+    Crée la table des versions (idempotent) et une ligne par domaine.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS data_version (
+                domaine TEXT PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0,
+                maj_le  TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+        """)
+        cur.execute("""
+            INSERT INTO data_version (domaine)
+            SELECT unnest(%s::text[])
+            ON CONFLICT (domaine) DO NOTHING;
+        """, (list(DOMAINES),))
+
+    conn.commit()
+
+
+# ======================================================
+# ÉCRITURE (IMPORTS + ROUTES)
+# ======================================================
+
+def bump_version(conn, *domaines):
+    """
+    Incrémente la version des domaines modifiés.
+
+    ⚠️ Ne fait PAS de commit : à appeler dans la transaction
+    d'écriture, la notification part au COMMIT (rien si ROLLBACK).
+    """
+    inconnus = set(domaines) - set(DOMAINES)
+    if inconnus:
+        raise ValueError(f"Domaine(s) inconnu(s) : {sorted(inconnus)}")
+
+    if not domaines:
+        return {}
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO data_version (domaine, version, maj_le)
+            SELECT d, 1, now()
+            FROM unnest(%s::text[]) AS d
+            ON CONFLICT (domaine) DO UPDATE SET
+                version = data_version.version + 1,
+                maj_le  = now()
+            RETURNING domaine, version;
+        """, (sorted(set(domaines)),))
+        versions = dict(cur.fetchall())
+
+        for domaine, version in versions.items():
+            cur.execute(
+                "SELECT pg_notify(%s, %s)",
+                (CANAL_NOTIFY, f"{domaine}:{version}")
+            )
+
+    return versions
+
+
+# ======================================================
+# LECTURE (WORKERS)
+# ======================================================
+
+class VersionsDonnees:
+    """
+    Vue locale (par worker) des versions de données.
+
+    - relue au plus toutes les TTL_LECTURE secondes
+    - ou tenue à jour par LISTEN si DATA_VERSION_LISTEN=1
+    - sûre après fork : tout l'état est recréé si le PID change
+    """
+
+    def __init__(self, connect, ttl=TTL_LECTURE, ecoute=ECOUTE_NOTIFY):
+        self._connect = connect
+        self._ttl = ttl
+        self._ecoute = ecoute
+        self._lock = threading.Lock()
+        self._changement = threading.Condition(self._lock)
+        self._caches = []
+        self._reinitialiser()
+
+    def _reinitialiser(self):
+        self._pid = os.getpid()
+        self._conn = None
+        self._schema_ok = False
+        self._versions = {}
+        self._lu_a = 0.0
+        self._thread = None
+
+    def _verifier_fork(self):
+        if self._pid != os.getpid():
+            self._reinitialiser()
+
+    # ---------- connexion dédiée (lecture seule) ----------
+
+    def _connexion(self):
+        if self._conn is None or self._conn.closed:
+            conn = self._connect()
+            if not self._schema_ok:
+                init_data_version(conn)
+                self._schema_ok = True
+            conn.autocommit = True
+            self._conn = conn
+        return self._conn
+
+    def _lire(self):
+        with self._connexion().cursor() as cur:
+            cur.execute("SELECT domaine, version FROM data_version")
+            return dict(cur.fetchall())
+
+    # ---------- API publique ----------
+
+    def versions(self):
+        """
+        Retourne {domaine: version}, ou None si la base est injoignable.
+        """
+        with self._lock:
+            self._verifier_fork()
+
+            if self._ecoute and self._thread is None:
+                self._demarrer_ecoute()
+
+            frais = (
+                self._ecoute_active()
+                or (time.monotonic() - self._lu_a) <= self._ttl
+            )
+            if self._versions and frais:
+                return self._versions
+
+            try:
+                self._versions = self._lire()
+                self._lu_a = time.monotonic()
+            except Exception as e:
+                print("❌ ERREUR LECTURE data_version :", e)
+                self._conn = None
+                self._versions = {}
+                return None
+
+            return self._versions
+
+    def signature(self, domaines):
+        """
+        Tuple des versions des domaines donnés (clé de cache),
+        ou None si les versions sont indisponibles (pas de cache).
+        """
+        versions = self.versions()
+        if versions is None:
+            return None
+        return tuple(versions.get(d, 0) for d in domaines)
+
+    def invalider(self):
+        """
+        Force la relecture au prochain accès (ex : après une écriture locale).
+        """
+        with self._lock:
+            self._lu_a = 0.0
+            if not self._ecoute_active():
+                self._versions = {}
+
+    def apres_fork(self):
+        """
+        Hook post-fork (gunicorn --preload) : le worker abandonne la
+        connexion et le thread LISTEN hérités du maître. Les caches
+        déjà calculés restent partagés (copy-on-write) : ils sont
+        validés par les versions relues au premier accès.
+        """
+        self._lock = threading.Lock()
+        self._changement = threading.Condition(self._lock)
+        self._reinitialiser()
+
+    def vider_caches(self):
+        """
+        Vide toutes les fonctions décorées par cache() (cache froid).
+        """
+        for entrees in self._caches:
+            entrees.clear()
+
+    def bump(self, conn, *domaines):
+        """
+        bump_version() + garantie que la table existe.
+        Appeler invalider() après le COMMIT de l'appelant.
+        """
+        with self._lock:
+            self._verifier_fork()
+            if not self._schema_ok:
+                self._connexion()
+
+        return bump_version(conn, *domaines)
+
+    def ecouter(self):
+        """
+        Démarre le thread LISTEN du worker (idempotent), même si
+        DATA_VERSION_LISTEN=0 : utilisé par les flux SSE.
+        """
+        with self._lock:
+            self._verifier_fork()
+            if not self._ecoute_active():
+                self._demarrer_ecoute()
+
+    def attendre(self, domaines, signature, delai):
+        """
+        Bloque jusqu'à ce que la signature des domaines diffère de
+        `signature` (nouvelle signature retournée) ou jusqu'au délai
+        (None). Réveil immédiat au NOTIFY si le thread LISTEN tourne,
+        sinon relecture toutes les TTL_LECTURE secondes.
+        """
+        fin = time.monotonic() + delai
+
+        while True:
+            actuelle = self.signature(domaines)
+            if actuelle is not None and actuelle != signature:
+                return actuelle
+
+            reste = fin - time.monotonic()
+            if reste <= 0:
+                return None
+
+            with self._lock:
+                if self._ecoute_active():
+                    locale = tuple(self._versions.get(d, 0) for d in domaines)
+                    if locale == signature or not self._versions:
+                        self._changement.wait(reste)
+                    continue
+
+            time.sleep(min(self._ttl, reste))
+
+    # ---------- LISTEN / NOTIFY ----------
+
+    def _ecoute_active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _demarrer_ecoute(self):
+        self._thread = threading.Thread(
+            target=self._boucle_ecoute,
+            name="data-version-listen",
+            daemon=True
+        )
+        self._thread.start()
+
+    def _boucle_ecoute(self):
+        """
+        Connexion LISTEN dédiée : chaque NOTIFY met à jour la version
+        du domaine sans requête supplémentaire. Reconnexion automatique.
+        """
+        while self._pid == os.getpid():
+            try:
+                # Connexion fermée à chaque sortie (erreur réseau ou autre)
+                with self._connect() as conn:
+                    conn.autocommit = True
+                    conn.execute(f"LISTEN {CANAL_NOTIFY}")
+
+                    # Resynchronisation complète après (re)connexion
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT domaine, version FROM data_version")
+                        with self._lock:
+                            self._versions = dict(cur.fetchall())
+                            self._lu_a = time.monotonic()
+                            self._changement.notify_all()
+
+                    while True:
+                        for n in conn.notifies(timeout=60):
+                            domaine, _, version = n.payload.partition(":")
+                            with self._lock:
+                                self._versions[domaine] = int(version)
+                                self._lu_a = time.monotonic()
+                                self._changement.notify_all()
+
+            except Exception as e:
+                print("❌ ERREUR LISTEN data_version :", e)
+                time.sleep(5)
+
+    # ---------- CACHE ----------
+
+    def cache(self, *domaines):
+        """
+        Décorateur : met en cache le résultat tant que les versions
+        des domaines indiqués sont inchangées.
+
+        Les arguments de la fonction doivent être hashables.
+        """
+        inconnus = set(domaines) - set(DOMAINES)
+        if inconnus:
+            raise ValueError(f"Domaine(s) inconnu(s) : {sorted(inconnus)}")
+
+        def decorator(f):
+            entrees = {}
+            self._caches.append(entrees)
+
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                sig = self.signature(domaines)
+                if sig is None:
+                    return f(*args, **kwargs)
+
+                cle = (args, tuple(sorted(kwargs.items())))
+                entree = entrees.get(cle)
+                if entree is not None and entree[0] == sig:
+                    return entree[1]
+
+                valeur = f(*args, **kwargs)
+
+                if len(entrees) >= CACHE_MAX_ENTREES:
+                    entrees.clear()
+                entrees[cle] = (sig, valeur)
+                return valeur
+
+            wrapper.cache_clear = entrees.clear
+            return wrapper
+
+        return decorator
+
@@ -0,0 +1,248 @@
+"""
+depenses.py — ANALYSE DES DÉPENSES (CATÉGORIES + CUMULS JOURNALIERS)
+
+✔ Colonne depense.categorie : libellé libre classé à l'import
+  (metier.categorie_depense) ; lignes existantes classées à la migration
+✔ Table depense_jour : caisse, banque et nombre de dépenses par
+  (année, jour, catégorie), tenue à jour par triggers d'instruction
+  (cumuls.py, comme le cube financier) ;
+  mois, années et catégories se lisent dans ces cumuls (quelques
+  milliers de lignes par année)
+✔ lire_analyse() : totaux par période (jour / mois / année) et par
+  catégorie, caisse et banque séparées, en une lecture (GROUPING SETS)
+✔ Reclassement après un changement des règles :
+  python depenses.py recategoriser
+"""
+
+import os
+import sys
+
+import psycopg
+
+from data_version import bump_version
+from cumuls import cumuler, creer_triggers, union
+from metier import categorie_depense, CATEGORIE_DEPENSE_DEFAUT
+
+# Période demandée → expression SQL sur depense_jour
+PERIODES = {
+    "jour": "date_depense::text",
+    "mois": "to_char(date_depense, 'YYYY-MM')",
+    "annee": "annee_scolaire",
+}
+
+
+# ======================================================
+# CUMUL D'UN LOT DE DÉPENSES
+# ======================================================
+
+# {source} : lignes (annee_scolaire, date_depense, categorie, montant,
+# banque, nb), montants déjà signés (+ ajout, − retrait).
+# Dépenses sans date : hors cumuls (l'import exige une date)
+_LOT = f"""
+    SELECT s.annee_scolaire, s.date_depense,
+           COALESCE(s.categorie, '{CATEGORIE_DEPENSE_DEFAUT}'),
+           SUM(COALESCE(s.montant, 0)), SUM(COALESCE(s.banque, 0)),
+           SUM(s.nb)
+    FROM ({{source}}) s
+    WHERE s.date_depense IS NOT NULL
+    GROUP BY 1, 2, 3
+"""
+
+_DEPENSES = """
+    SELECT annee_scolaire, date_depense, categorie,
+           {signe}montant AS montant, {signe}banque AS banque, {signe}1 AS nb
+    FROM {table}
+"""
+
+# Colonnes d'une dépense qui comptent pour les cumuls
+_CLES = "annee_scolaire, date_depense, categorie, montant, banque"
+
+
+def _cumuler(*sources):
+    return cumuler(
+        "depense_jour", ("annee_scolaire", "date_depense", "categorie"),
+        ("caisse", "banque", "nb"), _LOT.format(source=union(*sources))
+    )
+
+
+# ======================================================
+# SCHÉMA
+# ======================================================
+
+def init_depenses(conn):
+    """
+    Colonne depense.categorie (lignes existantes classées), table
+    depense_jour, triggers sur depense, remplissage initial (idempotent).
+    """
+    with conn.cursor() as cur:
+
+        cur.execute("ALTER TABLE depense ADD COLUMN IF NOT EXISTS categorie TEXT")
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS depense_jour (
+                annee_scolaire TEXT NOT NULL,
+                date_depense   DATE NOT NULL,
+                categorie      TEXT NOT NULL,
+                caisse         NUMERIC NOT NULL DEFAULT 0,
+                banque         NUMERIC NOT NULL DEFAULT 0,
+                nb             BIGINT NOT NULL DEFAULT 0,
+                PRIMARY KEY (annee_scolaire, date_depense, categorie)
+            );
+        """)
+        # Périodes à cheval sur plusieurs années (?du=&au=)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS depense_jour_date_idx
+            ON depense_jour (date_depense)
+        """)
+        # Cases vidées par un retrait : supprimées sans parcourir la table
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS depense_jour_vides_idx
+            ON depense_jour (annee_scolaire) WHERE nb = 0
+        """)
+
+    # Avant les triggers : le reclassement initial n'a rien à cumuler
+    recategoriser(conn)
+
+    with conn.cursor() as cur:
+        creer_triggers(
+            cur, "depense", "depense_jour", "depense_jour_depuis_depense",
+            "depense_jour", _cumuler, _DEPENSES, _CLES
+        )
+
+    reconstruire_cumuls(conn)
+
+
+def reconstruire_cumuls(conn):
+    """
+    Recalcule depense_jour depuis depense (remplissage initial, contrôle
+    ou réparation).
+    """
+    with conn.cursor() as cur:
+        cur.execute("LOCK TABLE depense IN SHARE MODE")
+        cur.execute("DELETE FROM depense_jour")
+        cur.execute(_cumuler(_DEPENSES.format(signe="", table="depense")))
+    conn.commit()
+
+
+def recategoriser(conn):
+    """
+    Classe toutes les dépenses selon les règles actuelles (1 calcul par
+    libellé distinct) ; les cumuls suivent par trigger.
+    Retourne le nombre de dépenses reclassées.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT DISTINCT libelle FROM depense")
+        libelles = [l for (l,) in cur.fetchall()]
+
+        cur.execute("""
+            UPDATE depense d
+            SET categorie = c.categorie
+            FROM unnest(%s::text[], %s::text[]) AS c(libelle, categorie)
+            WHERE d.libelle IS NOT DISTINCT FROM c.libelle
+              AND d.categorie IS DISTINCT FROM c.categorie
+        """, (libelles, [categorie_depense(l) for l in libelles]))
+        nb = cur.rowcount
+
+        if nb:
+            bump_version(conn, "depense")
+
+    conn.commit()
+    return nb
+
+
+# ======================================================
+# LECTURE
+# ======================================================
+
+def lire_analyse(conn, annees=None, du=None, au=None, grain="mois",
+                 categorie=None):
+    """
+    Dépenses de la période : annees (None : toutes), du / au (dates
+    incluses), categorie (une seule) ; grain : clé de PERIODES.
+
+    Retourne {"total": {...}, "periodes": [...], "categories": [...]} ;
+    chaque ligne : caisse, banque, total, nb ; catégories triées par
+    total décroissant avec leur part du total.
+    """
+    conditions, params = ["TRUE"], {}
+    if annees is not None:
+        conditions.append("annee_scolaire = ANY(%(annees)s)")
+        params["annees"] = list(annees)
+    if du:
+        conditions.append("date_depense >= %(du)s")
+        params["du"] = du
+    if au:
+        conditions.append("date_depense <= %(au)s")
+        params["au"] = au
+    if categorie:
+        conditions.append("categorie = %(categorie)s")
+        params["categorie"] = categorie
+
+    periode = PERIODES[grain]
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT {periode}, categorie,
+                   -- Ligne () rendue même sans dépense : sommes à 0
+                   COALESCE(SUM(caisse), 0)::float,
+                   COALESCE(SUM(banque), 0)::float,
+                   COALESCE(SUM(nb), 0)::bigint,
+                   GROUPING({periode}, categorie)
+            FROM depense_jour
+            WHERE {" AND ".join(conditions)}
+            GROUP BY GROUPING SETS (({periode}), (categorie), ())
+        """, params)
+        rangees = cur.fetchall()
+
+    total = {"caisse": 0.0, "banque": 0.0, "total": 0.0, "nb": 0}
+    periodes, categories = [], []
+    for cle_periode, cle_categorie, caisse, banque, nb, niveau in rangees:
+        ligne = {
+            "caisse": round(caisse, 2), "banque": round(banque, 2),
+            "total": round(caisse + banque, 2), "nb": nb,
+        }
+        if niveau == 1:
+            periodes.append({"periode": cle_periode, **ligne})
+        elif niveau == 2:
+            categories.append({"categorie": cle_categorie, **ligne})
+        else:
+            total = ligne
+
+    periodes.sort(key=lambda p: p["periode"])
+    categories.sort(key=lambda c: (-c["total"], c["categorie"]))
+    for c in categories:
+        c["part"] = round(c["total"] / total["total"], 4) if total["total"] else 0.0
+
+    return {"total": total, "periodes": periodes, "categories": categories}
+
+
+# ======================================================
+# MAIN
+# ======================================================
+
+USAGE = """Usage :
+  python depenses.py recategoriser    reclasse les dépenses (règles de metier.py)
+  python depenses.py reconstruire     recalcule les cumuls depense_jour
+"""
+
+if __name__ == "__main__":
+    DATABASE_URL = os.environ.get("DATABASE_URL")
+    if not DATABASE_URL:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+
+    args = sys.argv[1:]
+
+    with psycopg.connect(
+        DATABASE_URL,
+        sslmode="require" if "render.com" in DATABASE_URL else "disable"
+    ) as conn:
+
+        if args == ["recategoriser"]:
+            print(f"✅ {recategoriser(conn)} dépense(s) reclassée(s)")
+
+        elif args == ["reconstruire"]:
+            reconstruire_cumuls(conn)
+            print("✅ Cumuls depense_jour recalculés")
+
+        else:
+            print(USAGE)
+            sys.exit(1)
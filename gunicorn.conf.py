@@ -0,0 +1,58 @@
+"""
+gunicorn.conf.py — SERVEUR DE PRODUCTION (RENDER + LOCAL)
+
+  gunicorn -c gunicorn.conf.py server_flask:app
+
+✔ Workers gthread : un envoi SMTP ou un rendu PDF lent n'occupe qu'un
+  thread, les autres requêtes du worker continuent d'être servies
+  (E/S PostgreSQL et SMTP libèrent le GIL)
+✔ preload_app : server_flask importé une fois dans le maître,
+  mémoire partagée (copy-on-write) entre les workers
+✔ Hooks post-fork : server_flask.apres_fork (os.register_at_fork)
+✔ Recyclage des workers (max_requests) : mémoire bornée
+
+Réglages (variables d'environnement) :
+  WEB_CONCURRENCY        workers                     (défaut 2)
+  GUNICORN_THREADS       threads par worker          (défaut 8)
+  GUNICORN_WORKER_CLASS  gthread | sync              (défaut gthread)
+  GUNICORN_TIMEOUT       secondes par requête        (défaut 120)
+  GUNICORN_MAX_REQUESTS  recyclage d'un worker       (défaut 1000, 0 = jamais)
+  PORT                   port d'écoute               (défaut 8000)
+
+Dimensionnement (instance Render 512 Mo, ~60 Mo par worker chaud) :
+  2 workers × 8 threads = 16 requêtes simultanées. Augmenter les
+  threads avant les workers : les routes lentes attendent PostgreSQL
+  ou SMTP, pas le CPU. Chaque thread actif ouvre sa propre connexion
+  PostgreSQL : workers × threads ≤ connexions disponibles.
+  Flux SSE du dashboard finance : au plus SSE_MAX_FLUX (défaut 4)
+  threads par worker, + 1 connexion LISTEN par worker.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+# Imports Excel et PDF de classe : au-delà, le worker est relancé
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Connexions, thread LISTEN et compteurs sont déjà réinitialisés
+    # par server_flask.apres_fork (enregistré avec os.register_at_fork)
+    server.log.info(
+        f"worker {worker.pid} prêt ({worker_class}, {threads} threads)"
+    )
@@ -0,0 +1,211 @@
+"""
+impayes.py — IMPAYÉS DE TOUTE L'ÉCOLE (MOTEUR ENSEMBLISTE)
+
+✔ 1 requête pour toute l'année : paiements groupés par (élève, mois
+  canonique) jusqu'au mois limite, tarif de la classe, 1 ligne par
+  élève — aucune requête élève par élève
+✔ Normalisation SQL des mois et classes par libellé distinct (quelques
+  dizaines d'appels au lieu d'un par paiement)
+✔ Par élève : mois impayés (rien versé), mois partiels (acompte
+  inférieur au FIP mensuel, « Ac. »), reste dû par mois et au total
+✔ FF (frais de fonctionnement) dans la même passe : attendu, payé,
+  reste dû ; un élève est en retard s'il doit du FIP ou des FF
+✔ Agrégats par classe, section, catégorie et école : élèves en retard,
+  attendu, payé, reste dû (FIP et FF), reste dû FIP par mois
+✔ Sans Flask : le cache par version est dans commun.calcul_impayes
+"""
+
+from metier import MOIS_SCOLAIRE
+
+GROUPES = ("classe", "section", "categorie")
+
+# Colonnes de l'export CSV (une ligne par élève en retard)
+CHAMPS_CSV = [
+    "matricule", "nom", "classe", "section", "categorie", "fip_mensuel",
+    "attendu", "paye", "reste_du", "ff_mensuel", "attendu_ff", "paye_ff",
+    "reste_du_ff", "mois_impayes", "mois_partiels",
+]
+
+
+# ======================================================
+# PAR ÉLÈVE (SQL)
+# ======================================================
+
+def lire_impayes(conn, annee, mois_limite):
+    """
+    Tous les élèves avec leur situation de Sept à `mois_limite` inclus.
+
+    Retourne une liste de dicts : matricule, nom, classe, section,
+    categorie, fip_mensuel, attendu, paye, reste_du, reste_par_mois
+    (1 valeur par mois), ff_mensuel, attendu_ff, paye_ff, reste_du_ff,
+    mois_impayes, mois_partiels.
+    """
+    mois = MOIS_SCOLAIRE[:MOIS_SCOLAIRE.index(mois_limite) + 1]
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            WITH mois AS (
+                SELECT m, rang
+                FROM unnest(%(mois)s::text[]) WITH ORDINALITY AS t(m, rang)
+            ),
+            -- mois_canonique() / classe_canonique() : 1 appel par libellé
+            -- distinct (« Ac.Sept », « 4°CG »…), pas par ligne
+            -- (MATERIALIZED : le planificateur ne les remonte pas)
+            libelles AS MATERIALIZED (
+                SELECT d.mois, mo.rang
+                FROM (
+                    SELECT DISTINCT mois
+                    FROM paiements
+                    WHERE annee_scolaire = %(annee)s
+                ) d
+                JOIN mois mo ON mo.m = mois_canonique(d.mois)
+            ),
+            paye AS (
+                SELECT p.eleve_id, l.rang,
+                       SUM(COALESCE(p.fip, 0)) AS montant,
+                       SUM(COALESCE(p.ff, 0)) AS montant_ff
+                FROM paiements p
+                JOIN libelles l USING (mois)
+                WHERE p.annee_scolaire = %(annee)s
+                GROUP BY 1, 2
+            ),
+            paye_eleve AS (
+                SELECT eleve_id,
+                       array_agg(rang::int ORDER BY rang) AS rangs,
+                       array_agg(montant::float ORDER BY rang) AS montants,
+                       array_agg(montant_ff::float ORDER BY rang) AS montants_ff
+                FROM paye
+                GROUP BY 1
+            ),
+            tarif AS MATERIALIZED (
+                SELECT c.classe, t.fip_mensuel, t.ff_mensuel
+                FROM (SELECT DISTINCT classe FROM eleves) c
+                JOIN tarif_fip t
+                  ON t.annee_scolaire = %(annee)s
+                 AND t.classe = classe_canonique(c.classe)
+            )
+            SELECT e.matricule, e.nom, e.classe, e.section, e.categorie,
+                   COALESCE(t.fip_mensuel, 0)::float,
+                   COALESCE(t.ff_mensuel, 0)::float,
+                   COALESCE(pe.rangs, '{}'), COALESCE(pe.montants, '{}'),
+                   COALESCE(pe.montants_ff, '{}')
+            FROM eleves e
+            LEFT JOIN tarif t ON t.classe = e.classe
+            LEFT JOIN paye_eleve pe ON pe.eleve_id = e.id
+            ORDER BY e.classe, e.nom
+        """, {"annee": annee, "mois": mois})
+        rangees = cur.fetchall()
+
+    eleves = []
+    for (matricule, nom, classe, section, categorie, fip_mensuel,
+         ff_mensuel, rangs, montants, montants_ff) in rangees:
+        paye_par_mois = [0.0] * len(mois)
+        ff_par_mois = [0.0] * len(mois)
+        for rang, montant, montant_ff in zip(rangs, montants, montants_ff):
+            paye_par_mois[rang - 1] = montant
+            ff_par_mois[rang - 1] = montant_ff
+
+        reste, impayes, partiels = [], [], []
+        for m, v in zip(mois, paye_par_mois):
+            if v <= 0:
+                impayes.append(m)
+            elif v < fip_mensuel:
+                partiels.append(m)
+            reste.append(fip_mensuel - v if v < fip_mensuel else 0.0)
+        reste_ff = sum(max(ff_mensuel - v, 0.0) for v in ff_par_mois)
+
+        eleves.append({
+            "matricule": matricule, "nom": nom, "classe": classe,
+            "section": section, "categorie": categorie,
+            "fip_mensuel": fip_mensuel,
+            "attendu": round(fip_mensuel * len(mois), 2),
+            "paye": round(sum(paye_par_mois), 2),
+            "reste_du": round(sum(reste), 2),
+            "reste_par_mois": reste,
+            "ff_mensuel": ff_mensuel,
+            "attendu_ff": round(ff_mensuel * len(mois), 2),
+            "paye_ff": round(sum(ff_par_mois), 2),
+            "reste_du_ff": round(reste_ff, 2),
+            "mois_impayes": impayes,
+            "mois_partiels": partiels,
+        })
+    return eleves
+
+
+# ======================================================
+# AGRÉGATS
+# ======================================================
+
+# Montants additionnés tels quels d'un élève à son groupe
+_MONTANTS = ("attendu", "paye", "reste_du", "attendu_ff", "paye_ff", "reste_du_ff")
+
+
+def en_retard(eleve):
+    """
+    True si l'élève doit du FIP ou des FF.
+    """
+    return eleve["reste_du"] > 0 or eleve["reste_du_ff"] > 0
+
+
+def _nouveau(cle, nb_mois):
+    return {
+        "cle": cle, "eleves": 0, "en_retard": 0,
+        **{k: 0.0 for k in _MONTANTS},
+        "reste_par_mois": [0.0] * nb_mois,
+    }
+
+
+def _ajouter(agregat, eleve):
+    agregat["eleves"] += 1
+    for k in _MONTANTS:
+        agregat[k] += eleve[k]
+    if en_retard(eleve):
+        agregat["en_retard"] += 1
+    if eleve["reste_du"] > 0:
+        agregat["reste_par_mois"] = [
+            a + b for a, b in zip(agregat["reste_par_mois"], eleve["reste_par_mois"])
+        ]
+
+
+def _arrondir(agregat):
+    for k in _MONTANTS:
+        agregat[k] = round(agregat[k], 2)
+    agregat["reste_par_mois"] = [round(v, 2) for v in agregat["reste_par_mois"]]
+    return agregat
+
+
+def agreger(eleves, nb_mois):
+    """
+    {"ecole": agrégat, "classe": [...], "section": [...],
+    "categorie": [...]} ; groupes triés par reste dû (FIP + FF)
+    décroissant.
+    """
+    ecole = _nouveau("ECOLE", nb_mois)
+    groupes = {g: {} for g in GROUPES}
+
+    for e in eleves:
+        _ajouter(ecole, e)
+        for g in GROUPES:
+            cle = e[g] or "Non définie"
+            agregat = groupes[g].get(cle)
+            if agregat is None:
+                agregat = groupes[g][cle] = _nouveau(cle, nb_mois)
+            _ajouter(agregat, e)
+
+    resultat = {"ecole": _arrondir(ecole)}
+    for g, par_cle in groupes.items():
+        resultat[g] = sorted(
+            (_arrondir(a) for a in par_cle.values()),
+            key=lambda a: (-(a["reste_du"] + a["reste_du_ff"]), a["cle"])
+        )
+    return resultat
+
+
+def ligne_csv(eleve):
+    """
+    Ligne CSV d'un élève (listes de mois jointes par des virgules).
+    """
+    return [
+        ", ".join(eleve[c]) if isinstance(eleve[c], list) else eleve[c]
+        for c in CHAMPS_CSV
+    ]
@@ -1,9 +1,25 @@
+"""
+import_depenses_2026_pg.py — IMPORT CAISSE / DÉPENSES / OBSERVATIONS
+
+✔ Lecture du classeur DEPENSES (lire_excel)
+✔ Rapport d'erreurs CSV (ecrire_erreurs)
+✔ Insertion idempotente en base (inserer)
+✔ Dépenses classées par catégorie dès l'import (metier.categorie_depense)
+✔ Rapprochement caisse / paiements recalculé pour les années importées
+✔ Sans effet de bord à l'import (openpyxl chargé à la lecture,
+  DATABASE_URL vérifiée au lancement : python import_depenses_2026_pg.py)
+"""
+
 import psycopg
-from openpyxl import load_workbook
 from datetime import datetime
 import os
 import csv
 
+from data_version import init_data_version, bump_version
+from schema_annee import assurer_partitions
+from metier import categorie_depense
+from rapprochement import rapprocher
+
 # =====================================================
 # CONFIGURATION
 # =====================================================
@@ -34,11 +50,6 @@ COL_ANNEE    = 17  # Q
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
-if not DATABASE_URL:
-    raise ValueError(
-        "DATABASE_URL non définie. Vérifiez vos variables d'environnement."
-    )
-
 # =====================================================
 # OUTILS DE NETTOYAGE / VALIDATION
 # =====================================================
@@ -83,204 +94,246 @@ def parse_date_checked(value, row, errors):
 # LECTURE EXCEL
 # =====================================================
 
-caisse_rows = []
-depense_rows = []
-obs_rows = []
-errors = []
-
-if not os.path.exists(EXCEL_FILE):
-    raise FileNotFoundError(
-        f"Fichier introuvable : {EXCEL_FILE}"
-    )
-
-wb = load_workbook(EXCEL_FILE, data_only=True)
-ws = wb[SHEET_NAME]
-
+def lire_excel(excel_file=None):
+    """
+    Retourne (caisse_rows, depense_rows, obs_rows, errors).
+    """
+    excel_file = excel_file or EXCEL_FILE
 
-empty_date_count = 0
-caisse_dates_importees = set()
-for row in range(START_ROW, ws.max_row + 1):
+    caisse_rows = []
+    depense_rows = []
+    obs_rows = []
+    errors = []
 
-    date_cell = ws.cell(row=row, column=COL_DATE).value
-    date_op = parse_date_checked(date_cell, row, errors)
-
-    if not date_op:
-        empty_date_count += 1
-        if empty_date_count >= MAX_EMPTY_DATES:
-            break
-        continue
-    else:
-        empty_date_count = 0
-
-    annee = ws.cell(row=row, column=COL_ANNEE).value
-
-    if not annee:
-        errors.append((row, "ANNEE SCOLAIRE", None, "Année scolaire manquante"))
-        continue
-
-    ref_dp = str(ws.cell(row=row, column=COL_REF_DP).value or "").strip()
-    annee = str(annee).strip()
+    if not os.path.exists(excel_file):
+        raise FileNotFoundError(
+            f"Fichier introuvable : {excel_file}"
+        )
 
-   
+    from openpyxl import load_workbook
 
-    # =================================================
-    # CAISSE JOURNALIÈRE (UNE SEULE FOIS PAR JOUR)
-    # =================================================
+    wb = load_workbook(excel_file, data_only=True)
+    ws = wb[SHEET_NAME]
 
-    key = (date_op, annee)
+    empty_date_count = 0
+    caisse_dates_importees = set()
+    for row in range(START_ROW, ws.max_row + 1):
 
-    if key not in caisse_dates_importees:
-        vals = {}
+        date_cell = ws.cell(row=row, column=COL_DATE).value
+        date_op = parse_date_checked(date_cell, row, errors)
 
-        for name, col in {
-            "REPORT": COL_REPORT,
-            "BLOC1": COL_BLOC1,
-            "BLOC2": COL_BLOC2,
-            "BUS1": COL_BUS1,
-            "BUS2": COL_BUS2
-        }.items():
-            v = to_float_checked(ws.cell(row=row, column=col).value, row, name, errors)
-            if v is None:
+        if not date_op:
+            empty_date_count += 1
+            if empty_date_count >= MAX_EMPTY_DATES:
                 break
-            vals[name] = v
+            continue
         else:
-            caisse_rows.append((
+            empty_date_count = 0
+
+        annee = ws.cell(row=row, column=COL_ANNEE).value
+
+        if not annee:
+            errors.append((row, "ANNEE SCOLAIRE", None, "Année scolaire manquante"))
+            continue
+
+        ref_dp = str(ws.cell(row=row, column=COL_REF_DP).value or "").strip()
+        annee = str(annee).strip()
+
+        # =================================================
+        # CAISSE JOURNALIÈRE (UNE SEULE FOIS PAR JOUR)
+        # =================================================
+
+        key = (date_op, annee)
+
+        if key not in caisse_dates_importees:
+            vals = {}
+
+            for name, col in {
+                "REPORT": COL_REPORT,
+                "BLOC1": COL_BLOC1,
+                "BLOC2": COL_BLOC2,
+                "BUS1": COL_BUS1,
+                "BUS2": COL_BUS2
+            }.items():
+                v = to_float_checked(ws.cell(row=row, column=col).value, row, name, errors)
+                if v is None:
+                    break
+                vals[name] = v
+            else:
+                caisse_rows.append((
+                    date_op,
+                    vals["REPORT"],
+                    vals["BLOC1"],
+                    vals["BLOC2"],
+                    vals["BUS1"],
+                    vals["BUS2"],
+                    annee
+                ))
+                caisse_dates_importees.add(key)
+
+        # =================================================
+        # DÉPENSE (FIDÈLE À LA FORMULE EXCEL)
+        # Dépense réelle = MT DEP + BANQUE
+        # =================================================
+
+        mt_dep = to_float_checked(ws.cell(row=row, column=COL_MT_DP).value, row, "MT DEP", errors)
+        banque = to_float_checked(ws.cell(row=row, column=COL_BANQUE).value, row, "BANQUE", errors)
+
+        if mt_dep is not None and banque is not None:
+            if (mt_dep + banque) > 0:
+
+                libelle = ws.cell(row=row, column=COL_LB_DP).value
+                depense_rows.append((
+                    ref_dp,
+                    date_op,
+                    libelle,
+                    mt_dep,
+                    banque,
+                    annee,
+                    categorie_depense(libelle)
+                ))
+        # =================================================
+        # OBSERVATIONS
+        # =================================================
+
+        tt_obs = to_float_checked(ws.cell(row=row, column=COL_TT_OBS).value, row, "TT OBS", errors)
+        if tt_obs is not None and tt_obs > 0:
+            obs_rows.append((
                 date_op,
-                vals["REPORT"],
-                vals["BLOC1"],
-                vals["BLOC2"],
-                vals["BUS1"],
-                vals["BUS2"],
+                ws.cell(row=row, column=COL_LB_OBS).value,
+                tt_obs,
                 annee
             ))
-            caisse_dates_importees.add(key)
 
-    # =================================================
-    # DÉPENSE (FIDÈLE À LA FORMULE EXCEL)
-    # Dépense réelle = MT DEP + BANQUE
-    # =================================================
-
-    mt_dep = to_float_checked(ws.cell(row=row, column=COL_MT_DP).value, row, "MT DEP", errors)
-    banque = to_float_checked(ws.cell(row=row, column=COL_BANQUE).value, row, "BANQUE", errors)
-
-    if mt_dep is not None and banque is not None:
-        if (mt_dep + banque) > 0:
-            
-            depense_rows.append((
-                ref_dp,
-                date_op,
-                ws.cell(row=row, column=COL_LB_DP).value,
-                mt_dep,
-                banque,
-                annee
-            ))
-    # =================================================
-    # OBSERVATIONS
-    # =================================================
-
-    tt_obs = to_float_checked(ws.cell(row=row, column=COL_TT_OBS).value, row, "TT OBS", errors)
-    if tt_obs is not None and tt_obs > 0:
-        obs_rows.append((
-            date_op,
-            ws.cell(row=row, column=COL_LB_OBS).value,
-            tt_obs,
-            annee
-        ))
+    return caisse_rows, depense_rows, obs_rows, errors
 
 
 # =====================================================
 # RAPPORT D’ERREURS
 # =====================================================
 
-if errors:
-    with open(ERROR_FILE, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Ligne Excel", "Colonne", "Valeur", "Erreur"])
-        writer.writerows(errors)
+def ecrire_erreurs(errors):
+    if errors:
+        with open(ERROR_FILE, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Ligne Excel", "Colonne", "Valeur", "Erreur"])
+            writer.writerows(errors)
 
 
 # =====================================================
 # INSERT EN BASE (ROBUSTE)
 # =====================================================
 
-try:
-
-    with psycopg.connect(DATABASE_URL) as conn:
-        with conn.cursor() as cur:
-
-            # ==========================================
-            # CAISSE JOURNALIERE
-            # ==========================================
-            if caisse_rows:
-                cur.executemany("""
-                    INSERT INTO caisse_journaliere
-                    (date_operation, report, bloc1, bloc2, bus1, bus2, annee_scolaire)
-                    VALUES (%s,%s,%s,%s,%s,%s,%s)
-
-                    ON CONFLICT (date_operation, annee_scolaire)
-                    DO UPDATE SET
-                        report = EXCLUDED.report,
-                        bloc1  = EXCLUDED.bloc1,
-                        bloc2  = EXCLUDED.bloc2,
-                        bus1   = EXCLUDED.bus1,
-                        bus2   = EXCLUDED.bus2
-                """, caisse_rows)
-
-            # ==========================================
-            # DEPENSES
-            # ==========================================
-            if depense_rows:
-                cur.executemany("""
-                    INSERT INTO depense
-                    (ref_dp, date_depense, libelle, montant, banque, annee_scolaire)
-                    VALUES (%s,%s,%s,%s,%s,%s)
-
-                    ON CONFLICT (ref_dp, date_depense, annee_scolaire)
-                    DO UPDATE SET
-                        libelle = EXCLUDED.libelle,
-                        montant = EXCLUDED.montant,
-                        banque  = EXCLUDED.banque
-                """, depense_rows)
-
-            # ==========================================
-            # OBSERVATIONS
-            # ==========================================
-            if obs_rows:
-                cur.executemany("""
-                    INSERT INTO observation
-                    (date_operation, libelle, montant, annee_scolaire)
-                    VALUES (%s,%s,%s,%s)
-
-                    ON CONFLICT (date_operation, libelle, annee_scolaire)
-                    DO UPDATE SET
-                        montant = EXCLUDED.montant
-                """, obs_rows)
-
-            conn.commit()
-            
-# Journal d'import
-
-
-
-except Exception as e:
-    print(f"\nERREUR IMPORT : {e}")
-    raise
-   
-    
-    
+def inserer(caisse_rows, depense_rows, obs_rows):
+    if not DATABASE_URL:
+        raise ValueError(
+            "DATABASE_URL non définie. Vérifiez vos variables d'environnement."
+        )
+
+    try:
+
+        with psycopg.connect(DATABASE_URL) as conn:
+            init_data_version(conn)
+
+            # Partitions des années présentes dans le fichier (avant insertion)
+            assurer_partitions(conn, "caisse_journaliere", {r[6] for r in caisse_rows})
+            assurer_partitions(conn, "depense", {r[5] for r in depense_rows})
+
+            with conn.cursor() as cur:
+
+                # ==========================================
+                # CAISSE JOURNALIERE
+                # ==========================================
+                if caisse_rows:
+                    cur.executemany("""
+                        INSERT INTO caisse_journaliere
+                        (date_operation, report, bloc1, bloc2, bus1, bus2, annee_scolaire)
+                        VALUES (%s,%s,%s,%s,%s,%s,%s)
+
+                        ON CONFLICT (date_operation, annee_scolaire)
+                        DO UPDATE SET
+                            report = EXCLUDED.report,
+                            bloc1  = EXCLUDED.bloc1,
+                            bloc2  = EXCLUDED.bloc2,
+                            bus1   = EXCLUDED.bus1,
+                            bus2   = EXCLUDED.bus2
+                    """, caisse_rows)
+
+                # ==========================================
+                # DEPENSES
+                # ==========================================
+                if depense_rows:
+                    cur.executemany("""
+                        INSERT INTO depense
+                        (ref_dp, date_depense, libelle, montant, banque,
+                         annee_scolaire, categorie)
+                        VALUES (%s,%s,%s,%s,%s,%s,%s)
+
+                        ON CONFLICT (ref_dp, date_depense, annee_scolaire)
+                        DO UPDATE SET
+                            libelle   = EXCLUDED.libelle,
+                            montant   = EXCLUDED.montant,
+                            banque    = EXCLUDED.banque,
+                            categorie = EXCLUDED.categorie
+                    """, depense_rows)
+
+                # ==========================================
+                # OBSERVATIONS
+                # ==========================================
+                if obs_rows:
+                    cur.executemany("""
+                        INSERT INTO observation
+                        (date_operation, libelle, montant, annee_scolaire)
+                        VALUES (%s,%s,%s,%s)
+
+                        ON CONFLICT (date_operation, libelle, annee_scolaire)
+                        DO UPDATE SET
+                            montant = EXCLUDED.montant
+                    """, obs_rows)
+
+                # ==========================================
+                # VERSIONS (caches des workers Flask)
+                # ==========================================
+                bump_version(conn, "caisse_journaliere", "depense")
+
+                conn.commit()
+
+            # Rapprochement des années importées : données déjà validées,
+            # un échec ici (migration 010 absente…) n'annule pas l'import
+            annees = {r[6] for r in caisse_rows} | {r[5] for r in depense_rows}
+            try:
+                for annee in sorted(annees):
+                    rapprocher(conn, annee)
+            except Exception as e:
+                conn.rollback()
+                print(f"\n⚠️ ERREUR RAPPROCHEMENT (import conservé) : {e}")
+                print("   Relancer : python rapprochement.py toutes")
+
+    except Exception as e:
+        print(f"\nERREUR IMPORT : {e}")
+        raise
 
 
 # =====================================================
 # RÉSUMÉ
 # =====================================================
 
-print(" Import terminé (version corrigée & fidèle Excel)")
-print(f"   - Caisse journalière : {len(caisse_rows)} lignes")
-print(f"   - Dépenses : {len(depense_rows)} lignes")
-print(f"   - Observations : {len(obs_rows)} lignes")
+def main():
+    caisse_rows, depense_rows, obs_rows, errors = lire_excel()
+    ecrire_erreurs(errors)
+    inserer(caisse_rows, depense_rows, obs_rows)
+
+    print(" Import terminé (version corrigée & fidèle Excel)")
+    print(f"   - Caisse journalière : {len(caisse_rows)} lignes")
+    print(f"   - Dépenses : {len(depense_rows)} lignes")
+    print(f"   - Observations : {len(obs_rows)} lignes")
+
+    if errors:
+        print(f" {len(errors)} erreurs détectées")
+        print(f" Voir : {ERROR_FILE}")
+    else:
+        print(" Aucune erreur détectée")
+
 
-if errors:
-    print(f" {len(errors)} erreurs détectées")
-    print(f" Voir : {ERROR_FILE}")
-else:
-    print(" Aucune erreur détectée")
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,10 @@ import_excel_pg.py — VERSION STRICTE MÉTIER (DATE OBLIGATOIRE)
 ✔ Import BLOQUÉ si DatePaiement absente/invalide
 ✔ Bug Excel date corrigé (respect du type date)
 ✔ Compatible Python 3.13 / Render / Local
+✔ Un paiement par élève / mois / année : les lignes d'un mois déjà
+  payé sous un autre reçu sont ignorées et listées
+✔ Sans effet de bord à l'import (openpyxl chargé à la lecture,
+  DATABASE_URL vérifiée au lancement de l'import)
 """
 
 import os
@@ -15,7 +19,10 @@ import re
 from datetime import datetime, date
 
 import psycopg
-from openpyxl import load_workbook
+
+from data_version import init_data_version, bump_version
+from metier import mois_unique
+from schema_annee import annee_de_ligne, assurer_partitions
 
 # ======================================================
 # CONFIGURATION
@@ -25,9 +32,6 @@ EXCEL_FILE = "THZBD2526GA.xlsx"
 DATABASE_URL = os.environ.get("DATABASE_URL")
 HEADER_LINE = 8
 
-if not DATABASE_URL:
-    raise RuntimeError("❌ DATABASE_URL non définie")
-
 REQUIRED_COLS = [
     "Matricule", "Nom", "Sexe", "Classe", "Categorie", "Section",
     "Telephone", "Email", "NumRecu", "Mois",
@@ -83,6 +87,8 @@ def matricule_valide(m):
 def charger_excel_strict():
     log("Lecture et validation stricte du fichier Excel…")
 
+    from openpyxl import load_workbook
+
     wb = load_workbook(EXCEL_FILE, data_only=True, read_only=True)
     ws = wb.active
 
@@ -128,6 +134,7 @@ def charger_excel_strict():
             )
 
         r["DatePaiement"] = date_paiement
+        r["AnneeScolaire"] = annee_de_ligne(r["AnneeScolaire"], date_paiement)
         r["FIP"] = to_float(r["FIP"])
         r["FF"] = to_float(r["FF"])
 
@@ -141,6 +148,11 @@ def charger_excel_strict():
 # ======================================================
 
 def inserer_donnees(lignes, conn):
+    init_data_version(conn)
+
+    # Partitions des années présentes dans le fichier (avant insertion)
+    assurer_partitions(conn, "paiements", {r["AnneeScolaire"] for r in lignes})
+
     conn.autocommit = False
 
     with conn.cursor() as cur:
@@ -174,13 +186,31 @@ def inserer_donnees(lignes, conn):
         cur.execute("SELECT id, matricule FROM eleves")
         eleve_ids = {m: i for i, m in cur.fetchall()}
 
+        # ---------- MOIS DÉJÀ PAYÉS (contrainte 1 paiement / mois) ----------
+        cur.execute("""
+            SELECT eleve_id, mois_unique, annee_scolaire, numrecu
+            FROM paiements
+            WHERE mois_unique IS NOT NULL
+              AND annee_scolaire = ANY(%s)
+        """, (sorted({r["AnneeScolaire"] for r in lignes}),))
+        deja_payes = {(e, m, a): n for e, m, a, n in cur.fetchall()}
+
         # ---------- PAIEMENTS ----------
         paiements = []
+        ignores = []
         for r in lignes:
             eid = eleve_ids.get(r["Matricule"])
             if not eid:
                 continue
 
+            # Même mois payé sous un autre reçu (guichet ou doublon Excel)
+            cle = (eid, mois_unique(r["Mois"]), r["AnneeScolaire"])
+            if cle[1]:
+                recu = deja_payes.setdefault(cle, r["NumRecu"])
+                if recu != r["NumRecu"]:
+                    ignores.append((r["Matricule"], r["Mois"], r["NumRecu"], recu))
+                    continue
+
             paiements.append((
                 eid,
                 r["NumRecu"],
@@ -199,16 +229,23 @@ def inserer_donnees(lignes, conn):
                 obs, jour, datepaiement, annee_scolaire
             )
             VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            ON CONFLICT (numrecu) DO UPDATE SET
+            ON CONFLICT (numrecu, annee_scolaire) DO UPDATE SET
                 mois=EXCLUDED.mois,
                 fip=EXCLUDED.fip,
                 ff=EXCLUDED.ff,
                 obs=EXCLUDED.obs,
                 jour=EXCLUDED.jour,
-                datepaiement=EXCLUDED.datepaiement,
-                annee_scolaire=EXCLUDED.annee_scolaire;
+                datepaiement=EXCLUDED.datepaiement;
         """, paiements)
 
+    if ignores:
+        log(f"⚠️ {len(ignores)} paiement(s) ignoré(s) : mois déjà payé")
+        for matricule, mois, recu, existant in ignores[:20]:
+            log(f"   {matricule} {mois} reçu {recu} (déjà payé : reçu {existant})")
+
+    # ---------- VERSIONS (caches des workers Flask) ----------
+    bump_version(conn, "eleves", "paiements")
+
     conn.commit()
 
 # ======================================================
@@ -216,6 +253,9 @@ def inserer_donnees(lignes, conn):
 # ======================================================
 
 def run_import():
+    if not DATABASE_URL:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+
     log("=== DÉBUT IMPORT (MODE STRICT DATE) ===")
 
     lignes = charger_excel_strict()
@@ -7,6 +7,8 @@ IMPORT INSCRIPTION — VERSION PRODUCTION V5 (STABLE)
 ✔ Nettoyage Excel robuste
 ✔ Gestion catégories + section
 ✔ Compatible Flask (importer_inscriptions)
+✔ Sans effet de bord à l'import (openpyxl chargé à la lecture,
+  DATABASE_URL vérifiée au lancement de l'import)
 """
 
 import os
@@ -17,7 +19,8 @@ import csv
 from datetime import datetime, date
 
 import psycopg
-from openpyxl import load_workbook
+
+from data_version import init_data_version, bump_version
 
 # ======================================================
 # CONFIG
@@ -27,9 +30,6 @@ EXCEL_FILE = "INSC_THZ2526.xlsx"
 DATABASE_URL = os.environ.get("DATABASE_URL")
 HEADER_LINE = 8
 
-if not DATABASE_URL:
-    raise RuntimeError("❌ DATABASE_URL non définie")
-
 REQUIRED_COLS = [
     "Num", "Matricule", "NumRecu", "Telephone", "Sexe", "Categorie",
     "Nom", "Classe", "Finsc", "Jour", "Mois", "DateInsc",
@@ -201,6 +201,8 @@ def init_db(conn):
 def charger_excel():
     log("Lecture Excel...")
 
+    from openpyxl import load_workbook
+
     wb = load_workbook(EXCEL_FILE, data_only=True, read_only=True)
     ws = wb.active
 
@@ -285,10 +287,17 @@ def charger_excel():
 # ======================================================
 
 def inserer_donnees_copy(lignes, conn):
-   
+    """
+    Remplace le contenu de inscription : TRUNCATE, COPY et version
+    dans une seule transaction (table remplacée en entier ou intacte).
+    """
+
+    init_data_version(conn)
 
     with conn.cursor() as cur:
 
+        cur.execute("TRUNCATE TABLE inscription RESTART IDENTITY CASCADE;")
+
         buffer = io.StringIO()
         writer = csv.writer(buffer)
 
@@ -331,6 +340,9 @@ def inserer_donnees_copy(lignes, conn):
 
             copy.write(buffer.read())
 
+    # Versions (caches des workers Flask)
+    bump_version(conn, "inscription")
+
     conn.commit()
 
 # ======================================================
@@ -339,31 +351,27 @@ def inserer_donnees_copy(lignes, conn):
 
 def importer_inscriptions():
 
+    if not DATABASE_URL:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+
     log("=== IMPORT INSCRIPTION ===")
 
     try:
         # 1. Charger Excel
         lignes = charger_excel()
 
-        # 2. Nettoyage
-        log("Nettoyage table...")
-        with psycopg.connect(DATABASE_URL) as conn:
-            with conn.cursor() as cur:
-                cur.execute("TRUNCATE TABLE inscription RESTART IDENTITY CASCADE;")
-            conn.commit()
-
-        # 3. Import rapide
-        log("Insertion des données...")
+        # 2. Nettoyage + import rapide (même transaction)
+        log("Remplacement des données...")
         with psycopg.connect(DATABASE_URL) as conn:
             inserer_donnees_copy(lignes, conn)
 
-        # 4. Historique succès
+        # 3. Historique succès
         log_import(len(lignes), "SUCCES")
 
         log("✅ IMPORT TERMINÉ")
 
     except Exception as e:
-        # 5. Historique erreur
+        # 4. Historique erreur
         log_import(0, "ECHEC", str(e))
 
         log("❌ IMPORT ÉCHOUÉ")
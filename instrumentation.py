@@ -0,0 +1,330 @@
+"""
+instrumentation.py — MESURES PAR REQUÊTE (LATENCE, SQL, PDF)
+
+✔ Histogramme de latence par route (règle Flask, pas l'URL brute)
+✔ Temps base de données vs temps Python par requête
+✔ Nombre de requêtes SQL et de connexions ouvertes par requête
+✔ Temps de rendu des PDF (reportlab)
+✔ /metrics au format texte Prometheus
+✔ Journal des requêtes lentes avec leur SQL
+
+⚠️ Les compteurs sont en mémoire : chaque worker gunicorn expose les siens.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+import psycopg
+from flask import g, request, session, has_request_context, Response
+
+import journal_sql
+
+# ======================================================
+# CONFIGURATION
+# ======================================================
+
+# Au-delà de ce seuil, la requête est journalisée avec son SQL
+SEUIL_LENT_MS = float(os.environ.get("REQUETE_LENTE_MS", "1000"))
+
+# Jeton d'accès à /metrics (scraper Prometheus) ; sinon session admin
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Requêtes SQL conservées par requête HTTP (journal des lentes)
+MAX_SQL_PAR_REQUETE = 50
+
+BUCKETS_DUREE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_NOMBRE = (1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+METRIQUES = {
+    "thz_http_requete_duree_secondes": (
+        "histogram", "Durée totale de la requête HTTP"),
+    "thz_http_requetes_total": (
+        "counter", "Requêtes HTTP traitées"),
+    "thz_sql_duree_secondes": (
+        "histogram", "Temps passé dans PostgreSQL par requête HTTP"),
+    "thz_python_duree_secondes": (
+        "histogram", "Temps hors PostgreSQL par requête HTTP"),
+    "thz_sql_requetes_par_requete": (
+        "histogram", "Requêtes SQL exécutées par requête HTTP"),
+    "thz_db_connexions_total": (
+        "counter", "Connexions PostgreSQL ouvertes"),
+    "thz_pdf_rendu_secondes": (
+        "histogram", "Durée de rendu reportlab (doc.build)"),
+    "thz_requetes_lentes_total": (
+        "counter", "Requêtes HTTP au-delà du seuil REQUETE_LENTE_MS"),
+}
+
+
+# ======================================================
+# REGISTRE (MÉMOIRE DU PROCESSUS)
+# ======================================================
+
+class Registre:
+    """
+    Compteurs et histogrammes étiquetés, exportés au format Prometheus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._compteurs = {}
+        self._histogrammes = {}
+
+    def incrementer(self, nom, etiquettes, n=1):
+        cle = (nom, tuple(sorted(etiquettes.items())))
+        with self._lock:
+            self._compteurs[cle] = self._compteurs.get(cle, 0) + n
+
+    def observer(self, nom, etiquettes, valeur, buckets=BUCKETS_DUREE):
+        cle = (nom, tuple(sorted(etiquettes.items())))
+        with self._lock:
+            h = self._histogrammes.get(cle)
+            if h is None:
+                h = self._histogrammes[cle] = {
+                    "buckets": buckets,
+                    "compte": [0] * (len(buckets) + 1),
+                    "somme": 0.0,
+                }
+            h["compte"][bisect_left(buckets, valeur)] += 1
+            h["somme"] += valeur
+
+    def exporter(self):
+        with self._lock:
+            compteurs = dict(self._compteurs)
+            histogrammes = {
+                k: {**h, "compte": list(h["compte"])}
+                for k, h in self._histogrammes.items()
+            }
+
+        lignes = []
+        for nom, (type_, aide) in METRIQUES.items():
+            lignes.append(f"# HELP {nom} {aide}")
+            lignes.append(f"# TYPE {nom} {type_}")
+
+            for (n, etiquettes), valeur in sorted(compteurs.items()):
+                if n == nom:
+                    lignes.append(f"{nom}{_etiquettes(etiquettes)} {valeur}")
+
+            for (n, etiquettes), h in sorted(histogrammes.items()):
+                if n != nom:
+                    continue
+                cumul = 0
+                for borne, c in zip(h["buckets"], h["compte"]):
+                    cumul += c
+                    lignes.append(
+                        f"{nom}_bucket{_etiquettes(etiquettes, le=borne)} {cumul}"
+                    )
+                cumul += h["compte"][-1]
+                lignes.append(f"{nom}_bucket{_etiquettes(etiquettes, le='+Inf')} {cumul}")
+                lignes.append(f"{nom}_sum{_etiquettes(etiquettes)} {h['somme']:.6f}")
+                lignes.append(f"{nom}_count{_etiquettes(etiquettes)} {cumul}")
+
+        return "\n".join(lignes) + "\n"
+
+
+def _etiquettes(etiquettes, **extra):
+    paires = list(etiquettes) + [(k, v) for k, v in extra.items()]
+    if not paires:
+        return ""
+    echappe = (
+        lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+    return "{" + ",".join(f'{k}="{echappe(v)}"' for k, v in paires) + "}"
+
+
+REGISTRE = Registre()
+
+
+def apres_fork():
+    """
+    Hook post-fork : chaque worker repart de compteurs vides.
+    """
+    REGISTRE.__init__()
+
+
+# ======================================================
+# MESURE DE LA REQUÊTE EN COURS
+# ======================================================
+
+def _mesure():
+    if not has_request_context():
+        return None
+    return g.get("_mesure")
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else "<aucune>"
+
+
+def enregistrer_sql(query, duree, cur=None):
+    """
+    Ajoute une requête SQL exécutée à la mesure de la requête HTTP.
+    Hors requête HTTP (imports, threads) : ignoré.
+    """
+    m = _mesure()
+    if m is None:
+        return
+    m["sql_s"] += duree
+    m["nb_sql"] += 1
+    if len(m["sql"]) < MAX_SQL_PAR_REQUETE:
+        m["sql"].append((duree, query, cur))
+
+
+def connexion_ouverte():
+    """
+    À appeler à chaque psycopg.connect() (get_db_connection).
+    """
+    m = _mesure()
+    if m is not None:
+        m["nb_conn"] += 1
+    if has_request_context():
+        REGISTRE.incrementer("thz_db_connexions_total", {"route": _route()})
+
+
+class CurseurInstrumente(psycopg.Cursor):
+    """
+    cursor_factory de get_db_connection() : chronomètre execute().
+    (Curseur client : le résultat est déjà reçu à la fin d'execute.)
+    Chaque requête réussie passe aussi par journal_sql (empreintes,
+    plans des requêtes lentes).
+    """
+
+    def execute(self, query, params=None, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            resultat = super().execute(query, params, **kwargs)
+        finally:
+            duree = time.perf_counter() - t0
+            enregistrer_sql(query, duree, self)
+
+        journal_sql.observer(
+            query, params, duree, self,
+            route=_route() if has_request_context() else None
+        )
+        return resultat
+
+    def executemany(self, query, params_seq, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            resultat = super().executemany(query, params_seq, **kwargs)
+        finally:
+            duree = time.perf_counter() - t0
+            enregistrer_sql(query, duree, self)
+
+        journal_sql.observer(
+            query, None, duree, self,
+            route=_route() if has_request_context() else None,
+            plan_possible=False
+        )
+        return resultat
+
+
+@contextmanager
+def mesure_pdf(rapport):
+    """
+    with mesure_pdf("rapport_classe"): doc.build(elements)
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        duree = time.perf_counter() - t0
+        REGISTRE.observer("thz_pdf_rendu_secondes", {"rapport": rapport}, duree)
+        m = _mesure()
+        if m is not None:
+            m["pdf_s"] += duree
+
+
+# ======================================================
+# BRANCHEMENT SUR L'APPLICATION FLASK
+# ======================================================
+
+def _debut_requete():
+    g._mesure = {
+        "t0": time.perf_counter(),
+        "sql_s": 0.0,
+        "nb_sql": 0,
+        "nb_conn": 0,
+        "pdf_s": 0.0,
+        "sql": [],
+    }
+
+
+def _statut_reponse(response):
+    m = g.get("_mesure")
+    if m is not None:
+        m["statut"] = response.status_code
+    return response
+
+
+def _fin_requete(exc=None):
+    """
+    teardown_request : appelé même si la vue lève une exception
+    (statut 500 faute de réponse).
+    """
+    m = g.pop("_mesure", None)
+    if m is None:
+        return
+
+    total = time.perf_counter() - m["t0"]
+    route = _route()
+    etiquettes = {"route": route, "methode": request.method}
+    statut = 500 if exc is not None else m.get("statut", 500)
+
+    REGISTRE.observer("thz_http_requete_duree_secondes", etiquettes, total)
+    REGISTRE.incrementer(
+        "thz_http_requetes_total", {**etiquettes, "statut": statut}
+    )
+    REGISTRE.observer("thz_sql_duree_secondes", {"route": route}, m["sql_s"])
+    REGISTRE.observer(
+        "thz_python_duree_secondes", {"route": route}, max(total - m["sql_s"], 0)
+    )
+    REGISTRE.observer(
+        "thz_sql_requetes_par_requete", {"route": route}, m["nb_sql"], BUCKETS_NOMBRE
+    )
+
+    if total * 1000 >= SEUIL_LENT_MS:
+        REGISTRE.incrementer("thz_requetes_lentes_total", {"route": route})
+        journaliser_lente(m, total, statut)
+
+
+def journaliser_lente(m, total, statut):
+    print(
+        f"🐢 REQUÊTE LENTE {request.method} {request.full_path.rstrip('?')} "
+        f"→ {statut} en {total * 1000:.0f} ms "
+        f"(SQL {m['sql_s'] * 1000:.0f} ms / {m['nb_sql']} requêtes, "
+        f"{m['nb_conn']} connexions, PDF {m['pdf_s'] * 1000:.0f} ms)"
+    )
+    for duree, query, cur in sorted(m["sql"], key=lambda x: x[0], reverse=True)[:10]:
+        sql = " ".join(journal_sql.texte_sql(query, cur).split())
+        print(f"   {duree * 1000:8.1f} ms  {sql[:300]}")
+
+
+def metrics():
+    """
+    GET /metrics — format texte Prometheus 0.0.4.
+    """
+    jeton = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    autorise = (
+        (METRICS_TOKEN and jeton == METRICS_TOKEN)
+        or session.get("role") == "admin"
+    )
+    if not autorise:
+        return Response("Unauthorized\n", status=401, mimetype="text/plain")
+
+    return Response(
+        REGISTRE.exporter(),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def installer(app):
+    """
+    Active les mesures sur l'application et expose /metrics.
+    """
+    app.before_request(_debut_requete)
+    app.after_request(_statut_reponse)
+    app.teardown_request(_fin_requete)
+    app.add_url_rule("/metrics", "metrics", metrics)
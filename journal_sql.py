@@ -0,0 +1,251 @@
+"""
+journal_sql.py — EMPREINTES SQL + JOURNAL DES REQUÊTES LENTES
+
+✔ Empreinte normalisée de chaque requête (littéraux, nombres,
+  paramètres et listes IN remplacés par ?) → les variantes des
+  requêtes construites en f-string sont regroupées
+✔ Compteur, temps total et temps max par empreinte (/admin/sql_stats)
+✔ Au-delà de SQL_LENTE_MS : plan EXPLAIN (ANALYZE, BUFFERS) capturé
+  dans un fichier JSON lines local (analyse hors ligne)
+✔ ANALYZE uniquement pour les SELECT sans effet de bord ;
+  EXPLAIN simple pour les écritures ; au plus un plan par empreinte
+  toutes les SQL_EXPLAIN_INTERVALLE secondes
+
+Usage :
+  python journal_sql.py [fichier]    résumé du journal (par empreinte)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+import psycopg
+from psycopg import sql as psql
+
+# ======================================================
+# CONFIGURATION
+# ======================================================
+
+SEUIL_LENTE_MS = float(os.environ.get("SQL_LENTE_MS", "200"))
+INTERVALLE_EXPLAIN = float(os.environ.get("SQL_EXPLAIN_INTERVALLE", "600"))
+EXPLAIN_ACTIF = os.environ.get("SQL_EXPLAIN", "1") == "1"
+FICHIER_JOURNAL = os.environ.get(
+    "SQL_LENTES_FICHIER", os.path.join("logs", "requetes_lentes.jsonl")
+)
+
+# Nombre maximal d'empreintes suivies par processus
+MAX_EMPREINTES = 1000
+
+_RE_COMMENTAIRE = re.compile(r"--[^\n]*")
+_RE_CHAINE = re.compile(r"'(?:[^']|'')*'")
+_RE_NOMBRE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_PARAM = re.compile(r"%s|%\(\w+\)s|\$\d+")
+_RE_LISTE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+# Instructions dont le plan peut être demandé
+_RE_EXPLICABLE = re.compile(r"^\s*(select|with|insert|update|delete)\b", re.I)
+# Effets de bord : EXPLAIN ANALYZE ré-exécuterait la requête
+_RE_EFFET_DE_BORD = re.compile(
+    r"\b(insert|update|delete|pg_\w+|nextval|setval|set_config)\b"
+    r"|\bfor\s+(update|share)\b",
+    re.I
+)
+
+
+# ======================================================
+# EMPREINTES
+# ======================================================
+
+def empreinte(texte):
+    """
+    SQL normalisé : mêmes requêtes, valeurs différentes → même empreinte.
+    """
+    s = _RE_COMMENTAIRE.sub(" ", texte)
+    s = _RE_CHAINE.sub("?", s)
+    s = _RE_PARAM.sub("?", s)
+    s = _RE_NOMBRE.sub("?", s)
+    s = _RE_LISTE.sub("(?)", s)
+    return " ".join(s.split())
+
+
+def cle_empreinte(fp):
+    return hashlib.md5(fp.encode()).hexdigest()[:12]
+
+
+def texte_sql(query, cur=None):
+    if isinstance(query, str):
+        return query
+    if isinstance(query, bytes):
+        return query.decode(errors="replace")
+    try:
+        return query.as_string(cur)
+    except Exception:
+        return repr(query)
+
+
+_lock = threading.Lock()
+_stats = {}
+_dernier_plan = {}
+
+
+def statistiques(limite=50):
+    """
+    Empreintes triées par temps total décroissant.
+    """
+    with _lock:
+        lignes = [dict(s, cle=k) for k, s in _stats.items()]
+
+    lignes.sort(key=lambda s: s["total_ms"], reverse=True)
+    for s in lignes:
+        s["moyenne_ms"] = round(s["total_ms"] / s["n"], 2)
+        s["total_ms"] = round(s["total_ms"], 2)
+        s["max_ms"] = round(s["max_ms"], 2)
+    return lignes[:limite]
+
+
+# ======================================================
+# OBSERVATION (APPELÉE PAR LE CURSEUR INSTRUMENTÉ)
+# ======================================================
+
+def observer(query, params, duree, cur, route=None, plan_possible=True):
+    """
+    Comptabilise la requête ; au-delà du seuil, capture son plan.
+    Ne lève jamais d'exception (le journal ne doit pas casser la route).
+    """
+    try:
+        texte = texte_sql(query, cur)
+        fp = empreinte(texte)
+        cle = cle_empreinte(fp)
+        ms = duree * 1000
+        lente = ms >= SEUIL_LENTE_MS
+
+        with _lock:
+            s = _stats.get(cle)
+            if s is None:
+                if len(_stats) >= MAX_EMPREINTES:
+                    return
+                s = _stats[cle] = {
+                    "empreinte": fp, "n": 0, "total_ms": 0.0,
+                    "max_ms": 0.0, "lentes": 0,
+                }
+            s["n"] += 1
+            s["total_ms"] += ms
+            s["max_ms"] = max(s["max_ms"], ms)
+            s["lentes"] += lente
+
+            capturer = (
+                lente
+                and time.monotonic() - _dernier_plan.get(cle, -INTERVALLE_EXPLAIN)
+                >= INTERVALLE_EXPLAIN
+            )
+            if capturer:
+                _dernier_plan[cle] = time.monotonic()
+
+        if not capturer:
+            return
+
+        plan = None
+        if EXPLAIN_ACTIF and plan_possible and _RE_EXPLICABLE.match(texte):
+            plan = expliquer(cur.connection, query, params, texte)
+
+        ecrire({
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "cle": cle,
+            "empreinte": fp,
+            "duree_ms": round(ms, 2),
+            "route": route,
+            "sql": texte[:4000],
+            "params": repr(params)[:1000] if params is not None else None,
+            "plan": plan,
+        })
+
+    except Exception as e:
+        print("❌ ERREUR JOURNAL SQL :", e)
+
+
+def expliquer(conn, query, params, texte):
+    """
+    Plan de la requête sur la même connexion, dans un SAVEPOINT
+    (un échec d'EXPLAIN n'affecte pas la transaction de la route).
+    """
+    options = (
+        "EXPLAIN (ANALYZE, BUFFERS) "
+        if not _RE_EFFET_DE_BORD.search(texte)
+        else "EXPLAIN "
+    )
+    requete = (
+        options + query
+        if isinstance(query, str)
+        else psql.SQL(options) + query
+    )
+
+    try:
+        with conn.transaction():
+            with psycopg.Cursor(conn) as cur:
+                cur.execute(requete, params)
+                return "\n".join(r[0] for r in cur.fetchall())
+    except Exception as e:
+        return f"EXPLAIN impossible : {e}"
+
+
+_lock_fichier = threading.Lock()
+
+
+def apres_fork():
+    """
+    Hook post-fork : statistiques et verrous propres au worker.
+    """
+    global _lock, _lock_fichier
+    _lock = threading.Lock()
+    _lock_fichier = threading.Lock()
+    _stats.clear()
+    _dernier_plan.clear()
+
+
+def ecrire(entree):
+    dossier = os.path.dirname(FICHIER_JOURNAL)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    with _lock_fichier, open(FICHIER_JOURNAL, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entree, ensure_ascii=False) + "\n")
+
+
+# ======================================================
+# MAIN (RÉSUMÉ DU JOURNAL)
+# ======================================================
+
+if __name__ == "__main__":
+    fichier = sys.argv[1] if len(sys.argv) > 1 else FICHIER_JOURNAL
+
+    if not os.path.exists(fichier):
+        print(f"Aucun journal : {fichier}")
+        sys.exit(0)
+
+    par_cle = {}
+    with open(fichier, encoding="utf-8") as f:
+        for ligne in f:
+            e = json.loads(ligne)
+            r = par_cle.setdefault(e["cle"], {"entrees": [], "routes": set()})
+            r["entrees"].append(e)
+            if e.get("route"):
+                r["routes"].add(e["route"])
+
+    for cle, r in sorted(
+        par_cle.items(),
+        key=lambda kv: max(e["duree_ms"] for e in kv[1]["entrees"]),
+        reverse=True
+    ):
+        dernier = r["entrees"][-1]
+        print("=" * 70)
+        print(f"{cle}  {len(r['entrees'])} capture(s)  "
+              f"max {max(e['duree_ms'] for e in r['entrees'])} ms  "
+              f"routes : {', '.join(sorted(r['routes'])) or '-'}")
+        print(dernier["empreinte"][:500])
+        if dernier.get("plan"):
+            print("-" * 70)
+            print(dernier["plan"])
@@ -3,6 +3,11 @@ import smtplib
 
 from email.message import EmailMessage
 
+# Serveur SMTP (Gmail par défaut ; serveur local pour bench.charge)
+SMTP_HOTE = os.getenv("MAIL_SMTP_HOTE", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("MAIL_SMTP_PORT", "587"))
+SMTP_TLS = os.getenv("MAIL_SMTP_TLS", "1") == "1"
+
 
 def envoyer_mail(destinataire,
                  copie,
@@ -102,23 +107,25 @@ def envoyer_mail(destinataire,
             print("⚠ Aucun PDF joint")
 
         # =====================================================
-        # CONNEXION SMTP GMAIL
+        # CONNEXION SMTP (GMAIL PAR DÉFAUT)
         # =====================================================
 
         with smtplib.SMTP(
-                "smtp.gmail.com",
-                587,
+                SMTP_HOTE,
+                SMTP_PORT,
                 timeout=30
         ) as smtp:
 
             # Initialisation SMTP
             smtp.ehlo()
 
-            # Activation TLS
-            smtp.starttls()
+            if SMTP_TLS:
 
-            # Réinitialisation EHLO après TLS
-            smtp.ehlo()
+                # Activation TLS
+                smtp.starttls()
+
+                # Réinitialisation EHLO après TLS
+                smtp.ehlo()
 
             # Authentification Gmail
             smtp.login(
@@ -0,0 +1,182 @@
+"""
+metier.py — RÈGLES MÉTIER PARTAGÉES
+
+✔ Sans Flask, sans base de données
+✔ Importable par le serveur, les imports Excel et les scripts de schéma
+"""
+
+import re
+import unicodedata
+from datetime import date
+
+
+# ======================================================
+# CLASSES OFFICIELLES (LISTE BLANCHE)
+# ======================================================
+
+CLASSES_VALIDES = {
+    # Maternelle
+    "1M","2M","3M",
+
+    # Primaire
+    "1P","2P","3P","4P","5P","6P",
+
+    # Secondaire EB
+    "7EB","8EB",
+
+    # Secondaire Humanités
+    "1HP","1SC","1LIT","1EL","1TCC","1CG","1MG","1ELCTRO","1CONS",
+    "2HP","2SC","2LIT","2EL","2TCC","2CG","2MG",
+    "3HP","3SC","3LIT","3EL","3TCC","3CG","3MG",
+    "4HP","4SC","4LIT","4EL","4TCC","4CG","4MG",
+}
+
+
+def annee_scolaire_from_date(d: date) -> str:
+    """
+    Règle métier officielle :
+    - avant le 06 septembre → année N-1/N
+    - à partir du 06 septembre → année N/N+1
+    """
+    if d.month < 9 or (d.month == 9 and d.day < 6):
+        return f"{d.year-1}-{d.year}"
+    return f"{d.year}-{d.year+1}"
+
+
+def annees_autour(du: date, au: date = None) -> list:
+    """
+    Années scolaires où peuvent être rangés les paiements datés du…au :
+    année de la date ± 1 (l'import garde l'année Excel : reçus de début
+    septembre, paiements anticipés). Élagage des partitions sans perte.
+    """
+    debut = int(annee_scolaire_from_date(du)[:4]) - 1
+    fin = int(annee_scolaire_from_date(au or du)[:4]) + 1
+    return [f"{a}-{a + 1}" for a in range(debut, fin + 1)]
+
+
+def annee_en_cours() -> str:
+    """
+    Année scolaire du jour (valeur par défaut des calculs et dashboards).
+    """
+    return annee_scolaire_from_date(date.today())
+
+
+# ======================================================
+# MOIS SCOLAIRES
+# ======================================================
+
+# Mois officiels (facturés), dans l'ordre de l'année scolaire
+MOIS_SCOLAIRE = [
+    "Sept", "Oct", "Nov", "Dec", "Janv", "Fevr",
+    "Mars", "Avr", "Mai", "Juin"
+]
+
+# Mois civil → mois scolaire (juillet → 5 septembre : année terminée)
+_MOIS_CIVILS = {
+    9: "Sept", 10: "Oct", 11: "Nov", 12: "Dec", 1: "Janv", 2: "Fevr",
+    3: "Mars", 4: "Avr", 5: "Mai", 6: "Juin",
+}
+
+
+def mois_echu(annee, jour=None):
+    """
+    Dernier mois scolaire dû à la date `jour` (défaut : aujourd'hui)
+    pour l'année `annee` : le mois en cours pour l'année du jour,
+    Juin pour une année passée, None pour une année à venir.
+    """
+    jour = jour or date.today()
+    courante = annee_scolaire_from_date(jour)
+    if annee == courante:
+        if jour.month in (7, 8) or (jour.month == 9 and jour.day < 6):
+            return "Juin"
+        return _MOIS_CIVILS[jour.month]
+    return "Juin" if annee < courante else None
+
+def canonical_month(m_raw):
+    """
+    Nettoie et normalise les mois venant d'Excel ou DB.
+    Retourne un mois officiel ou None.
+    """
+    if not m_raw:
+        return None
+
+    s = str(m_raw).lower().strip()
+    s = re.sub(r'^(ac|sld)[\.\-\s/]*', '', s)
+    s = s.replace(".", "").replace(",", "")
+
+    mapping = {
+        "sept": "Sept", "oct": "Oct", "nov": "Nov",
+        "dec": "Dec", "janv": "Janv",
+        "fev": "Fevr", "févr": "Fevr",
+        "mars": "Mars", "avr": "Avr",
+        "mai": "Mai", "juin": "Juin",
+    }
+
+    for k, v in mapping.items():
+        if k in s:
+            return v
+
+    return None
+
+
+def mois_unique(m_raw):
+    """
+    Clé « un paiement par mois » (colonne paiements.mois_unique) :
+    le mois canonique, ou None pour un acompte / solde (Ac. Sept,
+    Sld Sept), qui partagent légitimement leur mois.
+    """
+    if not m_raw or re.match(r"^(ac|sld)", str(m_raw).lower().strip()):
+        return None
+    return canonical_month(m_raw)
+
+
+# ======================================================
+# CATÉGORIES DE DÉPENSES (LIBELLÉS LIBRES)
+# ======================================================
+
+# Catégorie → débuts de mots du libellé normalisé (majuscules, sans
+# accents). Première catégorie trouvée dans l'ordre de la liste.
+CATEGORIES_DEPENSE = [
+    ("SALAIRES ET PRIMES", ("SALAIRE", "PRIME", "ENSEIGNANT",
+                            "HONORAIRE", "INDEMNITE")),
+    ("CARBURANT", ("CARBURANT", "ESSENCE", "GASOIL", "GAZOIL", "DIESEL",
+                   "LUBRIFIANT")),
+    ("ENTRETIEN ET REPARATIONS", ("ENTRETIEN", "REPARATION", "MAINTENANCE",
+                                  "PEINTURE", "PLOMBERIE", "NETTOYAGE",
+                                  "MECANIQUE", "PNEU")),
+    ("FOURNITURES", ("FOURNITURE", "PAPIER", "RAME", "CRAIE", "MARQUEUR",
+                     "STYLO", "ENCRE", "IMPRESSION", "PHOTOCOPIE", "CAHIER")),
+    ("ALIMENTATION", ("NOURRITURE", "ALIMENTATION", "REPAS", "RESTAURATION",
+                      "MINERALE")),
+    ("EAU ET ELECTRICITE", ("ELECTRICITE", "SNEL", "EAU", "REGIDESO",
+                            "COURANT", "ELECTROGENE")),
+    ("COMMUNICATION", ("CREDIT", "INTERNET", "TELEPHONE", "UNITE", "FORFAIT")),
+    ("TRANSPORT", ("TRANSPORT", "TAXI", "DEPLACEMENT", "COURSE")),
+    ("FRAIS BANCAIRES", ("BANCAIRE", "BANQUE", "AGIOS", "COMMISSION")),
+    ("LOYER", ("LOYER",)),
+    ("IMPOTS ET TAXES", ("IMPOT", "TAXE", "DGI", "DGRK")),
+]
+
+CATEGORIE_DEPENSE_DEFAUT = "AUTRES"
+
+
+def normaliser_libelle(libelle):
+    """
+    « Électricité  bloc-2 » → "ELECTRICITE BLOC 2" (majuscules, sans
+    accents ni ponctuation, espaces simples).
+    """
+    s = unicodedata.normalize("NFKD", str(libelle or ""))
+    s = "".join(c for c in s if not unicodedata.combining(c)).upper()
+    return " ".join(re.sub(r"[^A-Z0-9]+", " ", s).split())
+
+
+def categorie_depense(libelle):
+    """
+    Catégorie d'un libellé de dépense (CATEGORIES_DEPENSE), AUTRES sinon.
+    """
+    mots = normaliser_libelle(libelle).split()
+    for categorie, debuts in CATEGORIES_DEPENSE:
+        if any(m.startswith(d) for m in mots for d in debuts):
+            return categorie
+    return CATEGORIE_DEPENSE_DEFAUT
+
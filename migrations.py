@@ -0,0 +1,522 @@
+"""
+migrations.py — SCHÉMA VERSIONNÉ + INDEX DES REQUÊTES CHAUDES
+
+✔ Table schema_migrations (version, nom, date)
+✔ Migrations numérotées, appliquées dans l'ordre, une seule fois
+✔ Verrou consultatif : un seul worker / script migre à la fois
+✔ Vérification au démarrage (server_flask) : schéma à jour ou non
+✔ Contrôle EXPLAIN : journal, classe, dashboard utilisent les index
+
+Usage :
+  python migrations.py appliquer    applique les migrations en attente
+  python migrations.py etat         version courante / migrations en attente
+  python migrations.py plans        contrôle EXPLAIN des requêtes chaudes
+"""
+
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+import psycopg
+
+from data_version import init_data_version
+from tarifs_fip import init_tarifs_fip, initialiser_annee
+from schema_annee import (
+    TABLES_PARTITIONNEES, migrer as migrer_partitions, init_index_annee
+)
+from metier import annee_scolaire_from_date, annees_autour
+from paiements import init_paiements_uniques
+from sync_mobile import init_sync_mobile
+from cube_finance import init_cube_finance
+from depenses import init_depenses
+from rapprochement import init_rapprochement
+
+# Clé du verrou consultatif PostgreSQL (arbitraire, propre à l'application)
+VERROU_MIGRATIONS = 726_2526
+
+
+def log(msg):
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {msg}")
+
+
+# ======================================================
+# MIGRATIONS
+# ======================================================
+
+def m001_schema_initial(conn):
+    """
+    Tables métier. Sur une base neuve, les tables annuelles sont créées
+    directement partitionnées ; une base existante n'est pas modifiée
+    (IF NOT EXISTS) et sera partitionnée par la migration 3.
+    """
+    from import_inscription_pg import init_db as init_inscription
+
+    with conn.cursor() as cur:
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS eleves (
+                id SERIAL PRIMARY KEY,
+                matricule VARCHAR(50) UNIQUE NOT NULL,
+                nom VARCHAR(100),
+                sexe VARCHAR(10),
+                classe VARCHAR(50),
+                categorie VARCHAR(10),
+                section VARCHAR(10),
+                telephone VARCHAR(50),
+                email TEXT
+            );
+        """)
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS paiements (
+                id SERIAL,
+                eleve_id INTEGER REFERENCES eleves(id),
+                numrecu VARCHAR(50),
+                mois VARCHAR(30),
+                fip NUMERIC DEFAULT 0,
+                ff NUMERIC DEFAULT 0,
+                obs TEXT,
+                jour TEXT,
+                datepaiement DATE,
+                annee_scolaire TEXT NOT NULL,
+                PRIMARY KEY (id, annee_scolaire),
+                UNIQUE (numrecu, annee_scolaire)
+            ) PARTITION BY LIST (annee_scolaire);
+        """)
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS depense (
+                id SERIAL,
+                ref_dp TEXT,
+                date_depense DATE,
+                libelle TEXT,
+                montant NUMERIC DEFAULT 0,
+                banque NUMERIC DEFAULT 0,
+                annee_scolaire TEXT NOT NULL,
+                PRIMARY KEY (id, annee_scolaire),
+                UNIQUE (ref_dp, date_depense, annee_scolaire)
+            ) PARTITION BY LIST (annee_scolaire);
+        """)
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS caisse_journaliere (
+                id SERIAL,
+                date_operation DATE NOT NULL,
+                report NUMERIC DEFAULT 0,
+                bloc1 NUMERIC DEFAULT 0,
+                bloc2 NUMERIC DEFAULT 0,
+                bus1 NUMERIC DEFAULT 0,
+                bus2 NUMERIC DEFAULT 0,
+                annee_scolaire TEXT NOT NULL,
+                PRIMARY KEY (id, annee_scolaire),
+                UNIQUE (date_operation, annee_scolaire)
+            ) PARTITION BY LIST (annee_scolaire);
+        """)
+
+        # Partition DEFAULT des tables créées partitionnées ci-dessus
+        for table in TABLES_PARTITIONNEES:
+            cur.execute("""
+                SELECT 1 FROM pg_partitioned_table
+                WHERE partrelid = %s::regclass
+            """, (table,))
+            if cur.fetchone():
+                cur.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table}_defaut "
+                    f"PARTITION OF {table} DEFAULT"
+                )
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS observation (
+                id SERIAL PRIMARY KEY,
+                date_operation DATE,
+                libelle TEXT,
+                montant NUMERIC DEFAULT 0,
+                annee_scolaire TEXT,
+                UNIQUE (date_operation, libelle, annee_scolaire)
+            );
+        """)
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS import_log (
+                id SERIAL PRIMARY KEY,
+                date_import TIMESTAMPTZ NOT NULL DEFAULT now(),
+                nb_lignes INTEGER,
+                statut TEXT,
+                commentaire TEXT
+            );
+        """)
+
+    conn.commit()
+
+    init_inscription(conn)
+
+
+def m002_versions_et_tarifs(conn):
+    init_data_version(conn)
+    init_tarifs_fip(conn)
+
+
+def m003_partitionnement_annee(conn):
+    migrer_partitions(conn)
+
+
+def m004_index_requetes_chaudes(conn):
+    """
+    Index des filtres et jointures des routes les plus utilisées.
+    INCLUDE : index couvrants (lecture de l'index seul, sans la table).
+    """
+    init_index_annee(conn)
+
+    with conn.cursor() as cur:
+
+        # Journal (admin_journal_result, api_journal_pdf)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS paiements_annee_date_idx
+            ON paiements (annee_scolaire, datepaiement)
+            INCLUDE (eleve_id, mois, fip, numrecu)
+        """)
+
+        # Jointures paiements → eleves hors année (PDF, section)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS paiements_eleve_idx
+            ON paiements (eleve_id)
+        """)
+
+        # Classe (api_classe, rapport_pdf_classe) : même expression
+        # que le WHERE des routes
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS eleves_classe_norm_idx
+            ON eleves ((regexp_replace(UPPER(classe), '[^A-Z0-9]', '', 'g')))
+        """)
+
+        # Jointure tarif_fip (api_dashboard_finance)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS eleves_classe_canonique_idx
+            ON eleves ((classe_canonique(classe)))
+        """)
+
+        # Recherche élève : WHERE LOWER(matricule) = LOWER(%s)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS eleves_matricule_lower_idx
+            ON eleves ((LOWER(matricule)))
+        """)
+
+        # Dépenses d'un jour (api_depenses_par_date, resume_journalier)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS depense_date_idx
+            ON depense (date_depense)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS depense_annee_date_idx
+            ON depense (annee_scolaire, date_depense)
+            INCLUDE (montant, banque)
+        """)
+
+        # Caisse (caisse_list, solde_list, resume_journalier)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS caisse_annee_date_idx
+            ON caisse_journaliere (annee_scolaire, date_operation)
+            INCLUDE (report, bloc1, bloc2, bus1, bus2)
+        """)
+
+    conn.commit()
+
+
+def m005_paiement_unique_par_mois(conn):
+    """
+    Un paiement par élève / mois / année (guichet sans course),
+    reçus générés (paiements.py).
+    """
+    init_paiements_uniques(conn)
+
+
+def m006_sync_mobile(conn):
+    """
+    Suivi des élèves modifiés pour la synchro mobile par delta
+    (sync_mobile.py). Exige PostgreSQL 13+ (xid8).
+    """
+    init_sync_mobile(conn)
+
+
+def m007_cube_finance(conn):
+    """
+    Cumuls des paiements par dimension (cube_finance.py), tenus à jour
+    par triggers d'instruction ; remplissage initial depuis paiements.
+    """
+    init_cube_finance(conn)
+
+
+def m008_tarif_ff(conn):
+    """
+    Tarif mensuel des FF (frais de fonctionnement) à côté du FIP dans
+    tarif_fip (0 par défaut : aucun FF attendu tant qu'il n'est pas fixé).
+    """
+    init_tarifs_fip(conn)
+
+
+def m009_depenses_categories(conn):
+    """
+    Catégorie des dépenses (libellé classé, depenses.py) et cumuls
+    journaliers par catégorie tenus à jour par triggers.
+    """
+    init_depenses(conn)
+
+
+def m010_rapprochement(conn):
+    """
+    Résultats stockés du rapprochement caisse / paiements / dépenses
+    (rapprochement.py), calculés à la demande ou par tâche planifiée.
+    """
+    init_rapprochement(conn)
+
+
+def m011_tarifs_annee_en_cours(conn):
+    """
+    Tarifs de l'année en cours (copie de l'année précédente ou tarifs
+    par défaut) : les lectures ne créent plus d'année ; les suivantes
+    s'initialisent par la CLI (python tarifs_fip.py initialiser <annee>).
+    """
+    initialiser_annee(conn, annee_scolaire_from_date(date.today()))
+
+
+MIGRATIONS = [
+    (1, "schema_initial", m001_schema_initial),
+    (2, "versions_et_tarifs", m002_versions_et_tarifs),
+    (3, "partitionnement_annee", m003_partitionnement_annee),
+    (4, "index_requetes_chaudes", m004_index_requetes_chaudes),
+    (5, "paiement_unique_par_mois", m005_paiement_unique_par_mois),
+    (6, "sync_mobile", m006_sync_mobile),
+    (7, "cube_finance", m007_cube_finance),
+    (8, "tarif_ff", m008_tarif_ff),
+    (9, "depenses_categories", m009_depenses_categories),
+    (10, "rapprochement", m010_rapprochement),
+    (11, "tarifs_annee_en_cours", m011_tarifs_annee_en_cours),
+]
+
+VERSION_CIBLE = MIGRATIONS[-1][0]
+
+
+# ======================================================
+# RUNNER
+# ======================================================
+
+def _init_table_migrations(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                nom TEXT NOT NULL,
+                appliquee_le TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+        """)
+    conn.commit()
+
+
+def versions_appliquees(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            return set()
+        cur.execute("SELECT version FROM schema_migrations")
+        return {v for (v,) in cur.fetchall()}
+
+
+def migrations_en_attente(conn):
+    faites = versions_appliquees(conn)
+    return [m for m in MIGRATIONS if m[0] not in faites]
+
+
+def appliquer(conn):
+    """
+    Applique les migrations en attente, dans l'ordre.
+
+    Chaque migration est idempotente (IF NOT EXISTS / déjà partitionnée) :
+    une migration interrompue peut être relancée sans risque.
+    """
+    _init_table_migrations(conn)
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(%s)", (VERROU_MIGRATIONS,))
+    conn.commit()
+
+    try:
+        appliquees = []
+
+        for version, nom, fonction in migrations_en_attente(conn):
+            log(f"Migration {version:03d} — {nom}…")
+            fonction(conn)
+
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO schema_migrations (version, nom)
+                    VALUES (%s, %s)
+                    ON CONFLICT (version) DO NOTHING
+                """, (version, nom))
+            conn.commit()
+
+            appliquees.append(version)
+
+        return appliquees
+
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (VERROU_MIGRATIONS,))
+        conn.commit()
+
+
+def verifier_schema(conn, appliquer_auto=False):
+    """
+    Contrôle de démarrage : retourne la liste des migrations en attente
+    (vide = schéma à jour). Applique-les si appliquer_auto.
+    """
+    attente = migrations_en_attente(conn)
+
+    if attente and appliquer_auto:
+        appliquer(conn)
+        attente = migrations_en_attente(conn)
+
+    return attente
+
+
+# ======================================================
+# CONTRÔLE DES PLANS (EXPLAIN)
+# ======================================================
+
+def requetes_chaudes():
+    """
+    Requêtes représentatives (mêmes WHERE que les routes) avec des
+    paramètres plausibles.
+    """
+    aujourdhui = date.today()
+    annee = annee_scolaire_from_date(aujourdhui)
+
+    return {
+        "journal (admin_journal_result)": ("""
+            SELECT e.matricule, e.nom, p.mois, p.fip, p.numrecu
+            FROM paiements p
+            JOIN eleves e ON p.eleve_id = e.id
+            WHERE p.annee_scolaire = ANY(%s)
+              AND p.datepaiement >= %s
+              AND p.datepaiement < %s
+        """, (annees_autour(aujourdhui), aujourdhui, aujourdhui + timedelta(days=1))),
+
+        "classe (api_classe / rapport_pdf_classe)": ("""
+            SELECT id, matricule, nom
+            FROM eleves
+            WHERE regexp_replace(UPPER(classe), '[^A-Z0-9]', '', 'g') = %s
+        """, ("6P",)),
+
+        "fiche élève (calcul_fip_eleve)": ("""
+            SELECT mois, fip
+            FROM paiements
+            WHERE annee_scolaire = %s
+              AND eleve_id = %s
+        """, (annee, 1)),
+
+        "élève par matricule": ("""
+            SELECT id FROM eleves WHERE LOWER(matricule) = LOWER(%s)
+        """, ("PL1",)),
+
+        "dashboard (FIP par mois)": ("""
+            SELECT mois, SUM(fip)
+            FROM paiements
+            WHERE annee_scolaire = %s
+              AND mois = ANY(%s)
+            GROUP BY mois
+        """, (annee, ["Sept"])),
+
+        "dépenses du jour (api_depenses_par_date)": ("""
+            SELECT id, ref_dp, libelle, montant
+            FROM depense
+            WHERE date_depense = %s
+        """, (aujourdhui,)),
+
+        "caisse (resume_journalier)": ("""
+            SELECT date_operation, report, bloc1, bloc2, bus1, bus2
+            FROM caisse_journaliere
+            WHERE annee_scolaire = %s
+              AND date_operation >= %s
+        """, (annee, aujourdhui)),
+    }
+
+
+def _noeuds(plan):
+    yield plan
+    for enfant in plan.get("Plans", []):
+        yield from _noeuds(enfant)
+
+
+def verifier_plans(conn):
+    """
+    EXPLAIN de chaque requête chaude avec enable_seqscan = off :
+    s'il reste un Seq Scan, aucun index n'est UTILISABLE (index manquant).
+    Retourne {nom: (ok, [types de nœuds de scan])}.
+    """
+    resultats = {}
+    cur = psycopg.ClientCursor(conn)
+
+    try:
+        cur.execute("SET enable_seqscan = off")
+
+        for nom, (query, params) in requetes_chaudes().items():
+            cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            scans = [
+                f"{n['Node Type']} ({n.get('Index Name') or n.get('Relation Name', '?')})"
+                for n in _noeuds(plan[0]["Plan"])
+                if "Scan" in n["Node Type"]
+            ]
+            ok = not any(s.startswith("Seq Scan") for s in scans)
+            resultats[nom] = (ok, scans)
+
+    finally:
+        cur.close()
+        conn.rollback()
+
+    return resultats
+
+
+# ======================================================
+# MAIN
+# ======================================================
+
+if __name__ == "__main__":
+    DATABASE_URL = os.environ.get("DATABASE_URL")
+    if not DATABASE_URL:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+
+    commande = sys.argv[1] if len(sys.argv) > 1 else "etat"
+
+    with psycopg.connect(
+        DATABASE_URL,
+        sslmode="require" if "render.com" in DATABASE_URL else "disable"
+    ) as conn:
+
+        if commande == "appliquer":
+            faites = appliquer(conn)
+            log(f"✅ {len(faites)} migration(s) appliquée(s) — "
+                f"schéma en version {VERSION_CIBLE}")
+
+        elif commande == "etat":
+            attente = migrations_en_attente(conn)
+            log(f"Version cible : {VERSION_CIBLE}")
+            for version, nom, _ in attente:
+                log(f"  en attente : {version:03d} — {nom}")
+            if not attente:
+                log("✅ Schéma à jour")
+
+        elif commande == "plans":
+            echecs = 0
+            for nom, (ok, scans) in verifier_plans(conn).items():
+                log(f"{'✅' if ok else '❌'} {nom} : {', '.join(scans)}")
+                echecs += not ok
+            sys.exit(1 if echecs else 0)
+
+        else:
+            print(__doc__)
+            sys.exit(1)
@@ -0,0 +1,430 @@
+"""
+paiements.py — PAIEMENTS AU GUICHET (ENREGISTREMENT ATOMIQUE)
+
+✔ Un seul paiement par élève, mois et année scolaire : contrainte
+  UNIQUE (eleve_id, mois_unique, annee_scolaire), sans course entre
+  caissiers (plus de SELECT puis INSERT)
+✔ mois_unique : colonne générée, fonction SQL mois_canonique()
+  (miroir de metier.canonical_month) ; NULL pour les acomptes /
+  soldes des classeurs Excel (Ac. Sept + Sld Sept)
+✔ Numéro de reçu généré (séquence recu_guichet_seq) : G2526-000042
+✔ 1 requête : élève + insertion + solde de l'année, même transaction
+✔ Saisie par lot (reçus papier de fin de journée) : élèves validés en
+  1 requête, insertion en 1 requête, résultat par ligne + soldes ;
+  reçu obligatoire pour les acomptes / soldes (renvoi du lot sans effet)
+"""
+
+import math
+import re
+from datetime import date, datetime
+
+from metier import annee_scolaire_from_date, canonical_month, MOIS_SCOLAIRE
+
+
+# Nombre de mois facturés (Sept → Juin)
+NB_MOIS_SCOLAIRES = len(MOIS_SCOLAIRE)
+
+CONTRAINTE_UNIQUE = "paiements_eleve_mois_unique"
+
+# Lignes acceptées par appel de enregistrer_lot()
+LOT_MAX = 1000
+
+
+# ======================================================
+# SCHÉMA
+# ======================================================
+
+def init_paiements_uniques(conn):
+    """
+    Fonction mois_canonique(), séquence des reçus, colonne
+    mois_unique et contrainte d'unicité (idempotent).
+
+    Refuse de poser la contrainte si des doublons existent déjà :
+    ils sont listés pour correction manuelle.
+    """
+    with conn.cursor() as cur:
+
+        # Même règle que metier.canonical_month()
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION mois_canonique(raw TEXT)
+            RETURNS TEXT
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE
+            AS $$
+                SELECT CASE
+                    WHEN s LIKE '%sept%' THEN 'Sept'
+                    WHEN s LIKE '%oct%'  THEN 'Oct'
+                    WHEN s LIKE '%nov%'  THEN 'Nov'
+                    WHEN s LIKE '%dec%'  THEN 'Dec'
+                    WHEN s LIKE '%janv%' THEN 'Janv'
+                    WHEN s LIKE '%fev%'  THEN 'Fevr'
+                    WHEN s LIKE '%févr%' THEN 'Fevr'
+                    WHEN s LIKE '%mars%' THEN 'Mars'
+                    WHEN s LIKE '%avr%'  THEN 'Avr'
+                    WHEN s LIKE '%mai%'  THEN 'Mai'
+                    WHEN s LIKE '%juin%' THEN 'Juin'
+                END
+                FROM (
+                    SELECT replace(replace(
+                        regexp_replace(
+                            lower(btrim(raw)), '^(ac|sld)[-./[:space:]]*', ''
+                        ),
+                        '.', ''), ',', '') AS s
+                ) t
+            $$;
+        """)
+
+        cur.execute("CREATE SEQUENCE IF NOT EXISTS recu_guichet_seq")
+
+        cur.execute("""
+            SELECT 1 FROM pg_constraint
+            WHERE conname = %s
+        """, (CONTRAINTE_UNIQUE,))
+        if cur.fetchone():
+            conn.commit()
+            return
+
+        # Doublons existants : la contrainte ne pourrait pas être créée
+        cur.execute("""
+            SELECT e.matricule, mois_canonique(p.mois), p.annee_scolaire,
+                   string_agg(COALESCE(p.numrecu, '?'), ', ')
+            FROM paiements p
+            JOIN eleves e ON e.id = p.eleve_id
+            WHERE lower(btrim(p.mois)) !~ '^(ac|sld)'
+              AND mois_canonique(p.mois) IS NOT NULL
+            GROUP BY e.matricule, mois_canonique(p.mois), p.annee_scolaire
+            HAVING COUNT(*) > 1
+            ORDER BY 3, 1, 2
+            LIMIT 50
+        """)
+        doublons = cur.fetchall()
+        if doublons:
+            conn.rollback()
+            details = "\n".join(
+                f"  {m} — {mois} {annee} : reçus {recus}"
+                for m, mois, annee, recus in doublons
+            )
+            raise RuntimeError(
+                f"❌ Mois payés plusieurs fois (corriger avant migration) :\n"
+                f"{details}"
+            )
+
+        cur.execute("""
+            ALTER TABLE paiements
+            ADD COLUMN IF NOT EXISTS mois_unique TEXT
+            GENERATED ALWAYS AS (
+                CASE WHEN lower(btrim(mois)) ~ '^(ac|sld)' THEN NULL
+                     ELSE mois_canonique(mois)
+                END
+            ) STORED
+        """)
+
+        cur.execute(f"""
+            ALTER TABLE paiements
+            ADD CONSTRAINT {CONTRAINTE_UNIQUE}
+            UNIQUE (eleve_id, mois_unique, annee_scolaire)
+        """)
+
+    conn.commit()
+
+
+# ======================================================
+# ENREGISTREMENT
+# ======================================================
+
+def enregistrer_paiement(conn, matricule, mois, montant, jour):
+    """
+    Enregistre le paiement du mois (canonique) d'un élève.
+
+    ⚠️ Ne fait PAS de commit (l'appelant ajoute VERSIONS.bump).
+
+    Retourne None si l'élève est introuvable, sinon un dict :
+    nom, numrecu (None si le mois était déjà payé), total_paye,
+    total_attendu, solde de l'année scolaire de `jour`.
+    """
+    annee = annee_scolaire_from_date(jour)
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            WITH e AS (
+                SELECT id, nom, classe
+                FROM eleves
+                WHERE LOWER(matricule) = LOWER(%(matricule)s)
+                LIMIT 1
+            ),
+            ins AS (
+                INSERT INTO paiements (
+                    eleve_id, numrecu, mois, fip, datepaiement, annee_scolaire
+                )
+                SELECT e.id,
+                       %(prefixe)s || lpad(nextval('recu_guichet_seq')::text, 6, '0'),
+                       %(mois)s, %(montant)s, %(jour)s, %(annee)s
+                FROM e
+                ON CONFLICT (eleve_id, mois_unique, annee_scolaire) DO NOTHING
+                RETURNING eleve_id, numrecu, fip
+            )
+            SELECT e.nom,
+                   ins.numrecu,
+                   COALESCE((
+                       SELECT SUM(p.fip) FROM paiements p
+                       WHERE p.annee_scolaire = %(annee)s
+                         AND p.eleve_id = e.id
+                   ), 0) + COALESCE(ins.fip, 0) AS total_paye,
+                   COALESCE((
+                       SELECT t.fip_mensuel FROM tarif_fip t
+                       WHERE t.annee_scolaire = %(annee)s
+                         AND t.classe = classe_canonique(e.classe)
+                   ), 0) * %(nb_mois)s AS total_attendu
+            FROM e
+            LEFT JOIN ins ON ins.eleve_id = e.id
+        """, {
+            "matricule": matricule,
+            "mois": mois,
+            "montant": montant,
+            "jour": jour,
+            "annee": annee,
+            "prefixe": prefixe_recu(annee),
+            "nb_mois": NB_MOIS_SCOLAIRES,
+        })
+        ligne = cur.fetchone()
+
+    if ligne is None:
+        return None
+
+    nom, numrecu, total_paye, total_attendu = ligne
+    return {
+        "nom": nom,
+        "numrecu": numrecu,
+        "annee_scolaire": annee,
+        "total_paye": float(total_paye),
+        "total_attendu": float(total_attendu),
+        "solde": max(float(total_attendu) - float(total_paye), 0),
+    }
+
+
+# ======================================================
+# SAISIE PAR LOT
+# ======================================================
+
+def prefixe_recu(annee):
+    return f"G{annee[2:4]}{annee[7:9]}-"
+
+
+def _mois_saisi(brut):
+    """
+    Mois tel qu'enregistré : canonique, préfixé Ac. / Sld. pour un
+    acompte / solde (hors contrainte « un paiement par mois »).
+    """
+    mois = canonical_month(brut)
+    if mois is None:
+        return None
+    prefixe = re.match(r"^(ac|sld)", str(brut).lower().strip())
+    if prefixe:
+        return f"{prefixe.group(1).capitalize()}. {mois}"
+    return mois
+
+
+def _date_saisie(brute):
+    if not brute:
+        return date.today()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(str(brute).strip(), fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def valider_ligne(ligne):
+    """
+    Ligne JSON {matricule, mois, montant, recu?, date?} → (dict, None)
+    ou (None, message d'erreur). Aucune requête.
+    """
+    if not isinstance(ligne, dict):
+        return None, "ligne non objet"
+
+    matricule = str(ligne.get("matricule") or "").strip()
+    if not matricule:
+        return None, "matricule manquant"
+
+    mois = _mois_saisi(ligne.get("mois"))
+    if mois is None:
+        return None, "mois invalide"
+
+    try:
+        montant = float(str(ligne.get("montant")).replace(",", "."))
+    except ValueError:
+        return None, "montant invalide"
+    if not (math.isfinite(montant) and montant > 0):
+        return None, "montant invalide"
+
+    jour = _date_saisie(ligne.get("date"))
+    if jour is None:
+        return None, "date invalide (AAAA-MM-JJ ou JJ/MM/AAAA)"
+
+    recu = str(ligne.get("recu") or "").strip() or None
+    # Acompte / solde : hors contrainte « un paiement par mois », seul le
+    # reçu rend un second envoi du lot sans effet
+    if recu is None and mois.startswith(("Ac.", "Sld.")):
+        return None, "reçu obligatoire pour un acompte / solde"
+
+    return {
+        "matricule": matricule,
+        "mois": mois,
+        "montant": montant,
+        "jour": jour,
+        "annee": annee_scolaire_from_date(jour),
+        "recu": recu,
+    }, None
+
+
+def enregistrer_lot(conn, lignes, validees=None):
+    """
+    Enregistre une liste de paiements dans la transaction de `conn`.
+    validees : résultats de valider_ligne() déjà calculés par
+    l'appelant (sinon calculés ici).
+
+    ⚠️ Ne fait PAS de commit (l'appelant ajoute VERSIONS.bump).
+
+    Retourne (resultats, soldes) :
+    - resultats : 1 dict par ligne, dans l'ordre (statut parmi
+      enregistre, deja_paye, recu_existant, eleve_introuvable, invalide)
+    - soldes : total payé / attendu / solde par élève et année touchés
+    """
+    resultats = []
+    valides = []
+    recus_vus = set()
+
+    if validees is None:
+        validees = [valider_ligne(ligne) for ligne in lignes]
+
+    for i, (ligne, (propre, erreur)) in enumerate(zip(lignes, validees)):
+        if propre and propre["recu"]:
+            cle = (propre["recu"], propre["annee"])
+            if cle in recus_vus:
+                propre, erreur = None, "reçu en double dans le lot"
+            recus_vus.add(cle)
+
+        resultats.append({
+            "index": i,
+            "matricule": ligne.get("matricule") if isinstance(ligne, dict) else None,
+            "statut": "invalide" if erreur else None,
+            "erreur": erreur,
+            "numrecu": None,
+        })
+        if propre:
+            valides.append((i, propre))
+
+    if not valides:
+        return resultats, []
+
+    with conn.cursor() as cur:
+
+        # ---------- 1 requête : tous les élèves du lot ----------
+        cur.execute("""
+            SELECT LOWER(matricule), id, matricule
+            FROM eleves
+            WHERE LOWER(matricule) = ANY(%s)
+        """, (sorted({p["matricule"].lower() for _, p in valides}),))
+        eleves = {m: (i, officiel) for m, i, officiel in cur.fetchall()}
+
+        a_inserer = []
+        for i, p in valides:
+            eleve = eleves.get(p["matricule"].lower())
+            if eleve is None:
+                resultats[i]["statut"] = "eleve_introuvable"
+                continue
+            resultats[i]["matricule"] = eleve[1]
+            a_inserer.append((i, eleve[0], p))
+
+        if not a_inserer:
+            return resultats, []
+
+        # ---------- 1 requête : insertion + reçus générés ----------
+        # ON CONFLICT DO NOTHING sans cible : mois déjà payé OU reçu existant
+        cur.execute("""
+            WITH d AS MATERIALIZED (
+                SELECT t.n, t.eleve_id, t.mois, t.fip, t.jour, t.annee,
+                       COALESCE(
+                           t.recu,
+                           t.prefixe || lpad(nextval('recu_guichet_seq')::text, 6, '0')
+                       ) AS numrecu,
+                       t.recu IS NOT NULL AS recu_saisi
+                FROM unnest(
+                    %s::int[], %s::int[], %s::text[], %s::numeric[],
+                    %s::date[], %s::text[], %s::text[], %s::text[]
+                ) AS t(n, eleve_id, mois, fip, jour, annee, recu, prefixe)
+            ),
+            ins AS (
+                INSERT INTO paiements (
+                    eleve_id, numrecu, mois, fip, datepaiement, annee_scolaire
+                )
+                SELECT eleve_id, numrecu, mois, fip, jour, annee
+                FROM d
+                ORDER BY n
+                ON CONFLICT DO NOTHING
+                RETURNING numrecu, annee_scolaire
+            )
+            SELECT d.n, d.numrecu, ins.numrecu IS NOT NULL,
+                   d.recu_saisi AND EXISTS (
+                       SELECT 1 FROM paiements p
+                       WHERE p.numrecu = d.numrecu
+                         AND p.annee_scolaire = d.annee
+                   )
+            FROM d
+            LEFT JOIN ins
+              ON ins.numrecu = d.numrecu AND ins.annee_scolaire = d.annee
+            ORDER BY d.n
+        """, [
+            [i for i, _, _ in a_inserer],
+            [e for _, e, _ in a_inserer],
+            [p["mois"] for _, _, p in a_inserer],
+            [p["montant"] for _, _, p in a_inserer],
+            [p["jour"] for _, _, p in a_inserer],
+            [p["annee"] for _, _, p in a_inserer],
+            [p["recu"] for _, _, p in a_inserer],
+            [prefixe_recu(p["annee"]) for _, _, p in a_inserer],
+        ])
+
+        for n, numrecu, insere, recu_existant in cur.fetchall():
+            if insere:
+                resultats[n].update(statut="enregistre", numrecu=numrecu)
+            elif recu_existant:
+                resultats[n].update(statut="recu_existant", numrecu=numrecu)
+            else:
+                resultats[n]["statut"] = "deja_paye"
+
+        # ---------- 1 requête : soldes à jour (même transaction) ----------
+        touches = sorted({(e, p["annee"]) for _, e, p in a_inserer})
+        cur.execute("""
+            SELECT e.matricule, t.annee,
+                   COALESCE((
+                       SELECT SUM(p.fip) FROM paiements p
+                       WHERE p.annee_scolaire = t.annee
+                         AND p.eleve_id = e.id
+                   ), 0) AS total_paye,
+                   COALESCE((
+                       SELECT f.fip_mensuel FROM tarif_fip f
+                       WHERE f.annee_scolaire = t.annee
+                         AND f.classe = classe_canonique(e.classe)
+                   ), 0) * %s AS total_attendu
+            FROM unnest(%s::int[], %s::text[]) AS t(eleve_id, annee)
+            JOIN eleves e ON e.id = t.eleve_id
+            ORDER BY e.matricule, t.annee
+        """, (
+            NB_MOIS_SCOLAIRES,
+            [e for e, _ in touches],
+            [a for _, a in touches],
+        ))
+
+        soldes = [
+            {
+                "matricule": matricule,
+                "annee_scolaire": annee,
+                "total_paye": float(total_paye),
+                "total_attendu": float(total_attendu),
+                "solde": max(float(total_attendu) - float(total_paye), 0),
+            }
+            for matricule, annee, total_paye, total_attendu in cur.fetchall()
+        ]
+
+    return resultats, soldes
@@ -0,0 +1,322 @@
+"""
+profilage.py — PROFILAGE À LA DEMANDE (WORKERS DE PRODUCTION)
+
+✔ Admin uniquement : profiler les N prochaines requêtes d'une route
+✔ Mode « echantillons » (défaut) : échantillonnage de la pile du thread
+  de la requête toutes les PROFIL_INTERVALLE_MS → format « folded »
+  (flamegraph.pl, speedscope.app)
+✔ Mode « cprofile » : cProfile → .prof (pstats, snakeviz) + résumé texte
+✔ Profils stockés dans PROFILS_DOSSIER (défaut : profils/)
+✔ Profil de démarrage : temps d'import de server_flask (-X importtime)
+  → .folded + top des modules les plus lents
+
+⚠️ L'armement est propre au worker qui reçoit la demande (gunicorn :
+   répéter la demande ou lancer avec un seul worker).
+
+Routes :
+  POST /admin/profilage          route=/api/classe/<classe>&n=5&mode=echantillons
+  GET  /admin/profilage          état + profils disponibles
+  GET  /admin/profilage/<nom>    téléchargement d'un profil
+
+Usage :
+  python profilage.py demarrage [fichier.folded]
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import subprocess
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request, session, jsonify, send_from_directory, abort
+
+# ======================================================
+# CONFIGURATION
+# ======================================================
+
+DOSSIER = os.environ.get("PROFILS_DOSSIER", "profils")
+INTERVALLE_S = float(os.environ.get("PROFIL_INTERVALLE_MS", "5")) / 1000
+MAX_REQUETES = 50
+
+MODES = ("echantillons", "cprofile")
+
+_lock = threading.Lock()
+_armement = {}   # règle Flask → {"restant": n, "mode": mode}
+
+
+# ======================================================
+# ÉCHANTILLONNEUR (PILES → FORMAT FOLDED)
+# ======================================================
+
+def _cadre(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Echantillonneur:
+    """
+    Thread qui relève la pile d'un autre thread à intervalle fixe.
+    """
+
+    def __init__(self, thread_id, intervalle=INTERVALLE_S):
+        self.thread_id = thread_id
+        self.intervalle = intervalle
+        self.piles = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._boucle, name="profilage", daemon=True
+        )
+
+    def demarrer(self):
+        self._thread.start()
+
+    def arreter(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _boucle(self):
+        while not self._stop.wait(self.intervalle):
+            frame = sys._current_frames().get(self.thread_id)
+            pile = []
+            while frame is not None:
+                pile.append(_cadre(frame))
+                frame = frame.f_back
+            if pile:
+                self.piles[";".join(reversed(pile))] += 1
+
+    def folded(self):
+        return "".join(f"{pile} {n}\n" for pile, n in self.piles.most_common())
+
+
+# ======================================================
+# HOOKS FLASK
+# ======================================================
+
+def _regle():
+    return request.url_rule.rule if request.url_rule else None
+
+
+def _debut_requete():
+    regle = _regle()
+    if regle is None:
+        return
+
+    with _lock:
+        a = _armement.get(regle)
+        if not a or a["restant"] <= 0:
+            return
+        a["restant"] -= 1
+        if a["restant"] == 0:
+            del _armement[regle]
+        mode = a["mode"]
+
+    if mode == "cprofile":
+        profil = cProfile.Profile()
+        try:
+            profil.enable()
+        except ValueError:
+            # Un autre profileur est actif (requête concurrente, Python 3.12+)
+            return
+    else:
+        profil = Echantillonneur(threading.get_ident())
+        profil.demarrer()
+
+    g._profil = (mode, profil)
+
+
+def _fin_requete(exc=None):
+    profil = g.pop("_profil", None)
+    if profil is None:
+        return
+    mode, p = profil
+
+    try:
+        base = os.path.join(
+            DOSSIER,
+            f"{re.sub(r'[^A-Za-z0-9]+', '_', _regle()).strip('_') or 'racine'}"
+            f"_{datetime.now():%Y%m%d_%H%M%S_%f}_{os.getpid()}"
+        )
+        os.makedirs(DOSSIER, exist_ok=True)
+
+        if mode == "cprofile":
+            p.disable()
+            p.dump_stats(base + ".prof")
+            texte = io.StringIO()
+            pstats.Stats(p, stream=texte).sort_stats("cumulative").print_stats(40)
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(f"{request.method} {request.full_path}\n\n{texte.getvalue()}")
+        else:
+            p.arreter()
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                f.write(p.folded())
+
+    except Exception as e:
+        print("❌ ERREUR PROFILAGE :", e)
+
+
+# ======================================================
+# ROUTES ADMIN
+# ======================================================
+
+def _admin_requis():
+    if session.get("role") != "admin":
+        abort(401)
+
+
+def _profils():
+    if not os.path.isdir(DOSSIER):
+        return []
+    noms = [
+        n for n in os.listdir(DOSSIER)
+        if n.endswith((".folded", ".prof", ".txt"))
+    ]
+    return sorted(
+        noms, key=lambda n: os.path.getmtime(os.path.join(DOSSIER, n)),
+        reverse=True
+    )
+
+
+def profilage(app):
+    """
+    GET : état + profils ; POST : arme le profileur pour une route.
+    """
+    _admin_requis()
+
+    if request.method == "POST":
+        donnees = request.get_json(silent=True) or request.form
+        regle = (donnees.get("route") or "").strip()
+        mode = donnees.get("mode", "echantillons")
+        try:
+            n = int(donnees.get("n", 5))
+        except (TypeError, ValueError):
+            n = 0
+
+        regles = {r.rule for r in app.url_map.iter_rules()}
+        if regle not in regles:
+            return jsonify({
+                "error": "Route inconnue (règle Flask attendue, ex : /api/classe/<classe>)"
+            }), 400
+        if mode not in MODES or not 1 <= n <= MAX_REQUETES:
+            return jsonify({
+                "error": f"mode parmi {MODES}, n entre 1 et {MAX_REQUETES}"
+            }), 400
+
+        with _lock:
+            _armement[regle] = {"restant": n, "mode": mode}
+
+    with _lock:
+        armement = {r: dict(a) for r, a in _armement.items()}
+
+    return jsonify({
+        "worker": os.getpid(),
+        "armement": armement,
+        "profils": _profils()[:100],
+    })
+
+
+def telecharger(nom):
+    _admin_requis()
+    if nom not in _profils():
+        abort(404)
+    return send_from_directory(os.path.abspath(DOSSIER), nom, as_attachment=True)
+
+
+def apres_fork():
+    """
+    Hook post-fork : l'armement du maître n'est pas hérité.
+    """
+    global _lock
+    _lock = threading.Lock()
+    _armement.clear()
+
+
+def installer(app):
+    """
+    Hooks de profilage + routes /admin/profilage.
+    """
+    app.before_request(_debut_requete)
+    app.teardown_request(_fin_requete)
+    app.add_url_rule(
+        "/admin/profilage", "admin_profilage",
+        lambda: profilage(app), methods=["GET", "POST"]
+    )
+    app.add_url_rule(
+        "/admin/profilage/<nom>", "admin_profilage_fichier", telecharger
+    )
+
+
+# ======================================================
+# PROFIL DE DÉMARRAGE (IMPORT DE server_flask)
+# ======================================================
+
+def profil_demarrage(module="server_flask"):
+    """
+    Lance `python -X importtime -c "import <module>"` dans un processus
+    neuf. Retourne [(chemin d'import, self µs, cumulé µs)].
+    """
+    resultat = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+
+    modules = []
+    en_attente = []   # (niveau, nom, self, cumulé, enfants) — ordre post-fixe
+
+    for ligne in resultat.stderr.splitlines():
+        if not ligne.startswith("import time:") or "imported package" in ligne:
+            continue
+        champs = ligne[len("import time:"):].split("|")
+        self_us, cumul_us, brut = int(champs[0]), int(champs[1]), champs[2]
+        niveau = (len(brut) - len(brut.lstrip()) - 1) // 2
+        nom = brut.strip()
+
+        enfants = []
+        while en_attente and en_attente[-1][0] == niveau + 1:
+            enfants.insert(0, en_attente.pop())
+        en_attente.append((niveau, nom, self_us, cumul_us, enfants))
+
+    def parcourir(noeud, prefixe):
+        _, nom, self_us, cumul_us, enfants = noeud
+        chemin = f"{prefixe};{nom}" if prefixe else nom
+        modules.append((chemin, self_us, cumul_us))
+        for e in enfants:
+            parcourir(e, chemin)
+
+    for racine in en_attente:
+        parcourir(racine, "")
+
+    return modules
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "demarrage":
+        print(__doc__)
+        sys.exit(1)
+
+    sortie = sys.argv[2] if len(sys.argv) > 2 else os.path.join(
+        DOSSIER, f"demarrage_{datetime.now():%Y%m%d_%H%M%S}.folded"
+    )
+
+    modules = profil_demarrage()
+    if not modules:
+        print("❌ Aucun temps d'import relevé (erreur à l'import ?)")
+        sys.exit(1)
+
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        for chemin, self_us, _ in modules:
+            if self_us:
+                f.write(f"{chemin} {self_us}\n")
+
+    total = sum(self_us for _, self_us, _ in modules)
+    print(f"⏱️ Import total : {total / 1000:.0f} ms — profil : {sortie}")
+    print("Modules les plus lents (cumulé) :")
+    for chemin, _, cumul_us in sorted(modules, key=lambda m: m[2], reverse=True)[:25]:
+        parent, _, nom = chemin.rpartition(";")
+        print(f"  {cumul_us / 1000:9.1f} ms  {nom:<40} ← {parent.split(';')[-1] or '-'}")
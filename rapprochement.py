@@ -0,0 +1,354 @@
+"""
+rapprochement.py — RAPPROCHEMENT CAISSE / PAIEMENTS / DÉPENSES
+
+✔ Par jour d'une année scolaire : reçus des élèves (paiements, FIP + FF)
+  comparés aux entrées de caisse (bloc1 + bloc2 + bus1 + bus2)
+✔ Reçus et dépenses rattachés par date au jour de caisse, quelle que
+  soit leur année stockée (année Excel gardée à l'import)
+✔ Report : le report d'un jour doit valoir le solde du jour de caisse
+  précédent (report + entrées − dépenses caisse et banque) ; le 1er
+  jour de l'année, le solde de clôture de l'année précédente
+✔ Anomalies par jour : ecart_entrees, ecart_report, caisse_absente
+  (reçus ou dépenses un jour sans ligne de caisse)
+✔ Toute l'année en 1 requête ensembliste (fenêtre LAG pour le report,
+  dépenses lues dans les cumuls depense_jour)
+✔ Résultats stockés (rapprochement_caisse) avec les versions des
+  données lues → lecture immédiate, résultat périmé signalé
+✔ python rapprochement.py [annee | toutes] : recalcul (tâche planifiée)
+"""
+
+import os
+import sys
+
+import psycopg
+from psycopg.rows import dict_row
+
+from schema_annee import annee_valide
+
+# Écart toléré (arrondis de saisie), en unités monétaires
+TOLERANCE = float(os.environ.get("RAPPROCHEMENT_TOLERANCE", "0.01"))
+
+# Domaines de données lus par le rapprochement (data_version)
+DOMAINES = ("paiements", "caisse_journaliere", "depense")
+
+ANOMALIES = ("ecart_entrees", "ecart_report", "caisse_absente")
+
+
+# ======================================================
+# SCHÉMA
+# ======================================================
+
+def init_rapprochement(conn):
+    """
+    Tables rapprochement_caisse (1 ligne par jour) et
+    rapprochement_annee (1 ligne par calcul d'année) — idempotent.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS rapprochement_annee (
+                annee_scolaire TEXT PRIMARY KEY,
+                calcule_le     TIMESTAMPTZ NOT NULL DEFAULT now(),
+                tolerance      NUMERIC NOT NULL,
+                versions       JSONB NOT NULL DEFAULT '{}'
+            );
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS rapprochement_caisse (
+                annee_scolaire TEXT NOT NULL
+                    REFERENCES rapprochement_annee ON DELETE CASCADE,
+                date_operation DATE NOT NULL,
+                encaisse       NUMERIC NOT NULL DEFAULT 0,
+                nb_paiements   INTEGER NOT NULL DEFAULT 0,
+                entrees        NUMERIC,
+                ecart_entrees  NUMERIC,
+                depenses       NUMERIC NOT NULL DEFAULT 0,
+                report         NUMERIC,
+                report_attendu NUMERIC,
+                ecart_report   NUMERIC,
+                anomalies      TEXT[] NOT NULL DEFAULT '{}',
+                PRIMARY KEY (annee_scolaire, date_operation)
+            );
+        """)
+        # Vue « anomalies seulement » sans parcourir toute l'année
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS rapprochement_caisse_anomalies_idx
+            ON rapprochement_caisse (annee_scolaire, date_operation)
+            WHERE anomalies <> '{}'
+        """)
+
+    conn.commit()
+
+
+# ======================================================
+# CALCUL (1 REQUÊTE PAR ANNÉE)
+# ======================================================
+
+_RAPPROCHER = """
+    -- Reçus et dépenses rattachés par date : l'import garde l'année
+    -- Excel, une ligne datée du 2 septembre peut être rangée dans
+    -- l'année suivante (et un paiement anticipé aussi) → années voisines
+    -- lues, jour attribué à l'année de sa ligne de caisse
+    WITH dates_caisse AS (
+        SELECT DISTINCT date_operation
+        FROM caisse_journaliere
+        WHERE annee_scolaire = ANY(%(voisines)s)
+    ),
+    sorties AS (
+        SELECT date_depense, SUM(caisse + banque) AS depenses
+        FROM depense_jour
+        WHERE annee_scolaire = ANY(%(voisines)s)
+        GROUP BY 1
+    ),
+    recus AS (
+        SELECT datepaiement AS date_operation,
+               SUM(COALESCE(fip, 0) + COALESCE(ff, 0)) AS encaisse,
+               COUNT(*) AS nb
+        FROM paiements
+        WHERE annee_scolaire = ANY(%(voisines)s)
+          AND datepaiement IS NOT NULL
+        GROUP BY 1
+    ),
+    -- Année précédente lue aussi : le 1er jour de l'année reprend le
+    -- solde de clôture de la précédente
+    caisse_2_annees AS (
+        SELECT c.annee_scolaire, c.date_operation, c.report, c.entrees,
+               COALESCE(s.depenses, 0) AS depenses,
+               -- Solde du jour de caisse précédent (week-ends sautés)
+               LAG(c.report + c.entrees - COALESCE(s.depenses, 0))
+                   OVER (ORDER BY c.date_operation) AS report_attendu
+        FROM (
+            SELECT annee_scolaire, date_operation,
+                   COALESCE(report, 0) AS report,
+                   COALESCE(bloc1, 0) + COALESCE(bloc2, 0)
+                   + COALESCE(bus1, 0) + COALESCE(bus2, 0) AS entrees
+            FROM caisse_journaliere
+            WHERE annee_scolaire IN (%(annee)s, %(precedente)s)
+        ) c
+        LEFT JOIN sorties s ON s.date_depense = c.date_operation
+    ),
+    caisse AS (
+        SELECT * FROM caisse_2_annees WHERE annee_scolaire = %(annee)s
+    ),
+    -- Jours sans caisse (aucune année) : année de la date
+    -- (règle du 06 septembre)
+    sans_caisse AS (
+        SELECT d AS date_operation
+        FROM (
+            SELECT date_operation AS d FROM recus
+            UNION
+            SELECT date_depense FROM sorties
+        ) t
+        WHERE annee_scolaire_de(d) = %(annee)s
+          AND d NOT IN (SELECT date_operation FROM dates_caisse)
+    ),
+    jours AS (
+        SELECT j.date_operation,
+               COALESCE(r.encaisse, 0) AS encaisse,
+               COALESCE(r.nb, 0) AS nb_paiements,
+               c.entrees,
+               c.entrees - COALESCE(r.encaisse, 0) AS ecart_entrees,
+               COALESCE(c.depenses, s.depenses, 0) AS depenses,
+               c.report,
+               c.report_attendu,
+               c.report - c.report_attendu AS ecart_report,
+               c.date_operation IS NULL AS sans_caisse
+        FROM (
+            SELECT date_operation FROM caisse
+            UNION ALL
+            SELECT date_operation FROM sans_caisse
+        ) j
+        LEFT JOIN caisse c ON c.date_operation = j.date_operation
+        LEFT JOIN recus r ON r.date_operation = j.date_operation
+        LEFT JOIN sorties s ON s.date_depense = j.date_operation
+    )
+    INSERT INTO rapprochement_caisse (
+        annee_scolaire, date_operation, encaisse, nb_paiements, entrees,
+        ecart_entrees, depenses, report, report_attendu, ecart_report,
+        anomalies
+    )
+    SELECT %(annee)s, date_operation, encaisse, nb_paiements, entrees,
+           ecart_entrees, depenses, report, report_attendu, ecart_report,
+           array_remove(ARRAY[
+               CASE WHEN abs(ecart_entrees) > %(tolerance)s
+                    THEN 'ecart_entrees' END,
+               CASE WHEN abs(ecart_report) > %(tolerance)s
+                    THEN 'ecart_report' END,
+               CASE WHEN sans_caisse THEN 'caisse_absente' END
+           ], NULL)
+    FROM jours
+"""
+
+
+def annee_precedente(annee):
+    """
+    "2026-2027" → "2025-2026".
+    """
+    debut = int(annee[:4])
+    return f"{debut - 1}-{debut}"
+
+
+def annee_suivante(annee):
+    """
+    "2026-2027" → "2027-2028".
+    """
+    debut = int(annee[:4])
+    return f"{debut + 1}-{debut + 2}"
+
+
+def rapprocher(conn, annee, tolerance=TOLERANCE):
+    """
+    Recalcule et stocke le rapprochement de toute l'année (remplace le
+    précédent). Retourne le résumé (voir resume()).
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            "DELETE FROM rapprochement_annee WHERE annee_scolaire = %s",
+            (annee,)
+        )
+        # Versions lues dans la même transaction que les données
+        cur.execute("""
+            INSERT INTO rapprochement_annee (annee_scolaire, tolerance, versions)
+            SELECT %s, %s, COALESCE(jsonb_object_agg(domaine, version), '{}')
+            FROM data_version
+            WHERE domaine = ANY(%s)
+        """, (annee, tolerance, list(DOMAINES)))
+        cur.execute(_RAPPROCHER, {
+            "annee": annee,
+            "precedente": annee_precedente(annee),
+            "voisines": [annee_precedente(annee), annee, annee_suivante(annee)],
+            "tolerance": tolerance,
+        })
+
+    conn.commit()
+    return resume(conn, annee)
+
+
+def annees_a_rapprocher(conn):
+    """
+    Années présentes en caisse, dans les paiements ou les dépenses
+    (triées).
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT annee_scolaire FROM caisse_journaliere
+            UNION
+            SELECT annee_scolaire FROM paiements
+            UNION
+            SELECT annee_scolaire FROM depense
+            ORDER BY 1
+        """)
+        return [a for (a,) in cur.fetchall()]
+
+
+# ======================================================
+# LECTURE
+# ======================================================
+
+def resume(conn, annee):
+    """
+    Résumé du dernier calcul : calcule_le, tolerance, a_jour (False si
+    paiements, caisse ou dépenses ont changé depuis), nb_jours,
+    nb par anomalie, totaux et écarts cumulés. None si jamais calculé.
+    """
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute("""
+            SELECT a.calcule_le, a.tolerance::float,
+                   a.versions = (
+                       SELECT COALESCE(jsonb_object_agg(domaine, version), '{}')
+                       FROM data_version
+                       WHERE domaine = ANY(%(domaines)s)
+                   ) AS a_jour,
+                   COUNT(r.date_operation) AS nb_jours,
+                   COUNT(*) FILTER (WHERE r.anomalies <> '{}') AS nb_jours_anomalie,
+                   COUNT(*) FILTER (WHERE 'ecart_entrees' = ANY(r.anomalies))
+                       AS ecart_entrees,
+                   COUNT(*) FILTER (WHERE 'ecart_report' = ANY(r.anomalies))
+                       AS ecart_report,
+                   COUNT(*) FILTER (WHERE 'caisse_absente' = ANY(r.anomalies))
+                       AS caisse_absente,
+                   COALESCE(SUM(r.encaisse), 0)::float AS encaisse,
+                   COALESCE(SUM(r.entrees), 0)::float AS entrees,
+                   COALESCE(SUM(r.ecart_entrees), 0)::float AS total_ecart_entrees,
+                   COALESCE(SUM(r.depenses), 0)::float AS depenses
+            FROM rapprochement_annee a
+            LEFT JOIN rapprochement_caisse r USING (annee_scolaire)
+            WHERE a.annee_scolaire = %(annee)s
+            GROUP BY a.annee_scolaire
+        """, {"annee": annee, "domaines": list(DOMAINES)})
+        row = cur.fetchone()
+
+    if row is None:
+        return None
+
+    return {
+        "annee_scolaire": annee,
+        "calcule_le": row["calcule_le"].isoformat(timespec="seconds"),
+        "tolerance": row["tolerance"],
+        "a_jour": row["a_jour"],
+        "nb_jours": row["nb_jours"],
+        "nb_jours_anomalie": row["nb_jours_anomalie"],
+        "anomalies": {a: row[a] for a in ANOMALIES},
+        "encaisse": round(row["encaisse"], 2),
+        "entrees": round(row["entrees"], 2),
+        "ecart_entrees": round(row["total_ecart_entrees"], 2),
+        "depenses": round(row["depenses"], 2),
+    }
+
+
+def lire_jours(conn, annee, anomalies_seules=False):
+    """
+    Jours stockés de l'année (ordre chronologique) ; anomalies_seules :
+    uniquement les jours signalés.
+    """
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(f"""
+            SELECT date_operation::text AS date, nb_paiements,
+                   encaisse::float, entrees::float, ecart_entrees::float,
+                   depenses::float, report::float, report_attendu::float,
+                   ecart_report::float, anomalies
+            FROM rapprochement_caisse
+            WHERE annee_scolaire = %s
+            {"AND anomalies <> '{}'" if anomalies_seules else ""}
+            ORDER BY date_operation
+        """, (annee,))
+        return cur.fetchall()
+
+
+# ======================================================
+# MAIN
+# ======================================================
+
+USAGE = """Usage :
+  python rapprochement.py 2025-2026    rapproche une année
+  python rapprochement.py toutes       rapproche toutes les années
+"""
+
+if __name__ == "__main__":
+    DATABASE_URL = os.environ.get("DATABASE_URL")
+    if not DATABASE_URL:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+
+    args = sys.argv[1:]
+    if len(args) != 1:
+        print(USAGE)
+        sys.exit(1)
+
+    with psycopg.connect(
+        DATABASE_URL,
+        sslmode="require" if "render.com" in DATABASE_URL else "disable"
+    ) as conn:
+
+        if args[0] == "toutes":
+            annees = annees_a_rapprocher(conn)
+        elif annee_valide(args[0]):
+            annees = args
+        else:
+            print("❌ Année scolaire invalide (format : 2025-2026)")
+            sys.exit(1)
+
+        for annee in annees:
+            r = rapprocher(conn, annee)
+            print(
+                f"✅ {annee} : {r['nb_jours']} jour(s), "
+                f"{r['nb_jours_anomalie']} avec anomalie {r['anomalies']}"
+            )
@@ -0,0 +1,32 @@
+"""
+routes — BLUEPRINTS DE L'APPLICATION (enregistrés par server_flask.create_app)
+
+✔ auth        : accueil, connexion admin / compta, accès par mot de passe
+✔ inscription : inscriptions, fiches et gestion des élèves
+✔ finance     : tableaux de bord financiers
+✔ fip         : calculs FIP, formulaires, import Excel THZBD
+✔ rapports    : rapports PDF par classe, journal
+✔ impayes     : impayés de toute l'école (JSON, CSV, HTML)
+✔ mail        : notifications et e-mails
+✔ caisse      : caisse, soldes, dépenses, paiements
+✔ rapprochement : rapprochement caisse / paiements / dépenses
+✔ systeme     : diagnostic (ping, db-test, sql_stats)
+"""
+
+from routes import (
+    auth, inscription, finance, fip, rapports, impayes, mail, caisse,
+    rapprochement, systeme
+)
+
+BLUEPRINTS = (
+    auth.bp,
+    inscription.bp,
+    finance.bp,
+    fip.bp,
+    rapports.bp,
+    impayes.bp,
+    mail.bp,
+    caisse.bp,
+    rapprochement.bp,
+    systeme.bp,
+)
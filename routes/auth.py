@@ -0,0 +1,167 @@
+"""
+routes/auth.py — ACCUEIL, CONNEXION, ACCÈS ADMIN / COMPTA
+
+✔ Pages publiques (/, /connexion, /thz, /entreprise, /home)
+✔ Connexion admin / compta (/admin/login, /logout)
+✔ Accès par mot de passe (panel admin, résumé journalier)
+"""
+
+from flask import (
+    Blueprint, jsonify, request, render_template, redirect, session
+)
+
+from commun import ADMIN_PASSWORDS, COMPTA_PASSWORDS
+
+bp = Blueprint("auth", __name__)
+
+
+@bp.route("/connexion")
+def connexion():
+    return render_template("connexion.html")
+
+
+
+@bp.route("/thz")
+def thz():
+    return render_template("thz.html")
+
+
+@bp.route("/entreprise")
+def entreprise():
+    return render_template("index.html")
+
+
+
+#================
+#  ROUTE LOGIN
+#================
+
+@bp.route("/login", methods=["POST"])
+def login():
+
+    password = request.form.get("password")
+
+    if password in ADMIN_PASSWORDS:
+        session["logged_in"] = True
+        return redirect("/thz")
+
+    else:
+        return redirect("/")
+
+
+
+#================
+#  ROUTE ADMIN/LOGIN
+#================
+
+
+@bp.route("/admin/login", methods=["GET", "POST"])
+def admin_login():
+
+    error = None
+
+    if request.method == "POST":
+
+        pwd = request.form.get("password", "").strip()
+
+        # =========================
+        # ADMIN
+        # =========================
+        if pwd in ADMIN_PASSWORDS:
+
+            session["role"] = "admin"
+
+            return redirect("/admin/dashboard")
+
+        # =========================
+        # COMPTABILITE
+        # =========================
+        if pwd in COMPTA_PASSWORDS:
+
+            session["role"] = "compta"
+
+            return redirect("/admin/dashboard/finance")
+
+        error = "Mot de passe incorrect."
+
+    return render_template(
+        "login_form.html",
+        error=error
+    )
+
+
+
+#================
+#  ROUTE HOME
+#===============
+
+
+@bp.route("/home")
+def home():
+    return render_template("home.html")
+
+
+
+#====================
+#  ROUTE DECONNEXION
+#====================
+
+
+@bp.route("/logout")
+def logout():
+    session.clear()
+    return redirect("/admin/login")
+
+
+
+@bp.route("/")
+def index():
+    return render_template("index.html")
+
+
+
+#===========Modal B1=======Page /thz
+
+@bp.route("/acces-admin-panel", methods=["POST"])
+def acces_admin_panel():
+
+    data = request.get_json(silent=True) or {}
+    password = data.get("password", "")
+
+
+    # ADMIN_PASSWORDS est déjà défini chez toi
+    if password in ADMIN_PASSWORDS:
+        session["admin"] = True
+        session.permanent = True
+        return jsonify({"ok": True})
+
+    return jsonify({"ok": False})
+
+
+
+#===========Modal B2=======Page /thz
+
+
+@bp.route("/acces-resume-journalier", methods=["POST"])
+def acces_resume_journalier():
+
+    data = request.get_json()
+    password = data.get("password", "")
+
+    # 🔐 vérification avec la variable déjà existante
+    if password in COMPTA_PASSWORDS:
+        session["auth_compta"] = True
+        session.permanent = True   # 🔥 IMPORTANT
+        return jsonify({"ok": True})
+
+    return jsonify({"ok": False})
+
+
+# ===============================================================
+# 🔵 11 bis. Authentification ADMIN
+# ===============================================================
+
+    
+    
+#===============HOME=========   
+
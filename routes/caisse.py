@@ -0,0 +1,572 @@
+"""
+routes/caisse.py — CAISSE, SOLDES, DÉPENSES, PAIEMENTS
+
+✔ Listes caisse / soldes / dépenses
+✔ Résumé journalier (compta)
+✔ Analyse des dépenses (/api/depenses/analyse) : totaux par période et
+  catégories principales, caisse vs banque, lus dans les cumuls
+  depense_jour (depenses.py)
+✔ Saisie d'un paiement (/admin/paiement)
+✔ Saisie par lot des reçus papier (POST /api/paiements/lot, JSON)
+"""
+
+from datetime import date, datetime
+
+from psycopg.rows import dict_row
+from flask import Blueprint, jsonify, request, render_template
+
+from metier import annee_scolaire_from_date
+from paiements import (
+    enregistrer_paiement, enregistrer_lot, valider_ligne, LOT_MAX
+)
+from schema_annee import assurer_partitions
+from depenses import PERIODES, lire_analyse
+from compression import format_colonnes, en_colonnes
+from commun import (
+    fetch_all, require_role, require_api_role, get_db_connection, get_conn,
+    VERSIONS, canonical_month, annees_demandees
+)
+
+bp = Blueprint("caisse", __name__)
+
+
+@bp.route("/caisse-list")
+def caisse_list():
+    annee = request.args.get("annee_scolaire")
+    date_debut = request.args.get("date_debut")
+    date_fin = request.args.get("date_fin")
+
+    where = []
+    params = []
+
+    if annee:
+        where.append("annee_scolaire = %s")
+        params.append(annee)
+
+    if date_debut:
+        where.append("date_operation >= %s")
+        params.append(date_debut)
+
+    if date_fin:
+        where.append("date_operation <= %s")
+        params.append(date_fin)
+
+    where_sql = "WHERE " + " AND ".join(where) if where else ""
+
+    query = f"""
+        SELECT
+            date_operation,
+            (report + bloc1 + bloc2 + bus1 + bus2) AS total
+        FROM caisse_journaliere
+        {where_sql}
+        ORDER BY date_operation
+        LIMIT 100
+    """
+
+    with get_conn() as conn:
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+
+    return render_template(
+        "caisse_list.html",
+        rows=rows,
+        annee=annee,
+        date_debut=date_debut,
+        date_fin=date_fin
+    )
+
+
+@bp.route("/solde-list")
+def solde_list():
+    annee = request.args.get("annee_scolaire")
+    date_debut = request.args.get("date_debut")
+    date_fin = request.args.get("date_fin")
+
+    where = []
+    params = []
+
+    if annee:
+        where.append("c.annee_scolaire = %s")
+        params.append(annee)
+
+    if date_debut:
+        where.append("c.date_operation >= %s")
+        params.append(date_debut)
+
+    if date_fin:
+        where.append("c.date_operation <= %s")
+        params.append(date_fin)
+
+    where_sql = "WHERE " + " AND ".join(where) if where else ""
+
+    query = f"""
+    SELECT
+        c.date_operation,
+        c.annee_scolaire,
+        c.report,
+        c.bloc1,
+        c.bloc2,
+        c.bus1,
+        c.bus2,
+        (c.bloc1 + c.bloc2 + c.bus1 + c.bus2) AS tot_entr,
+        COUNT(d.id) AS nb_depenses,
+        COALESCE(SUM(d.montant), 0) AS total_dep,
+        COALESCE(SUM(d.banque), 0) AS banque,
+        (
+            (c.bloc1 + c.bloc2 + c.bus1 + c.bus2 + c.report)
+            - (COALESCE(SUM(d.montant), 0) + COALESCE(SUM(d.banque), 0))
+        ) AS solde
+    FROM caisse_journaliere c
+    LEFT JOIN depense d
+      ON d.date_depense = c.date_operation
+     AND d.annee_scolaire = c.annee_scolaire
+    {where_sql}
+    GROUP BY
+        c.date_operation,
+        c.annee_scolaire,
+        c.report,
+        c.bloc1, c.bloc2, c.bus1, c.bus2
+    ORDER BY c.date_operation
+    LIMIT 100
+    """
+
+
+    with get_conn() as conn:
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+
+    return render_template(
+        "solde_list.html",
+        rows=rows,
+        annee=annee,
+        date_debut=date_debut,
+        date_fin=date_fin
+    )
+
+
+
+@bp.route("/depenses-list")
+def depenses_list():
+    annee = request.args.get("annee_scolaire")
+    date_debut = request.args.get("date_debut")
+    date_fin = request.args.get("date_fin")
+
+    where = []
+    params = []
+
+    if annee:
+        where.append("annee_scolaire = %s")
+        params.append(annee)
+
+    if date_debut:
+        where.append("date_depense >= %s")
+        params.append(date_debut)
+
+    if date_fin:
+        where.append("date_depense <= %s")
+        params.append(date_fin)
+
+    where_sql = "WHERE " + " AND ".join(where) if where else ""
+
+    query = f"""
+        SELECT
+            date_depense,
+            ref_dp,
+            libelle,
+            categorie,
+            montant,
+            banque
+        FROM depense
+        {where_sql}
+        ORDER BY date_depense
+        LIMIT 100
+    """
+
+    with get_conn() as conn:
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+
+    return render_template(
+        "depenses.html",
+        rows=rows,
+        annee=annee,
+        date_debut=date_debut,
+        date_fin=date_fin
+    )
+
+
+
+@bp.route("/resume-journalier")
+@require_role("admin", "compta")   # 🔐 Sécurité recommandée
+def resume_journalier():
+
+    # ======================================================
+    # 🔹 PARAMÈTRES
+    # ======================================================
+    annee = request.args.get("annee", "2025-2026")
+    date_debut = request.args.get("date_debut")
+    date_fin = request.args.get("date_fin")
+
+    # ======================================================
+    # 🔹 WHERE DYNAMIQUE
+    # ======================================================
+    where_clauses = ["c.annee_scolaire = %s"]
+    params = [annee]
+
+    if date_debut:
+        where_clauses.append("c.date_operation >= %s")
+        params.append(date_debut)
+
+    if date_fin:
+        where_clauses.append("c.date_operation <= %s")
+        params.append(date_fin)
+
+    where_sql = "WHERE " + " AND ".join(where_clauses)
+
+    # ======================================================
+    # 🔹 REQUÊTE SQL (LOGIQUE MÉTIER OFFICIELLE)
+    # ======================================================
+    query = f"""
+        SELECT
+            c.date_operation AS date_jour,
+
+            COALESCE(c.report,0) AS report,
+            COALESCE(c.bloc1,0)  AS bloc1,
+            COALESCE(c.bloc2,0)  AS bloc2,
+            COALESCE(c.bus1,0)   AS bus1,
+            COALESCE(c.bus2,0)   AS bus2,
+
+            -- ✅ Total Entré SANS report
+            (COALESCE(c.bloc1,0) + COALESCE(c.bloc2,0) +
+             COALESCE(c.bus1,0)  + COALESCE(c.bus2,0)) AS tot_entr,
+
+            COALESCE(d.nb_depenses,0)   AS nb_depenses,
+            COALESCE(d.total_cash,0)    AS total_depenses,
+            COALESCE(d.total_banque,0)  AS banque,
+
+            -- ✅ Solde réel = (Entré + Report) - Dépenses
+            (
+                (COALESCE(c.report,0) +
+                 COALESCE(c.bloc1,0) +
+                 COALESCE(c.bloc2,0) +
+                 COALESCE(c.bus1,0) +
+                 COALESCE(c.bus2,0))
+                -
+                (COALESCE(d.total_cash,0) + COALESCE(d.total_banque,0))
+            ) AS solde
+
+        FROM caisse_journaliere c
+
+        LEFT JOIN (
+            SELECT
+                date_depense,
+                annee_scolaire,
+                COUNT(*) AS nb_depenses,
+                SUM(COALESCE(montant,0)) AS total_cash,
+                SUM(COALESCE(banque,0))  AS total_banque
+            FROM depense
+            GROUP BY date_depense, annee_scolaire
+        ) d
+          ON d.date_depense = c.date_operation
+         AND d.annee_scolaire = c.annee_scolaire
+
+        {where_sql}
+        ORDER BY c.date_operation
+    """
+
+    rows = fetch_all(query, tuple(params))
+
+    # ======================================================
+    # 🔹 TOTAUX GÉNÉRAUX (RÈGLE MÉTIER)
+    # ======================================================
+    totaux = {
+        "report": 0,
+        "bloc1": 0,
+        "bloc2": 0,
+        "bus1": 0,
+        "bus2": 0,
+        "tot_entr": 0,
+        "total_depenses": 0,
+        "banque": 0,
+        "solde": 0
+    }
+
+    for r in rows:
+        totaux["report"] += r["report"]
+        totaux["bloc1"] += r["bloc1"]
+        totaux["bloc2"] += r["bloc2"]
+        totaux["bus1"]  += r["bus1"]
+        totaux["bus2"]  += r["bus2"]
+        totaux["total_depenses"] += r["total_depenses"]
+        totaux["banque"] += r["banque"]
+
+    # ✅ Total Entré réel (sans report)
+    totaux["tot_entr"] = (
+        totaux["bloc1"] +
+        totaux["bloc2"] +
+        totaux["bus1"] +
+        totaux["bus2"]
+    )
+
+    # ✅ Solde final = dernier jour affiché
+    totaux["solde"] = rows[-1]["solde"] if rows else 0
+
+    return render_template(
+        "resume_journalier.html",
+        rows=rows,
+        totaux=totaux,
+        annee=annee,
+        date_debut=date_debut,
+        date_fin=date_fin
+    )
+
+
+@bp.route("/api/depenses-par-date")
+@require_role("admin", "compta")
+def api_depenses_par_date():
+
+    date_jour = request.args.get("date")
+
+    if not date_jour:
+        return jsonify({"error": "date manquante"}), 400
+
+    query = """
+        SELECT
+            d.id,
+            d.ref_dp,
+            d.libelle,
+            d.montant,
+            d.annee_scolaire
+        FROM depense d
+        WHERE d.date_depense = %s
+        ORDER BY d.id
+    """
+
+    rows = fetch_all(query, (date_jour,))
+
+    return jsonify({
+        "date": date_jour,
+        "nb": len(rows),
+        "depenses": rows
+    })
+
+
+#========================
+#  ANALYSE DES DÉPENSES
+#========================
+
+TOP_DEFAUT = 10
+TOP_MAX = 50
+
+
+@VERSIONS.cache("depense")
+def analyse_depenses(annees, du, au, grain, categorie):
+    """
+    Dépenses par période et par catégorie (depenses.lire_analyse).
+    Partagé entre requêtes : ne pas modifier le résultat.
+    """
+    conn = get_db_connection()
+    try:
+        return lire_analyse(conn, annees, du, au, grain, categorie)
+    finally:
+        conn.close()
+
+
+@bp.route("/api/depenses/analyse")
+@require_api_role("admin", "compta")
+def api_depenses_analyse():
+    """
+    Totaux des dépenses (caisse, banque, total, nb) par période et
+    catégories principales.
+
+    ?annee=2025-2026         une ou plusieurs années (virgules) ou
+                             « toutes » (défaut : année en cours)
+    ?du= ?au=                dates incluses (AAAA-MM-JJ)
+    ?grain=mois              jour, mois ou annee
+    ?top=10                  nombre de catégories (1 à 50)
+    ?categorie=CARBURANT     une seule catégorie
+    ?format=colonnes         "champs_*" + lignes en tableaux
+    """
+    annees = annees_demandees()
+
+    grain = request.args.get("grain", "mois").strip().lower()
+    if grain not in PERIODES:
+        return jsonify({"error": "Grain invalide", "grains": list(PERIODES)}), 400
+
+    try:
+        top = min(max(int(request.args.get("top", TOP_DEFAUT)), 1), TOP_MAX)
+    except ValueError:
+        return jsonify({"error": "top invalide"}), 400
+
+    bornes = {}
+    try:
+        for nom in ("du", "au"):
+            valeur = request.args.get(nom, "").strip()
+            if valeur:
+                bornes[nom] = datetime.strptime(valeur, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Date invalide"}), 400
+
+    categorie = request.args.get("categorie", "").strip().upper() or None
+
+    try:
+        analyse = analyse_depenses(
+            annees, bornes.get("du"), bornes.get("au"), grain, categorie
+        )
+    except Exception as e:
+        print("❌ ERREUR ANALYSE DÉPENSES :", e)
+        return jsonify({"error": "Erreur serveur dépenses"}), 500
+
+    data = {
+        "annees": list(annees) if annees else "toutes",
+        "grain": grain,
+        "filtres": {
+            **{k: str(v) for k, v in bornes.items()},
+            **({"categorie": categorie} if categorie else {}),
+        },
+        "total": analyse["total"],
+        "periodes": analyse["periodes"],
+        "nb_categories": len(analyse["categories"]),
+        "categories": analyse["categories"][:top],
+    }
+    if format_colonnes():
+        data["champs_periodes"], data["periodes"] = en_colonnes(data["periodes"])
+        data["champs_categories"], data["categories"] = en_colonnes(data["categories"])
+
+    return jsonify(data)
+
+
+@bp.route("/admin/paiement", methods=["GET", "POST"])
+#@require_role("admin", "compta")
+def paiement():
+
+    message = ""
+
+    if request.method == "POST":
+
+        matricule = request.form.get("matricule")
+        mois = request.form.get("mois")
+        montant = request.form.get("montant")
+
+        # 🔒 Validation
+        if not matricule or not mois or not montant:
+            message = "❌ Données invalides"
+            return render_template("paiement.html", message=message)
+
+        mois = canonical_month(mois)
+        if not mois:
+            message = "❌ Mois invalide"
+            return render_template("paiement.html", message=message)
+
+        conn = None
+        try:
+            conn = get_db_connection()
+
+            # 💾 Partition de l'année (vérifiée une fois par worker)
+            aujourdhui = date.today()
+            assurer_partitions(
+                conn, "paiements", [annee_scolaire_from_date(aujourdhui)]
+            )
+
+            # 🔒 Élève + anti double paiement + reçu + solde : 1 requête
+            # (contrainte UNIQUE, aucune course entre caissiers)
+            resultat = enregistrer_paiement(
+                conn, matricule, mois, montant, aujourdhui
+            )
+
+            if resultat is None:
+                message = "❌ Élève introuvable"
+                return render_template("paiement.html", message=message)
+
+            if resultat["numrecu"] is None:
+                conn.rollback()
+                message = "⚠️ Ce mois est déjà payé"
+                return render_template(
+                    "paiement.html", message=message, paiement=resultat
+                )
+
+            # 🔄 Invalide les caches (dashboards, PDF, fiches élèves)
+            VERSIONS.bump(conn, "paiements")
+
+            conn.commit()
+            VERSIONS.invalider()
+
+            message = f"✅ Paiement enregistré pour {resultat['nom']}"
+            return render_template(
+                "paiement.html", message=message, paiement=resultat
+            )
+
+        except Exception as e:
+            print("❌ ERREUR PAIEMENT :", e)
+            message = "❌ Erreur serveur"
+
+        finally:
+            if conn is not None:
+                conn.close()
+
+    return render_template("paiement.html", message=message)
+
+
+#========================
+#  SAISIE PAR LOT (JSON)
+#========================
+
+@bp.route("/api/paiements/lot", methods=["POST"])
+@require_api_role("admin", "compta")
+def api_paiements_lot():
+    """
+    Saisie de fin de journée : une requête pour tous les reçus papier.
+
+    Corps : {"paiements": [{"matricule", "mois", "montant",
+                            "recu" (obligatoire pour Ac. / Sld.),
+                            "date" (optionnelle)}]}
+    Réponse : résultat par ligne (enregistre, deja_paye, recu_existant,
+    eleve_introuvable, invalide) + soldes à jour des élèves touchés.
+    Une ligne refusée n'annule pas les autres.
+    """
+    data = request.get_json(silent=True) or {}
+    lignes = data.get("paiements")
+
+    if not isinstance(lignes, list) or not lignes:
+        return jsonify({"error": "Liste 'paiements' manquante ou vide"}), 400
+    if len(lignes) > LOT_MAX:
+        return jsonify({"error": f"Maximum {LOT_MAX} paiements par lot"}), 400
+
+    conn = None
+    try:
+        conn = get_db_connection()
+
+        # 💾 Partitions des années présentes dans le lot
+        validees = [valider_ligne(ligne) for ligne in lignes]
+        assurer_partitions(
+            conn, "paiements", {p["annee"] for p, _ in validees if p}
+        )
+
+        resultats, soldes = enregistrer_lot(conn, lignes, validees)
+        nb_enregistres = sum(r["statut"] == "enregistre" for r in resultats)
+
+        # 🔄 Invalide les caches (dashboards, PDF, fiches élèves)
+        if nb_enregistres:
+            VERSIONS.bump(conn, "paiements")
+
+        conn.commit()
+        if nb_enregistres:
+            VERSIONS.invalider()
+
+        return jsonify({
+            "nb": len(resultats),
+            "nb_enregistres": nb_enregistres,
+            "resultats": resultats,
+            "soldes": soldes,
+        })
+
+    except Exception as e:
+        print("❌ ERREUR PAIEMENTS LOT :", e)
+        return jsonify({"error": "Erreur serveur"}), 500
+
+    finally:
+        if conn is not None:
+            conn.close()
@@ -0,0 +1,540 @@
+"""
+routes/finance.py — TABLEAUX DE BORD FINANCIERS
+
+✔ KPI élèves / paiements (/api/dashboard, /admin/dashboard)
+✔ Dashboard finance (KPI, séries mensuelles, répartition par section)
+✔ Flux SSE /api/dashboard/finance/stream : KPI poussés au NOTIFY
+  (1 agrégat par changement et par worker, quel que soit le nombre
+  de navigateurs ouverts)
+✔ Cube /api/finance/cube : dimensions et mesures au choix, lues dans
+  la table de cumuls cube_paiements (cube_finance.py) ; séries
+  mensuelles et répartition par section servies par le cube
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+
+from psycopg.rows import dict_row
+from flask import Blueprint, Response, jsonify, render_template, request
+
+from commun import (
+    require_role, require_api_role, annee_demandee, annees_demandees,
+    MOIS_SCOLAIRE, get_db_connection, VERSIONS,
+    canonical_month, canonical_classe
+)
+from cube_finance import DIMENSIONS, MESURES, lire_cube
+from compression import format_colonnes, en_colonnes
+
+bp = Blueprint("finance", __name__)
+
+
+# Flux SSE : chaque flux ouvert occupe un thread gthread du worker
+SSE_MAX_FLUX = int(os.environ.get("SSE_MAX_FLUX", "4"))
+SSE_DUREE_MAX = float(os.environ.get("SSE_DUREE_MAX", "300"))
+SSE_BATTEMENT = float(os.environ.get("SSE_BATTEMENT", "20"))
+SSE_RETRY_MS = 3000
+
+DOMAINES_KPI_FINANCE = ("eleves", "paiements", "tarif_fip")
+
+_flux_ouverts = threading.BoundedSemaphore(SSE_MAX_FLUX)
+
+
+@VERSIONS.cache("eleves", "paiements")
+def kpi_dashboard(annee):
+    """
+    KPI du tableau de bord (recalculés seulement si eleves/paiements changent).
+    Paiements limités à l'année scolaire (1 seule partition lue).
+    """
+
+    # ---------------------------
+    # 1️⃣ Connexion DB UNIQUE
+    # ---------------------------
+    conn = get_db_connection()
+
+    try:
+        with conn.cursor(row_factory=dict_row) as cur:
+
+            # ---------------------------
+            # 2️⃣ Nombre d'élèves
+            # ---------------------------
+            cur.execute("SELECT COUNT(*) AS total FROM eleves;")
+            nb_eleves = cur.fetchone()["total"]
+
+            # ---------------------------
+            # 3️⃣ Nombre de paiements + 4️⃣ Totaux FIP / FF payés
+            # ---------------------------
+            cur.execute("""
+                SELECT COUNT(*) AS nb, COALESCE(SUM(fip), 0) AS total,
+                       COALESCE(SUM(ff), 0) AS total_ff
+                FROM paiements
+                WHERE annee_scolaire = %s;
+            """, (annee,))
+            row = cur.fetchone()
+            nb_paiements, total_fip = row["nb"], row["total"]
+            total_ff = row["total_ff"]
+
+            # ---------------------------
+            # 5️⃣ Nombre de classes actives
+            # ---------------------------
+            cur.execute("""
+                SELECT COUNT(DISTINCT classe) AS total
+                FROM eleves
+                WHERE classe IS NOT NULL;
+            """)
+            nb_classes = cur.fetchone()["total"]
+
+    finally:
+        conn.close()
+
+    return {
+        "annee_scolaire": annee,
+        "nb_eleves": int(nb_eleves),
+        "nb_paiements": int(nb_paiements),
+        "nb_classes": int(nb_classes),
+        "total_fip_paye": round(float(total_fip), 2),
+        "total_ff_paye": round(float(total_ff), 2)
+    }
+
+
+@bp.route("/api/dashboard")
+def api_dashboard():
+    annee = annee_demandee()
+    try:
+        # ---------------------------
+        # 6️⃣ Réponse JSON propre
+        # ---------------------------
+        return jsonify(kpi_dashboard(annee))
+
+    except Exception as e:
+        print("❌ ERREUR API DASHBOARD :", e)
+        return jsonify({"error": "Erreur serveur dashboard"}), 500
+
+
+
+# ==================================================================================================
+# 🔵 MENU PRINCIPAL ADMIN (TABLEAU DE BORD) — templates/dashboard.html
+# ==================================================================================================
+
+# ===============================================================
+# 🔵 Interface Dashboard ADMIN (MENU)
+# ===============================================================
+
+
+@bp.route("/admin/dashboard")
+@require_role("admin", "compta")
+
+
+def admin_dashboard():
+    return render_template("dashboard.html")
+
+
+
+#================================================
+#  CODE FLASK — VERSION PRO AVEC COMMENTAIRES
+#================================================
+
+@VERSIONS.cache(*DOMAINES_KPI_FINANCE)
+def kpi_finance(annee, jour):
+    """
+    KPI financiers d'une année scolaire
+    (cache invalidé par eleves/paiements/tarif_fip).
+    `jour` fait partie de la clé : le « mois courant » change avec lui.
+    """
+
+    # ----------------------------------------------------
+    # 1️⃣ Connexion à la base de données
+    # ----------------------------------------------------
+    # Une seule connexion = performance + stabilité
+    conn = get_db_connection()
+
+    try:
+        cur = conn.cursor(row_factory=dict_row)
+
+        # ----------------------------------------------------
+        # 2️⃣ KPI : Nombre total d'élèves
+        # ----------------------------------------------------
+        cur.execute("SELECT COUNT(*) AS total FROM eleves;")
+        nb_eleves = cur.fetchone()["total"]
+
+        # ----------------------------------------------------
+        # 3️⃣ KPI : Total encaissé (global), FIP et FF
+        # ----------------------------------------------------
+        cur.execute("""
+            SELECT COALESCE(SUM(fip), 0) AS total,
+                   COALESCE(SUM(ff), 0) AS total_ff
+            FROM paiements
+            WHERE annee_scolaire = %s;
+        """, (annee,))
+        row = cur.fetchone()
+        total_encaisse = float(row["total"])
+        total_encaisse_ff = float(row["total_ff"])
+
+        # ----------------------------------------------------
+        # 4️⃣ KPI : Total encaissé pour le mois courant
+        # ----------------------------------------------------
+        # On calcule dynamiquement le début et la fin du mois
+        cur.execute("""
+            SELECT COALESCE(SUM(fip), 0) AS total,
+                   COALESCE(SUM(ff), 0) AS total_ff
+            FROM paiements
+            WHERE annee_scolaire = %s
+              AND datepaiement >= date_trunc('month', %s::date)
+              AND datepaiement <  date_trunc('month', %s::date) + interval '1 month';
+        """, (annee, jour, jour))
+        row = cur.fetchone()
+        total_mois = float(row["total"])
+        total_mois_ff = float(row["total_ff"])
+
+        # ----------------------------------------------------
+        # 5️⃣ KPI : Nombre de classes actives
+        # ----------------------------------------------------
+        cur.execute("""
+            SELECT COUNT(DISTINCT classe) AS total
+            FROM eleves
+            WHERE classe IS NOT NULL;
+        """)
+        nb_classes = cur.fetchone()["total"]
+
+        # ----------------------------------------------------
+        # 6️⃣ KPI : Calcul du montant attendu (logique métier)
+        # ----------------------------------------------------
+        # Tarif de la classe de chaque élève : une jointure, une somme
+        cur.execute("""
+            SELECT COALESCE(SUM(t.fip_mensuel), 0) * %s AS total,
+                   COALESCE(SUM(t.ff_mensuel), 0) * %s AS total_ff
+            FROM eleves e
+            JOIN tarif_fip t
+              ON t.classe = classe_canonique(e.classe)
+             AND t.annee_scolaire = %s;
+        """, (len(MOIS_SCOLAIRE), len(MOIS_SCOLAIRE), annee))
+        row = cur.fetchone()
+        total_attendu = float(row["total"])
+        total_attendu_ff = float(row["total_ff"])
+
+    finally:
+        # ----------------------------------------------------
+        # 7️⃣ Fermeture connexion
+        # ----------------------------------------------------
+        conn.close()
+
+    # ----------------------------------------------------
+    # 8️⃣ KPI : Impayé estimé
+    # ----------------------------------------------------
+    impaye_estime = max(total_attendu - total_encaisse, 0)
+    impaye_estime_ff = max(total_attendu_ff - total_encaisse_ff, 0)
+
+    return {
+        "annee_scolaire": annee,
+        "nb_eleves": nb_eleves,
+        "nb_classes": nb_classes,
+        "total_encaisse": round(total_encaisse, 2),
+        "total_mois_courant": round(total_mois, 2),
+        "total_attendu": round(total_attendu, 2),
+        "impaye_estime": round(impaye_estime, 2),
+        "total_encaisse_ff": round(total_encaisse_ff, 2),
+        "total_mois_courant_ff": round(total_mois_ff, 2),
+        "total_attendu_ff": round(total_attendu_ff, 2),
+        "impaye_estime_ff": round(impaye_estime_ff, 2)
+    }
+
+
+@bp.route("/api/dashboard/finance")
+@require_api_role("admin", "compta")
+def api_dashboard_finance():
+    """
+    Tableau de bord financier – KPI principaux
+
+    Cette route retourne uniquement des indicateurs chiffrés,
+    sans HTML, afin d'être utilisée par :
+    - le dashboard web
+    - des graphiques
+    - une application mobile
+
+    Paramètre optionnel : ?annee=2025-2026 (défaut : année en cours)
+    """
+    annee = annee_demandee()
+
+    try:
+        # ----------------------------------------------------
+        # 9️⃣ Réponse JSON propre et claire
+        # ----------------------------------------------------
+        return jsonify(kpi_finance(annee, date.today()))
+
+    except Exception as e:
+        print("❌ ERREUR KPI FINANCE :", e)
+        return jsonify({"error": "Erreur serveur KPI"}), 500
+
+
+#========================
+#  FLUX SSE DES KPI
+#========================
+
+def evenement_sse(nom, donnees):
+    return f"event: {nom}\ndata: {json.dumps(donnees)}\n\n"
+
+
+@bp.route("/api/dashboard/finance/stream")
+@require_api_role("admin", "compta")
+def api_dashboard_finance_stream():
+    """
+    Flux SSE (text/event-stream) des KPI financiers :
+    - event: kpi   → KPI complets à l'ouverture
+    - event: delta → seulement les KPI modifiés, après chaque NOTIFY
+      data_version (paiement, import, tarif)
+
+    Flux fermé après SSE_DUREE_MAX secondes (le navigateur se
+    reconnecte) ; 503 au-delà de SSE_MAX_FLUX flux par worker :
+    le dashboard revient alors au polling.
+    """
+    annee = annee_demandee()
+
+    if not _flux_ouverts.acquire(blocking=False):
+        return jsonify({"error": "Trop de flux ouverts, réessayer"}), 503
+
+    # Jusqu'à call_on_close, le créneau est rendu à la main en cas d'erreur
+    try:
+        VERSIONS.ecouter()
+        response = Response(_flux_kpi(annee), mimetype="text/event-stream")
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        response.call_on_close(_flux_ouverts.release)
+    except Exception as e:
+        _flux_ouverts.release()
+        print("❌ ERREUR OUVERTURE FLUX KPI FINANCE :", e)
+        return jsonify({"error": "Erreur serveur KPI"}), 500
+
+    return response
+
+
+def _flux_kpi(annee):
+    """
+    Événements SSE d'un flux (voir api_dashboard_finance_stream).
+    """
+    try:
+        signature = VERSIONS.signature(DOMAINES_KPI_FINANCE)
+        kpi = kpi_finance(annee, date.today())
+        yield f"retry: {SSE_RETRY_MS}\n" + evenement_sse("kpi", kpi)
+
+        fin = time.monotonic() + SSE_DUREE_MAX
+        while (reste := fin - time.monotonic()) > 0:
+            nouvelle = VERSIONS.attendre(
+                DOMAINES_KPI_FINANCE, signature, min(SSE_BATTEMENT, reste)
+            )
+            if nouvelle is None:
+                # Battement : garde la connexion ouverte (proxy Render)
+                yield ": battement\n\n"
+                continue
+
+            # Cache par version : un seul agrégat pour tous les flux
+            signature = nouvelle
+            nouveau = kpi_finance(annee, date.today())
+            delta = {k: v for k, v in nouveau.items() if kpi.get(k) != v}
+            kpi = nouveau
+            if delta:
+                yield evenement_sse("delta", delta)
+
+    except Exception as e:
+        print("❌ ERREUR FLUX KPI FINANCE :", e)
+        yield evenement_sse("erreur", {"error": "Erreur serveur KPI"})
+
+        
+  
+
+
+#========================
+#  décorateur API propre
+#========================  
+   
+
+          
+        
+
+#=========================
+# KPI HTML
+#=========================
+
+
+@bp.route("/admin/dashboard/finance")
+@require_role("admin", "compta")
+def admin_dashboard_finance():
+    """
+    Page HTML du tableau de bord financier
+    (les données viennent de l'API /api/dashboard/finance)
+    """
+    return render_template("dashboard_finance.html")
+
+#==============================
+# module pour les graphiques 1
+#=============================
+
+@bp.route("/api/dashboard/finance/monthly")
+@require_api_role("admin", "compta")
+def api_dashboard_finance_monthly():
+    """
+    Retourne les montants encaissés par mois scolaire
+    pour affichage graphique (Chart.js)
+    """
+    annee = annee_demandee()
+
+    try:
+        # Mois scolaires officiels (ordre fixe), lus dans le cube
+        mois_ordre = MOIS_SCOLAIRE
+        lignes = calcul_cube(("mois",), ("fip",), (annee,), ())["lignes"]
+        data = {l["mois"]: l["fip"] for l in lignes}
+
+        return jsonify({
+            "annee_scolaire": annee,
+            "labels": mois_ordre,
+            "values": [data.get(m, 0.0) for m in mois_ordre]
+        })
+
+    except Exception as e:
+        print("❌ ERREUR KPI MENSUEL :", e)
+        return jsonify({"error": "Erreur graphique mensuel"}), 500
+        
+        
+      
+
+      
+#===================================================
+# Graphique de répartition des paiements par section
+#==============================  =================     
+        
+        
+@bp.route("/api/dashboard/finance/by_section")
+@require_api_role("admin", "compta")
+def api_dashboard_finance_by_section():
+    """
+    Répartition financière par section
+    Version stable et optimisée pour graphique doughnut
+    """
+    annee = annee_demandee()
+
+    try:
+        lignes = sorted(
+            (l for l in calcul_cube(("section",), ("fip",), (annee,), ())["lignes"]
+             if l["fip"] > 0),
+            key=lambda l: -l["fip"]
+        )
+
+        return jsonify({
+            "annee_scolaire": annee,
+            "labels": [l["section"] or "Non définie" for l in lignes],
+            "values": [l["fip"] for l in lignes]
+        })
+
+    except Exception as e:
+        print("❌ ERREUR API SECTION :", e)
+        return jsonify({"error": "Erreur répartition section"}), 500
+
+
+#===================================================
+# CUBE FINANCIER (dimensions / mesures au choix)
+#===================================================
+
+@VERSIONS.cache("eleves", "paiements", "tarif_fip")
+def calcul_cube(dims, mesures, annees, filtres):
+    """
+    Lignes du cube + totaux (annees=None : toutes les années ;
+    filtres : tuple de paires (nom, valeur)).
+    Partagé entre requêtes : ne pas modifier le résultat.
+    """
+    conn = get_db_connection()
+    try:
+        lignes = lire_cube(conn, dims, mesures, annees, dict(filtres))
+    finally:
+        conn.close()
+
+    total = {}
+    for m in mesures:
+        valeurs = [l[m] for l in lignes]
+        total[m] = None if None in valeurs else round(sum(valeurs), 2)
+
+    return {"lignes": lignes, "total": total}
+
+
+def _liste_demandee(nom, permis, defaut):
+    """
+    ?nom=a,b → ("a", "b") (doublons retirés) ; None si une valeur
+    n'est pas dans `permis`.
+    """
+    brut = request.args.get(nom)
+    if brut is None:
+        return defaut
+    valeurs = tuple(dict.fromkeys(
+        v.strip().lower() for v in brut.split(",") if v.strip()
+    ))
+    return valeurs if set(valeurs) <= set(permis) else None
+
+
+@bp.route("/api/finance/cube")
+@require_api_role("admin", "compta")
+def api_finance_cube():
+    """
+    Cube financier : une route pour toutes les vues du tableau de bord.
+
+    ?dims=mois,section       regroupement (annee, mois, date, classe,
+                             section, categorie ; vide : total)
+    ?mesures=fip,attendu     fip, ff, nb, attendu, solde, attendu_ff,
+                             solde_ff (défaut : toutes)
+    ?annee=2025-2026         une ou plusieurs années (virgules) ou
+                             « toutes » (défaut : année en cours)
+    ?mois= ?classe= ?section= ?categorie= ?du= ?au=   filtres
+    ?format=colonnes         "champs" + "lignes" en tableaux
+    """
+    dims = _liste_demandee("dims", DIMENSIONS, ())
+    mesures = _liste_demandee("mesures", MESURES, MESURES)
+    if dims is None or not mesures:
+        return jsonify({
+            "error": "Dimension ou mesure inconnue",
+            "dimensions": list(DIMENSIONS),
+            "mesures": list(MESURES),
+        }), 400
+
+    annees = annees_demandees()
+
+    filtres = {}
+    mois = request.args.get("mois", "").strip()
+    if mois:
+        filtres["mois"] = canonical_month(mois)
+        if not filtres["mois"]:
+            return jsonify({"error": "Mois invalide"}), 400
+    classe = request.args.get("classe", "").strip()
+    if classe:
+        filtres["classe"] = canonical_classe(classe)
+        if not filtres["classe"]:
+            return jsonify({"error": "Classe invalide"}), 400
+    for nom in ("section", "categorie"):
+        valeur = request.args.get(nom, "").strip()
+        if valeur:
+            filtres[nom] = valeur.upper()
+    try:
+        for nom in ("du", "au"):
+            valeur = request.args.get(nom, "").strip()
+            if valeur:
+                filtres[nom] = datetime.strptime(valeur, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Date invalide"}), 400
+
+    try:
+        cube = calcul_cube(dims, mesures, annees, tuple(sorted(filtres.items())))
+    except Exception as e:
+        print("❌ ERREUR CUBE FINANCE :", e)
+        return jsonify({"error": "Erreur serveur cube"}), 500
+
+    data = {
+        "annees": list(annees) if annees else "toutes",
+        "dims": list(dims),
+        "mesures": list(mesures),
+        "filtres": {k: str(v) for k, v in filtres.items()},
+        "nb": len(cube["lignes"]),
+        "total": cube["total"],
+        "lignes": cube["lignes"],
+    }
+    if format_colonnes():
+        data["champs"], data["lignes"] = en_colonnes(cube["lignes"])
+
+    return jsonify(data)
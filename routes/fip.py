@@ -0,0 +1,412 @@
+"""
+routes/fip.py — FIP : CALCULS, FORMULAIRES, IMPORT EXCEL
+
+✔ FIP par élève, par section, par mois (API + pages admin)
+✔ Cumul par section : série Sept → Juin calculée en SQL (fenêtre),
+  un appel pour tous les mois limites et le graphique
+✔ Synchro mobile par delta (/api/mobile/sync) : soldes de toute l'école
+  tenus hors ligne, rafraîchis en une petite requête
+✔ Import du classeur THZBD (upload + confirmation)
+"""
+
+import json
+import os
+
+from flask import (
+    Blueprint, Response, jsonify, request, render_template, redirect, url_for
+)
+
+from sync_mobile import (
+    CHAMPS, LIMITE_DEFAUT, LIMITE_MAX, borne_superieure, lire_changements
+)
+from commun import (
+    ADMIN_PASSWORDS, require_role, require_api_role, annee_demandee,
+    calcul_fip_eleve, calcul_fip_section, calcul_fip_par_mois,
+    get_db_connection, VERSIONS
+)
+
+bp = Blueprint("fip", __name__)
+
+
+#==========================
+#    API MOBILE ELEVE
+#==========================
+
+@bp.route("/api/mobile/eleve/<matricule>")
+def api_mobile_eleve(matricule):
+    annee = annee_demandee()
+    try:
+        data = calcul_fip_eleve(matricule, annee)
+
+        if data is None:
+            return jsonify({"error": f"Aucun élève trouvé pour {matricule}"}), 404
+
+        return jsonify({
+            "nom": data["nom"],
+            "matricule": data["matricule"],
+            "classe": data["classe"],
+            "section": data["section"],
+            "categorie": data["categorie"],
+            "annee_scolaire": data["annee_scolaire"],
+            "fip_mensuel": data["fip_mensuel"],
+            "fip_total": data["fip_total"],
+            "solde_fip": data["solde_fip"],
+            "mois_payes": data["mois_payes"],
+            "mois_non_payes": data["mois_non_payes"]
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+#==========================
+#    SYNCHRO MOBILE (DELTA)
+#==========================
+
+def _entiers(texte, n):
+    """
+    "12.34.5" → (12, 34, 5) ; None si le format ne correspond pas.
+    """
+    morceaux = str(texte).split(".", n - 1)
+    if len(morceaux) != n:
+        return None
+    try:
+        return tuple(int(m) for m in morceaux[:n - 1]) + (morceaux[-1],)
+    except ValueError:
+        return None
+
+
+@bp.route("/api/mobile/sync")
+@require_api_role("admin", "compta")
+def api_mobile_sync():
+    """
+    Synchro par delta des soldes FIP de l'école (sync_mobile.py).
+
+    ?jeton=…   jeton de la dernière synchro (absent : tout)
+    ?suite=…   page suivante de la même synchro
+    ?limite=…  élèves par page (défaut 500, max 2000)
+
+    Réponse : champs (une fois) + eleves (tableaux), supprimes,
+    suite (page suivante) ou jeton (synchro terminée, à conserver).
+    reinitialiser=true : jeton périmé (année, tarifs), le client
+    remplace ses données au lieu de les fusionner.
+    """
+    annee = annee_demandee()
+
+    try:
+        limite = min(int(request.args.get("limite", LIMITE_DEFAUT)), LIMITE_MAX)
+    except ValueError:
+        return jsonify({"error": "limite invalide"}), 400
+    if limite < 1:
+        return jsonify({"error": "limite invalide"}), 400
+
+    # Jeton "xid.version_tarifs.annee" : périmé si les tarifs ou l'année
+    # ont changé (tous les soldes changent)
+    version_tarifs = (VERSIONS.versions() or {}).get("tarif_fip", 0)
+    depuis = 0
+    jeton = request.args.get("jeton")
+    if jeton:
+        lu = _entiers(jeton, 3)
+        if lu is None:
+            return jsonify({"error": "jeton invalide"}), 400
+        if lu[1:] == (version_tarifs, annee):
+            depuis = lu[0]
+
+    suite = request.args.get("suite")
+    if suite:
+        lu = _entiers(suite, 3)
+        if lu is None:
+            return jsonify({"error": "suite invalide"}), 400
+        try:
+            jusqua, apres = lu[0], (lu[1], int(lu[2]))
+        except ValueError:
+            return jsonify({"error": "suite invalide"}), 400
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not suite:
+            jusqua, apres = borne_superieure(conn), (0, 0)
+
+        lignes, supprimes, curseur = lire_changements(
+            conn, annee, depuis, jusqua, apres, limite
+        )
+
+    except Exception as e:
+        print("❌ ERREUR SYNCHRO MOBILE :", e)
+        return jsonify({"error": "Erreur serveur"}), 500
+
+    finally:
+        if conn is not None:
+            conn.close()
+
+    data = {
+        "annee_scolaire": annee,
+        "reinitialiser": depuis == 0 and not suite,
+        "champs": CHAMPS,
+        "eleves": lignes,
+        "supprimes": supprimes,
+        "suite": f"{jusqua}.{curseur[0]}.{curseur[1]}" if curseur else None,
+        "jeton": None if curseur else f"{jusqua}.{version_tarifs}.{annee}",
+    }
+
+    # JSON sans espaces ; Brotli / gzip par compression.py
+    return Response(
+        json.dumps(data, ensure_ascii=False, separators=(",", ":")),
+        mimetype="application/json"
+    )
+
+
+
+# ===============================================================
+# 🔵 13. /api/fip_section/<section> — Cumul FIP par section
+# ===============================================================
+
+@bp.route("/api/fip_section/<section>")
+@require_api_role("admin", "compta")
+def api_fip_section(section):
+    """
+    Cumul jusqu'à ?mois= (défaut : toute l'année) + série cumulée
+    complète (graphique, autres mois limites sans nouvel appel).
+    """
+    annee = annee_demandee()
+    try:
+        return jsonify(calcul_fip_section(section, request.args.get("mois"), annee))
+    except Exception as e:
+        print("❌ Erreur api_fip_section :", e)
+        return jsonify({"error": "Erreur serveur"}), 500
+
+
+@bp.route("/admin/fip_section_result", methods=["GET"])
+@require_role("admin", "compta")
+
+def admin_fip_section_result():
+    """
+    Page HTML affichant le résultat FIP par section.
+    """
+    section = request.args.get("section", "").strip()
+    mois = request.args.get("mois", "").strip()
+    annee = annee_demandee()
+
+    if not section:
+        return "Section manquante", 400
+
+    try:
+        result = calcul_fip_section(section, mois, annee)
+
+        mois_affiches = (
+            ", ".join(result["mois_cumul"])
+            if result["mois_cumul"]
+            else "Aucun paiement"
+        )
+
+        return render_template(
+            "fip_section_result.html",
+            result=result,
+            mois_affiches=mois_affiches
+        )
+
+    except Exception as e:
+        print("❌ Erreur admin_fip_section_result :", e)
+        return "Erreur interne serveur", 500
+
+
+
+# ===============================================================
+# 🔵 14. /api/fip_mois/<mois> — Total FIP par mois
+# ===============================================================
+@bp.route("/api/fip_mois/<mois>")
+def api_fip_mois(mois):
+    annee = annee_demandee()
+    try:
+        result = calcul_fip_par_mois(mois, annee)
+        return jsonify(result)
+    except Exception as e:
+        # Log utile pour Render / PostgreSQL
+        print("❌ Erreur api_fip_mois :", e)
+        return jsonify({"error": str(e)}), 500
+
+
+
+# ===============================================================
+# 🔵 12. Interface et routes upload Excel
+# ===============================================================
+
+
+
+@bp.route("/admin/upload_excel", methods=["GET"])
+@require_role("admin", "compta")
+
+def admin_upload_form():
+    return render_template("upload_form.html")
+
+@bp.route("/admin/upload_excel", methods=["POST"])
+@require_role("admin", "compta")
+
+def admin_upload_excel():
+    if "excel_file" not in request.files:
+        return jsonify({
+        "status": "error",
+        "message": "Import Excel désactivé sur Render. Importer en local."}), 503
+
+
+    f = request.files["excel_file"]
+    if f.filename == "":
+        return jsonify({"error": "Nom de fichier vide"}), 400
+
+    # 📁 Dossier temporaire sûr (Render-compatible)
+    os.makedirs("temp", exist_ok=True)
+    excel_path = os.path.join("temp", "THZBD2526GA.xlsx")
+
+    try:
+        f.save(excel_path)
+
+        # ⚠️ import_excel doit lire ce fichier
+        import import_excel_pg as import_excel
+        import_excel.EXCEL_FILE = excel_path
+        stats = import_excel.run_import()
+
+        return jsonify({
+            "status": "ok",
+            "message": "Importation réussie",
+            "stats": stats
+        })
+
+    except Exception as e:
+        # Log critique pour PostgreSQL / Render
+        print("❌ Erreur import Excel :", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# ===============================================================
+# 🔵 15. Interface admin pour calcul FIP mensuel
+# ===============================================================
+
+@bp.route("/admin/fip", methods=["GET"])
+@require_role("admin", "compta")
+
+def admin_fip_form():
+    return render_template("fip_form.html")
+ 
+
+
+
+#==============================================
+#        Route  FIP MOIS   RESULTAT
+#============================================   
+
+@bp.route("/admin/fip_mois_result", methods=["GET"])
+@require_role("admin", "compta")
+
+def admin_fip_mois_result():
+    """
+    Page HTML affichant le total FIP par mois (toutes sections).
+    """
+    mois = request.args.get("mois", "").strip()
+    annee = annee_demandee()
+
+    if not mois:
+        return "Mois manquant", 400
+
+    try:
+        result = calcul_fip_par_mois(mois, annee)
+
+        return render_template("fip_mois_result.html", result=result)
+
+    except Exception as e:
+        print("❌ Erreur admin_fip_mois_result :", e)
+        return "Erreur interne serveur", 500
+
+
+    
+ #==========================================
+ #  HTML de confirmation
+ #==========================================
+
+
+@bp.route("/admin/confirm_import", methods=["GET", "POST"])
+@require_role("admin", "compta")
+
+def admin_confirm_import():
+    error = None
+
+    if request.method == "POST":
+        pwd = request.form.get("password", "").strip()
+
+        # 🔐 mêmes mots de passe que /admin/login
+        if pwd in ADMIN_PASSWORDS:
+            return redirect(url_for("fip.admin_upload_form"))
+        else:
+            error = "❌ Mot de passe incorrect."
+
+    return render_template("confirm_import.html", error=error)
+
+
+ # ===============================================================
+# 🔵 17. Calcul FIP par Élève (recherche matricule)
+# ===============================================================
+# ===============================================================
+# 🔵 Page CALCUL FIP ÉLÈVE (FORMULAIRE)
+# ===============================================================
+
+@bp.route("/admin/fip_eleve")
+@require_role("admin", "compta")
+
+def admin_fip_eleve():
+    return render_template("fip_eleve_form.html")
+
+
+ 
+#==============================================
+#RESULTAT ELEVE (Recherche par Numéro Matricule
+#============================================== 
+
+@bp.route("/admin/fip_eleve_result")
+@require_role("admin", "compta")
+
+def admin_fip_eleve_result():
+    """
+    Affiche le résultat FIP élève (HTML).
+    ⚠️ AUCUN recalcul ici : tout vient de calcul_fip_eleve()
+    """
+
+    matricule = request.args.get("matricule", "").strip()
+    if not matricule:
+        return "Matricule manquant", 400
+
+    # 🔹 CALCUL MÉTIER UNIQUE
+    data = calcul_fip_eleve(matricule, annee_demandee())
+    if not data:
+        return "Élève introuvable", 404
+
+    # 🔹 DONNÉES DIRECTEMENT ISSUES DU CALCUL CENTRAL
+    fip_mensuel = data["fip_mensuel"]
+    total_attendu = data["total_attendu"]
+    total_paye = data["fip_total"]
+    solde_fip = data["solde_fip"]
+    mois_payes = data["mois_payes"]
+    mois_non_payes = data["mois_non_payes"]
+
+    # 🔹 INFOS ÉLÈVE
+    eleve = {
+        "matricule": data["matricule"],
+        "nom": data["nom"],
+        "sexe": data.get("sexe", ""),
+        "classe": data["classe"],
+        "section": data.get("section", ""),
+        "categorie": data.get("categorie", ""),
+        "telephone": data.get("telephone", "")
+    }
+
+    # 🔹 HTML (VISUEL INCHANGÉ)
+    return render_template(
+        "fip_eleve_result.html",
+        data=data,
+        eleve=eleve,
+        fip_mensuel=fip_mensuel,
+        total_attendu=total_attendu,
+        total_paye=total_paye,
+        solde_fip=solde_fip,
+        mois_payes=mois_payes,
+        mois_non_payes=mois_non_payes
+    )
@@ -0,0 +1,162 @@
+"""
+routes/impayes.py — IMPAYÉS DE TOUTE L'ÉCOLE
+
+✔ /api/impayes : agrégats (école, classe, section, catégorie) + élèves
+  en retard, JSON (format colonnes en option, ?eleves=0 : agrégats seuls)
+✔ /api/impayes.csv : élèves en retard (Excel : UTF-8 BOM, « ; »)
+✔ /admin/impayes : page HTML paginée
+✔ Mois limite ?mois= (défaut : mois en cours), filtres ?classe=,
+  ?section=, ?categorie= ; calcul en cache par version
+  (commun.calcul_impayes)
+"""
+
+import csv
+import io
+
+from flask import Blueprint, Response, jsonify, request, render_template
+
+from metier import MOIS_SCOLAIRE, mois_echu
+from impayes import GROUPES, CHAMPS_CSV, ligne_csv
+from compression import format_colonnes, en_colonnes
+from commun import (
+    canonical_classe, canonical_month, require_role, require_api_role,
+    annee_demandee, calcul_impayes
+)
+
+bp = Blueprint("impayes", __name__)
+
+PAR_PAGE = 50
+PAR_PAGE_MAX = 500
+
+
+def _impayes_demandes():
+    """
+    (rapport, élèves en retard filtrés, filtres) selon la requête ;
+    None si le mois est invalide.
+    """
+    annee = annee_demandee()
+
+    mois = request.args.get("mois", "").strip()
+    if mois:
+        mois = canonical_month(mois)
+        if not mois:
+            return None
+    else:
+        mois = mois_echu(annee)
+
+    rapport = calcul_impayes(annee, mois)
+
+    filtres = {
+        "classe": canonical_classe(request.args.get("classe", "")),
+        "section": request.args.get("section", "").strip().upper(),
+        "categorie": request.args.get("categorie", "").strip().upper(),
+    }
+    eleves = rapport["eleves"]
+    if filtres["classe"]:
+        eleves = [
+            e for e in eleves if canonical_classe(e["classe"]) == filtres["classe"]
+        ]
+    for g in ("section", "categorie"):
+        if filtres[g]:
+            eleves = [e for e in eleves if (e[g] or "").upper() == filtres[g]]
+
+    return rapport, eleves, {k: v for k, v in filtres.items() if v}
+
+
+#==================================
+#   ROUTE /api/impayes
+#==================================
+
+@bp.route("/api/impayes")
+@require_api_role("admin", "compta")
+def api_impayes():
+    demande = _impayes_demandes()
+    if demande is None:
+        return jsonify({"error": "Mois invalide"}), 400
+    rapport, eleves, filtres = demande
+
+    data = {
+        "annee_scolaire": rapport["annee_scolaire"],
+        "mois_limite": rapport["mois_limite"],
+        "mois": rapport["mois"],
+        "filtres": filtres,
+        "groupes": rapport["groupes"],
+        "nb_eleves": len(eleves),
+    }
+    if request.args.get("eleves") != "0":
+        data["eleves"] = eleves
+        if format_colonnes():
+            data["champs"], data["eleves"] = en_colonnes(eleves)
+
+    return jsonify(data)
+
+
+@bp.route("/api/impayes.csv")
+@require_api_role("admin", "compta")
+def api_impayes_csv():
+    demande = _impayes_demandes()
+    if demande is None:
+        return jsonify({"error": "Mois invalide"}), 400
+    rapport, eleves, _ = demande
+
+    tampon = io.StringIO()
+    tampon.write("\ufeff")   # BOM : Excel lit l'UTF-8
+    writer = csv.writer(tampon, delimiter=";")
+    writer.writerow(CHAMPS_CSV)
+    writer.writerows(ligne_csv(e) for e in eleves)
+
+    nom = f"impayes_{rapport['annee_scolaire']}_{rapport['mois_limite'] or 'aucun'}.csv"
+    return Response(
+        tampon.getvalue(),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={nom}"}
+    )
+
+
+#==================================
+#   PAGE /admin/impayes
+#==================================
+
+@bp.route("/admin/impayes")
+@require_role("admin", "compta")
+def admin_impayes():
+    demande = _impayes_demandes()
+    if demande is None:
+        return "Mois invalide", 400
+    rapport, eleves, filtres = demande
+
+    groupe = request.args.get("groupe", "classe")
+    if groupe not in GROUPES:
+        groupe = "classe"
+
+    try:
+        par_page = int(request.args.get("par_page", PAR_PAGE))
+        page = max(int(request.args.get("page", 1)), 1)
+    except ValueError:
+        return "Page invalide", 400
+    par_page = min(max(par_page, 1), PAR_PAGE_MAX)
+
+    nb_pages = max(-(-len(eleves) // par_page), 1)
+    page = min(page, nb_pages)
+    debut = (page - 1) * par_page
+
+    # Paramètres conservés par les liens (pages, groupe, CSV)
+    parametres = {
+        k: v for k, v in request.args.items()
+        if k in ("annee", "mois", "classe", "section", "categorie", "par_page") and v
+    }
+
+    return render_template(
+        "impayes.html",
+        rapport=rapport,
+        groupe=groupe,
+        groupes=GROUPES,
+        tous_mois=MOIS_SCOLAIRE,
+        eleves=eleves[debut:debut + par_page],
+        debut=debut,
+        nb_eleves=len(eleves),
+        page=page,
+        nb_pages=nb_pages,
+        filtres=filtres,
+        parametres=parametres,
+    )
@@ -0,0 +1,339 @@
+"""
+routes/inscription.py — INSCRIPTIONS ET GESTION DES ÉLÈVES
+
+✔ Import et statistiques des inscriptions
+✔ Tableaux de bord inscription (global + filtres)
+✔ Fiche élève (/api/eleve), panel admin1, recherche par téléphone
+"""
+
+import os
+
+import psycopg
+from psycopg.rows import dict_row
+from flask import Blueprint, jsonify, request, render_template
+
+from commun import require_role, get_db_connection
+
+bp = Blueprint("inscription", __name__)
+
+
+#=======================
+#  ROUTE INSCRIPTION
+#=======================
+
+
+@bp.route("/import-inscriptions")
+def import_inscriptions():
+
+    password = request.args.get("password")
+
+    # récupérer les mots de passe admin
+    admin_passwords = os.environ.get("ADMIN_PASSWORDS", "").split(",")
+
+    if password not in admin_passwords:
+        return "⛔ Accès refusé", 403
+
+    try:
+        from import_inscription_pg import importer_inscriptions
+        importer_inscriptions()
+        return "✅ Import terminé avec succès"
+    except Exception as e:
+        return f"❌ Erreur : {str(e)}", 500
+
+
+
+@bp.route("/stats-inscriptions")
+def stats_inscriptions():
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+
+        # Total
+        cur.execute("SELECT COUNT(*) FROM inscription")
+        total = cur.fetchone()[0]
+
+        # Par catégorie
+        cur.execute("""
+            SELECT categorie, COUNT(*) 
+            FROM inscription 
+            GROUP BY categorie
+        """)
+        categories = dict(cur.fetchall())
+
+        # Par classe
+        cur.execute("""
+            SELECT classe, COUNT(*) 
+            FROM inscription 
+            GROUP BY classe 
+            ORDER BY classe
+        """)
+        classes = dict(cur.fetchall())
+
+        # Par section
+        cur.execute("""
+            SELECT section, COUNT(*) 
+            FROM inscription 
+            GROUP BY section
+        """)
+        sections = dict(cur.fetchall())
+
+        cur.close()
+        conn.close()
+
+        return jsonify({
+            "total": total,
+            "categories": categories,
+            "classes": classes,
+            "sections": sections
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)})
+
+
+#=====inscr
+
+@bp.route("/api/dashboard-inscription")
+def api_dashboard_inscription():
+    import psycopg
+    from flask import jsonify
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    # KPI
+    cur.execute("SELECT COUNT(*) FROM inscription")
+    total = cur.fetchone()[0]
+
+    cur.execute("SELECT COUNT(*) FROM inscription WHERE categorie='PY'")
+    py = cur.fetchone()[0]
+
+    cur.execute("SELECT COUNT(*) FROM inscription WHERE categorie='ABD'")
+    abd = cur.fetchone()[0]
+
+    cur.execute("SELECT COUNT(*) FROM inscription WHERE categorie='NPY'")
+    npy = cur.fetchone()[0]
+
+    cur.execute("SELECT SUM(finsc) FROM inscription")
+    montant = cur.fetchone()[0] or 0
+
+    # Par section
+    cur.execute("""
+        SELECT section, COUNT(*) 
+        FROM inscription 
+        GROUP BY section
+    """)
+    sections = cur.fetchall()
+
+    # Par catégorie
+    cur.execute("""
+        SELECT categorie, COUNT(*) 
+        FROM inscription 
+        GROUP BY categorie
+    """)
+    categories = cur.fetchall()
+
+    conn.close()
+
+    return jsonify({
+        "kpi": {
+            "total": total,
+            "py": py,
+            "abd": abd,
+            "npy": npy,
+            "montant": float(montant)
+        },
+        "sections": sections,
+        "categories": categories
+    })
+  
+#=====inscr  
+    
+@bp.route("/dashboard-inscription")
+def dashboard_inscription():
+    return render_template("dashboard_inscription.html")    
+
+
+@bp.route("/api/dashboard-filtre")
+def api_dashboard_filtre():
+    import psycopg
+    from flask import request
+
+    section = request.args.get("section")
+    categorie = request.args.get("categorie")
+
+    where = []
+    params = []
+
+    if section:
+        where.append("section = %s")
+        params.append(section)
+
+    if categorie:
+        where.append("categorie = %s")
+        params.append(categorie)
+
+    condition = "WHERE " + " AND ".join(where) if where else ""
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    cur.execute(f"SELECT COUNT(*) FROM inscription {condition}", params)
+    total = cur.fetchone()[0]
+
+    cur.execute(f"SELECT SUM(finsc) FROM inscription {condition}", params)
+    montant = cur.fetchone()[0] or 0
+
+    cur.execute(f"""
+        SELECT section, COUNT(*)
+        FROM inscription
+        {condition}
+        GROUP BY section
+    """, params)
+    sections = cur.fetchall()
+
+    cur.execute(f"""
+        SELECT categorie, COUNT(*)
+        FROM inscription
+        {condition}
+        GROUP BY categorie
+    """, params)
+    categories = cur.fetchall()
+
+    conn.close()
+
+    return {
+        "total": total,
+        "montant": montant,
+        "sections": sections,
+        "categories": categories
+    }
+
+
+@bp.route("/api/eleve/<matricule>")
+def api_eleve(matricule):
+    conn = get_db_connection()
+    try:
+        with conn.cursor(row_factory=dict_row) as cur:
+
+            query = """
+                SELECT
+                    matricule,
+                    nom,
+                    sexe,
+                    classe,
+                    section,
+                    categorie,
+                    telephone
+                FROM eleves
+                WHERE LOWER(matricule) = LOWER(%s)
+            """
+
+            cur.execute(query, (matricule,))
+            eleve = cur.fetchone()
+
+            if not eleve:
+                return jsonify({"error": "Élève introuvable"}), 404
+
+        # 🔥 ON RENVOIE CE QUE LA BASE CONTIENT, BRUT
+        return jsonify(eleve), 200
+
+    except Exception as e:
+        print("❌ ERREUR API ELEVE :", e)
+        return jsonify({"error": "Erreur serveur"}), 500
+
+    finally:
+        conn.close()
+
+
+
+#=================================
+#  ADMIN  PANEL 
+#===============================
+
+
+@bp.route("/admin1/panel")
+@require_role("admin", "compta")
+
+def admin1_panel():
+    return render_template("admin1_panel.html")
+
+
+
+    
+# ===============
+# GESTION ELEVES
+#================ 
+
+# ===============================================================
+# 🔵 GESTION DES ÉLÈVES (FORMULAIRE)
+# ===============================================================
+
+@bp.route("/admin1/gestion_eleve")
+@require_role("admin", "compta")
+
+def gestion_eleve():
+    return render_template("gestion_eleve.html")
+
+
+# ===============================================================
+# 🔵 RECHERCHE DES MATRICULES PAR NUMÉRO DE TÉLÉPHONE
+# ===============================================================
+
+@bp.route("/admin1/find_matricules_by_phone")
+@require_role("admin", "compta")
+
+def find_matricules_by_phone():
+    phone = request.args.get("phone", "").strip()
+
+    # 🔹 Sécurité : entrée vide
+    if not phone:
+        return jsonify([])
+
+    # 🔹 Normalisation stricte du numéro
+    digits = "".join(c for c in phone if c.isdigit())
+
+    # 🔹 Sécurité : minimum 6 chiffres
+    if len(digits) < 6:
+        return jsonify([])
+
+    last9 = digits[-9:]
+
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(row_factory=psycopg.rows.dict_row)
+
+        query = """
+        SELECT DISTINCT matricule
+        FROM eleves
+        WHERE telephone IS NOT NULL
+          AND REPLACE(
+                REPLACE(
+                  REPLACE(
+                    REPLACE(
+                      REPLACE(telephone, '+', ''),
+                    ' ', ''),
+                  '-', ''),
+                '/', ''),
+              ';', '')
+          LIKE %s
+        """
+
+        cur.execute(query, (f"%{last9}",))
+        rows = cur.fetchall()
+
+        # 🔹 Extraction propre
+        result = [row["matricule"] for row in rows]
+
+        return jsonify(result)
+
+    except Exception as e:
+        # ⚠️ Log utile Render / local
+        print("❌ Erreur find_matricules_by_phone :", e)
+        return jsonify([])
+
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,141 @@
+"""
+routes/mail.py — NOTIFICATIONS ET E-MAILS
+
+✔ /send_notification, /sendmail (mail_service.py, chargé au premier envoi)
+"""
+
+from flask import Blueprint, jsonify, request
+
+bp = Blueprint("mail", __name__)
+
+
+# ===============================================================
+# 🔵 API NOTIFICATION SIMPLE
+# ===============================================================
+
+@bp.route("/send_notification", methods=["POST"])
+def send_notification():
+
+    try:
+
+        data = request.get_json()
+
+        destinataire = data.get("to")
+        copies = data.get("cc", "")
+        sujet = data.get("subject")
+        message = data.get("message")
+
+        if not destinataire:
+
+            return jsonify({
+                "success": False,
+                "error": "Destinataire manquant"
+            }), 400
+
+        from mail_service import envoyer_mail
+
+        ok, resultat = envoyer_mail(
+            destinataire,
+            copies,
+            sujet,
+            message
+        )
+
+        if ok:
+
+            return jsonify({
+                "success": True,
+                "message": resultat
+            })
+
+        return jsonify({
+            "success": False,
+            "error": resultat
+        }), 500
+
+    except Exception as e:
+
+        print("❌ ERREUR NOTIFICATION :", e)
+
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500    
+    
+    
+    
+   
+
+# ===============================================================
+# 🔵 API ENVOI MAIL AVEC PDF
+# ===============================================================
+
+@bp.route("/sendmail", methods=["POST"])
+def sendmail():
+
+    try:
+
+        # ======================================================
+        # RECUPERATION FORM DATA
+        # ======================================================
+
+        destinataire = request.form.get("to")
+        copies = request.form.get("cc", "")
+        sujet = request.form.get("subject")
+        message = request.form.get("message")
+
+        # ======================================================
+        # RECUPERATION FICHIER PDF
+        # ======================================================
+
+        fichier = request.files.get("file")
+
+        # ======================================================
+        # VALIDATION DESTINATAIRE
+        # ======================================================
+
+        if not destinataire:
+
+            return jsonify({
+                "success": False,
+                "error": "Destinataire manquant"
+            }), 400
+
+        # ======================================================
+        # ENVOI EMAIL
+        # ======================================================
+
+        from mail_service import envoyer_mail
+
+        ok, resultat = envoyer_mail(
+            destinataire,
+            copies,
+            sujet,
+            message,
+            fichier
+        )
+
+        # ======================================================
+        # RESULTAT
+        # ======================================================
+
+        if ok:
+
+            return jsonify({
+                "success": True,
+                "message": resultat
+            })
+
+        return jsonify({
+            "success": False,
+            "error": resultat
+        }), 500
+
+    except Exception as e:
+
+        print("❌ ERREUR SENDMAIL :", e)
+
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
@@ -0,0 +1,697 @@
+"""
+routes/rapports.py — RAPPORTS PDF ET JOURNAL
+
+✔ Rapport PDF par classe (+ choix de classe, /api/classe)
+✔ Journal des opérations d'une date (HTML + PDF)
+✔ Journal JSON d'une période (/api/journal, jusqu'à un mois),
+  format colonnes en option
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import psycopg
+from psycopg.rows import dict_row
+from flask import (
+    Blueprint, jsonify, request, render_template, send_file
+)
+
+from metier import annees_autour
+from instrumentation import mesure_pdf
+from compression import format_colonnes, en_colonnes
+from commun import (
+    canonical_classe, require_role, require_api_role, annee_demandee,
+    MOIS_SCOLAIRE, get_db_connection, chemin_pdf_versionne, canonical_month,
+    calcul_fip_eleve
+)
+
+bp = Blueprint("rapports", __name__)
+
+
+# ===============================================================
+# 🔵 18. PDF par Classe (étape 1)
+# ===============================================================
+@bp.route("/admin/pdf_classe")
+@require_role("admin", "compta")
+
+def admin_pdf_classe():
+    return render_template("pdf_classe.html")
+
+
+@bp.route("/admin/pdf_classe_choix")
+@require_role("admin", "compta")
+
+def admin_pdf_classe_choix():
+    classe = request.args.get("classe", "").strip()
+
+    if not classe:
+        return "Classe manquante", 400
+
+    return render_template("pdf_classe_choix.html", classe=classe)
+    
+#==================================
+#   ROUTE /api/classe/<classe>
+#==================================
+
+@bp.route("/api/classe/<classe>")
+def api_classe(classe):
+    """
+    Retourne les informations FIP et FF de tous les élèves d'une classe
+    Classe acceptée sous toutes formes : 1°P, 1░P, 1P, etc.
+    ?format=colonnes : "champs" + "eleves" en tableaux.
+    """
+
+    # 🔹 Normalisation classe utilisateur
+    classe_norm = canonical_classe(classe)
+    if not classe_norm:
+        return jsonify({"error": "Classe invalide"}), 400
+
+    annee = annee_demandee()
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(row_factory=psycopg.rows.dict_row)
+
+        # 🔹 Requête robuste (ignore ° ░ espaces etc.)
+        cur.execute("""
+            SELECT *
+            FROM eleves
+            WHERE regexp_replace(UPPER(classe), '[^A-Z0-9]', '', 'g') = %s
+        """, (classe_norm,))
+
+        eleves = cur.fetchall()
+
+        if not eleves:
+            return jsonify({
+                "error": f"Aucun élève trouvé pour la classe {classe}"
+            }), 404
+
+        # 🔹 Calcul FIP pour chaque élève
+        resultats = []
+        for e in eleves:
+            data = calcul_fip_eleve(e["matricule"], annee)
+            if data:
+                resultats.append(data)
+
+        total_attendu = sum(e["total_attendu"] for e in resultats)
+        total_paye = sum(e["fip_total"] for e in resultats)
+        solde_total = sum(e["solde_fip"] for e in resultats)
+        total_paye_ff = sum(e["ff_total"] for e in resultats)
+        solde_total_ff = sum(e["solde_ff"] for e in resultats)
+
+        data = {
+            "classe": classe,
+            "classe_normalisee": classe_norm,
+            "annee_scolaire": annee,
+            "nb_eleves": len(resultats),
+            "total_attendu_fip": round(total_attendu, 2),
+            "total_paye_fip": round(total_paye, 2),
+            "solde_total_fip": round(solde_total, 2),
+            "total_paye_ff": round(total_paye_ff, 2),
+            "solde_total_ff": round(solde_total_ff, 2),
+            "eleves": resultats
+        }
+        if format_colonnes():
+            data["champs"], data["eleves"] = en_colonnes(resultats)
+
+        return jsonify(data)
+
+    except Exception as e:
+        print("❌ ERREUR api_classe :", e)
+        return jsonify({"error": "Erreur serveur"}), 500
+
+    finally:
+        if conn:
+            conn.close()
+
+
+#===============================================
+#   ROUTE /api/rapport_classe/<classe>
+#=================================================
+
+@bp.route("/api/rapport_classe/<classe>")
+
+def rapport_pdf_classe(classe):
+
+    type_pdf = request.args.get("type", "paye")
+    classe_norm = canonical_classe(classe)
+    if not classe_norm:
+        return "Classe invalide", 400
+
+    annee = annee_demandee()
+
+    path, deja_genere = chemin_pdf_versionne(
+        f"rapport_{classe_norm}_{'paye' if type_pdf == 'paye' else 'impaye'}"
+        f"_{annee}",
+        ("eleves", "paiements")
+    )
+    if deja_genere:
+        return send_file(path, as_attachment=True)
+
+    try:
+        # ==================================================
+        # 🔹 1) CONNEXION DB UNIQUE
+        # ==================================================
+        conn = get_db_connection()
+        cur = conn.cursor(row_factory=dict_row)
+
+        # ==================================================
+        # 🔹 2) RÉCUPÉRATION DES ÉLÈVES
+        # ==================================================
+        cur.execute("""
+            SELECT id, matricule, nom
+            FROM eleves
+            WHERE regexp_replace(UPPER(classe), '[^A-Z0-9]', '', 'g') = %s
+            ORDER BY nom
+        """, (classe_norm,))
+        eleves = cur.fetchall()
+
+        if not eleves:
+            conn.close()
+            return f"Aucun élève trouvé pour la classe {classe}", 404
+
+        # ==================================================
+        # 🔹 3) RÉCUPÉRATION DES PAIEMENTS (UNE SEULE REQUÊTE)
+        # ==================================================
+        cur.execute("""
+            SELECT
+                e.matricule,
+                p.mois,
+                COALESCE(p.fip,0) AS fip,
+                COALESCE(p.ff,0) AS ff
+            FROM paiements p
+            JOIN eleves e ON p.eleve_id = e.id
+            WHERE p.annee_scolaire = %s
+              AND regexp_replace(UPPER(e.classe), '[^A-Z0-9]', '', 'g') = %s
+        """, (annee, classe_norm))
+        paiements = cur.fetchall()
+
+        conn.close()
+
+        # ==================================================
+        # 🔹 4) ORGANISATION EN MÉMOIRE
+        # ==================================================
+        pay_map = {}
+        ff_map = {}
+        for p in paiements:
+            m = canonical_month(p["mois"])
+            if not m:
+                continue
+            pay_map.setdefault(p["matricule"], {}).setdefault(m, 0)
+            pay_map[p["matricule"]][m] += float(p["fip"])
+            ff_map[p["matricule"]] = ff_map.get(p["matricule"], 0) + float(p["ff"])
+
+        # ==================================================
+        # 🔹 5) CONSTRUCTION DES LIGNES PDF
+        # ==================================================
+        lignes = []
+        total_general = 0.0
+        total_ff = 0.0
+
+        for i, e in enumerate(eleves, start=1):
+
+            paiements_eleve = pay_map.get(e["matricule"], {})
+            mois_payes = sorted(
+                paiements_eleve.keys(),
+                key=lambda m: MOIS_SCOLAIRE.index(m)
+            )
+
+            total_paye = sum(paiements_eleve.values())
+            ff_paye = ff_map.get(e["matricule"], 0)
+
+            mois_non_payes = [
+                m for m in MOIS_SCOLAIRE
+                if m not in mois_payes
+            ]
+
+            if type_pdf == "paye":
+                lignes.append([
+                    i,
+                    e["matricule"],
+                    e["nom"],
+                    round(total_paye, 2),      # ✅ Valeur calculée
+                    round(ff_paye, 2),
+                    ", ".join(mois_payes)
+                ])
+                total_general += total_paye
+                total_ff += ff_paye
+            else:
+                lignes.append([
+                    i,
+                    e["matricule"],
+                    e["nom"],
+                    ", ".join(mois_non_payes)
+                ])
+
+        # ==================================================
+        # 🔹 6) LIGNE TOTAL GÉNÉRAL
+        # ==================================================
+        if type_pdf == "paye":
+            lignes.append([
+                "",
+                "",
+                "TOTAL",
+                round(total_general, 2),     # ✅ TOTAL FINAL
+                round(total_ff, 2),
+                ""
+            ])
+
+        # ==================================================
+        # 🔹 7) GÉNÉRATION DU PDF
+        # ==================================================
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import (
+            SimpleDocTemplate, Table, TableStyle,
+            Paragraph, Image, Spacer
+        )
+        from reportlab.lib import colors
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.lib.units import cm
+
+        doc = SimpleDocTemplate(
+            tmp_path,
+            pagesize=A4,
+            rightMargin=2*cm,
+            leftMargin=2*cm,
+            topMargin=2*cm,
+            bottomMargin=2*cm
+        )
+
+        elements = []
+
+        # LOGO
+        logo = "static/images/logo_csnst.png"
+        if os.path.exists(logo):
+            elements.append(Image(logo, 3*cm, 2.3*cm))
+        elements.append(Spacer(1, 12))
+
+        # TITRE
+        titre = (
+            f"LISTE DES MOIS PAYÉS<br/>POUR LA CLASSE DE : <b>{classe_norm}</b>"
+            f"<br/>ANNÉE SCOLAIRE : {annee}"
+            if type_pdf == "paye"
+            else f"LISTE DES MOIS NON PAYÉS<br/>POUR LA CLASSE DE : <b>{classe_norm}</b>"
+            f"<br/>ANNÉE SCOLAIRE : {annee}"
+        )
+        elements.append(Paragraph(
+            titre,
+            ParagraphStyle("title", fontSize=14, alignment=1, spaceAfter=20)
+        ))
+
+        # TABLE
+        headers = (
+            ["N°", "Matricule", "Nom", "Valeur", "FF", "Mois payés"]
+            if type_pdf == "paye"
+            else ["N°", "Matricule", "Nom", "Valeur"]
+        )
+
+        table = Table([headers] + lignes, repeatRows=1)
+        table.setStyle(TableStyle([
+            ("GRID", (0,0), (-1,-1), 1, colors.grey),
+            ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#1976d2")),
+            ("TEXTCOLOR", (0,0), (-1,0), colors.white),
+            ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
+            ("ALIGN", (0,1), (0,-1), "CENTER"),
+            ("ALIGN", (1,1), (2,-1), "LEFT"),
+            ("ALIGN", (3,1), (4,-1), "CENTER"),
+            ("ALIGN", (5,1), (5,-1), "LEFT"),
+        ]))
+
+        elements.append(table)
+        with mesure_pdf("rapport_classe"):
+            doc.build(elements)
+        os.replace(tmp_path, path)
+
+        return send_file(path, as_attachment=True)
+
+    except Exception as e:
+        print("❌ ERREUR PDF CLASSE :", e)
+        return "Erreur interne serveur", 500
+
+
+
+#============================================================
+#  JOURNAL 
+#============================================================
+
+@bp.route("/admin/journal")
+@require_role("admin", "compta")
+
+def admin_journal():
+    return render_template("journal.html")
+    
+    
+@bp.route("/admin/journal_result")
+@require_role("admin", "compta")
+def admin_journal_result():
+
+    date_input = request.args.get("date")
+    if not date_input:
+        return "Date manquante", 400
+
+    # ---------------------------
+    # 1️⃣ Validation date
+    # ---------------------------
+    try:
+        date_cible = datetime.strptime(date_input, "%Y-%m-%d").date()
+    except ValueError:
+        return "Date invalide", 400
+
+    # ---------------------------
+    # 2️⃣ Connexion DB UNIQUE
+    # ---------------------------
+    conn = get_db_connection()
+    try:
+        with conn.cursor(row_factory=dict_row) as cur:
+
+            query = """
+                SELECT
+                    e.matricule,
+                    e.nom,
+                    e.classe,
+                    e.section,
+                    p.mois,
+                    p.fip,
+                    p.ff,
+                    p.numrecu
+                FROM paiements p
+                JOIN eleves e ON p.eleve_id = e.id
+                WHERE p.annee_scolaire = ANY(%s)
+                  AND p.datepaiement >= %s
+                  AND p.datepaiement < %s
+                ORDER BY e.nom
+            """
+
+            cur.execute(
+                query,
+                (
+                    annees_autour(date_cible),
+                    date_cible,
+                    date_cible + timedelta(days=1)
+                )
+            )
+
+            results = cur.fetchall()
+
+        # ---------------------------
+        # 3️⃣ Aucun paiement
+        # ---------------------------
+        if not results:
+            return f"""
+            <h3 style="text-align:center;color:#c62828;">
+                Aucun paiement trouvé pour le {date_input}
+            </h3>
+            <div style="text-align:center;">
+                <a href="/admin/journal">← Retour</a>
+            </div>
+            """
+
+        # ---------------------------
+        # 4️⃣ Totaux journaliers (FIP, FF)
+        # ---------------------------
+        total_jour = sum((r["fip"] or 0) for r in results)
+        total_ff = sum((r["ff"] or 0) for r in results)
+
+        # ---------------------------
+        # 5️⃣ HTML (templates/journal_result.html)
+        # ---------------------------
+        return render_template(
+            "journal_result.html",
+            date_input=date_input,
+            results=results,
+            total_jour=total_jour,
+            total_ff=total_ff
+        )
+
+    except Exception as e:
+        print("❌ ERREUR admin_journal_result :", e)
+        return "Erreur serveur", 500
+
+    finally:
+        conn.close()
+
+
+#==================================
+#   ROUTE /api/journal
+#==================================
+
+JOURNAL_JOURS_MAX = 31
+
+
+@bp.route("/api/journal")
+@require_api_role("admin", "compta")
+def api_journal():
+    """
+    Paiements d'une période : ?date=AAAA-MM-JJ (un jour) ou
+    ?du=…&au=… (bornes incluses, JOURNAL_JOURS_MAX jours au plus).
+    ?format=colonnes : "champs" + "paiements" en tableaux.
+    """
+    try:
+        du = datetime.strptime(
+            request.args.get("du") or request.args.get("date", ""), "%Y-%m-%d"
+        ).date()
+        au = datetime.strptime(
+            request.args.get("au") or du.isoformat(), "%Y-%m-%d"
+        ).date()
+    except ValueError:
+        return jsonify({"error": "Date invalide"}), 400
+
+    if au < du or (au - du).days >= JOURNAL_JOURS_MAX:
+        return jsonify({
+            "error": f"Période invalide ({JOURNAL_JOURS_MAX} jours au plus)"
+        }), 400
+
+    # Partitions pouvant contenir des reçus de la période
+    annees = annees_autour(du, au)
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute("""
+                SELECT
+                    p.datepaiement::date AS date,
+                    p.numrecu,
+                    e.matricule,
+                    e.nom,
+                    e.classe,
+                    e.section,
+                    p.mois,
+                    COALESCE(p.fip, 0)::float AS fip,
+                    COALESCE(p.ff, 0)::float AS ff
+                FROM paiements p
+                JOIN eleves e ON p.eleve_id = e.id
+                WHERE p.annee_scolaire = ANY(%s)
+                  AND p.datepaiement >= %s
+                  AND p.datepaiement < %s
+                ORDER BY p.datepaiement, e.nom
+            """, (annees, du, au + timedelta(days=1)))
+            paiements = cur.fetchall()
+
+    except Exception as e:
+        print("❌ ERREUR api_journal :", e)
+        return jsonify({"error": "Erreur serveur"}), 500
+
+    finally:
+        if conn:
+            conn.close()
+
+    for p in paiements:
+        p["date"] = p["date"].isoformat()
+
+    data = {
+        "du": du.isoformat(),
+        "au": au.isoformat(),
+        "nb": len(paiements),
+        "total_fip": round(sum(p["fip"] for p in paiements), 2),
+        "total_ff": round(sum(p["ff"] for p in paiements), 2),
+        "paiements": paiements
+    }
+    if format_colonnes():
+        data["champs"], data["paiements"] = en_colonnes(paiements)
+
+    return jsonify(data)
+
+
+@bp.route("/api/journal_pdf/<date_iso>")
+def api_journal_pdf(date_iso):
+    conn = get_db_connection()
+    try:
+        # ---------------------------
+        # 1️⃣ Validation de la date
+        # ---------------------------
+        date_cible = datetime.strptime(date_iso, "%Y-%m-%d").date()
+
+        path, deja_genere = chemin_pdf_versionne(
+            f"journal_{date_cible.isoformat()}",
+            ("eleves", "paiements")
+        )
+        if deja_genere:
+            return send_file(path, as_attachment=True)
+
+        # ---------------------------
+        # 2️⃣ Requête base de données
+        # ---------------------------
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute("""
+                SELECT
+                    e.matricule,
+                    e.nom,
+                    e.classe,
+                    e.section,
+                    p.mois,
+                    p.fip,
+                    p.ff,
+                    p.numrecu
+                FROM paiements p
+                JOIN eleves e ON p.eleve_id = e.id
+                WHERE p.annee_scolaire = ANY(%s)
+                  AND p.datepaiement = %s
+                ORDER BY e.nom
+            """, (annees_autour(date_cible), date_cible))
+            rows = cur.fetchall()
+
+        if not rows:
+            return "Aucune donnée à imprimer", 404
+
+        # ---------------------------
+        # 3️⃣ Calcul des totaux (FIP, FF)
+        # ---------------------------
+        total = sum((r["fip"] or 0) for r in rows)
+        total_ff = sum((r["ff"] or 0) for r in rows)
+
+        # ---------------------------
+        # 4️⃣ Préparation PDF
+        # ---------------------------
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import (
+            SimpleDocTemplate, Table, TableStyle,
+            Paragraph, Image, Spacer
+        )
+        from reportlab.lib import colors
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.lib.units import cm
+
+        doc = SimpleDocTemplate(
+            tmp_path,
+            pagesize=A4,
+            rightMargin=2 * cm,
+            leftMargin=2 * cm,
+            topMargin=2 * cm,
+            bottomMargin=2 * cm
+        )
+
+        elements = []
+
+        # ---------------------------
+        # 5️⃣ Logo
+        # ---------------------------
+        logo_path = "static/images/logo_csnst.png"
+        if os.path.exists(logo_path):
+            elements.append(Image(logo_path, width=4 * cm, height=3 * cm))
+
+        elements.append(Spacer(1, 12))
+
+        # ---------------------------
+        # 6️⃣ Titre
+        # ---------------------------
+        title_style = ParagraphStyle(
+            name="Title",
+            fontSize=14,
+            alignment=1,
+            spaceAfter=20
+        )
+        elements.append(
+            Paragraph(
+                f"<b>Journal des paiements du {date_iso}</b>",
+                title_style
+            )
+        )
+
+        # ---------------------------
+        # 7️⃣ Tableau
+        # ---------------------------
+        table_data = [[
+            "N°", "Matricule", "Nom", "Classe",
+            "Section", "Mois", "Montant", "FF", "Reçu"
+        ]]
+
+        for i, r in enumerate(rows, start=1):
+            table_data.append([
+                i,
+                r["matricule"],
+                r["nom"],
+                r["classe"],
+                r["section"],
+                r["mois"],
+                r["fip"],
+                r["ff"],
+                r["numrecu"]
+            ])
+
+        table_data.append([
+            "", "", "", "", "", "TOTAL",
+            total, total_ff, ""
+        ])
+
+        table = Table(
+            table_data,
+            colWidths=[
+                1.2 * cm, 2.2 * cm, 4.2 * cm, 1.5 * cm,
+                1.5 * cm, 1.6 * cm, 1.8 * cm, 1.4 * cm, 1.8 * cm
+            ]
+        )
+
+        table.setStyle(TableStyle([
+            ("GRID", (0, 0), (-1, -1), 0.8, colors.grey),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1976d2")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+            ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#e3f2fd")),
+        ]))
+
+        elements.append(table)
+
+        # ---------------------------
+        # 8️⃣ Footer
+        # ---------------------------
+        footer_style = ParagraphStyle(
+            name="Footer",
+            fontSize=8,
+            alignment=1,
+            textColor=colors.grey,
+            spaceBefore=25
+        )
+
+        footer_text = """
+        <b>Comptabilité – CS Nsanga le Thanzie</b><br/>
+        165 Av Kasangulu, croisement de l’Église<br/>
+        Email : notificationnsangalethanzie@gmail.com<br/>
+        Tél : +243 974 773 760 | +243 970 292 522 | +243 996 537 573
+        """
+
+        elements.append(Spacer(1, 20))
+        elements.append(Paragraph(footer_text, footer_style))
+
+        # ---------------------------
+        # 9️⃣ Génération PDF
+        # ---------------------------
+        with mesure_pdf("journal"):
+            doc.build(elements)
+        os.replace(tmp_path, path)
+
+        return send_file(path, as_attachment=True)
+
+    except Exception as e:
+        print("❌ ERREUR PDF JOURNAL :", e)
+        return "Erreur PDF", 500
+
+    finally:
+        conn.close()
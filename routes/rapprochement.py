@@ -0,0 +1,110 @@
+"""
+routes/rapprochement.py — RAPPROCHEMENT CAISSE / PAIEMENTS / DÉPENSES
+
+✔ GET /api/rapprochement : résumé + jours stockés (?anomalies=1 : jours
+  signalés seulement ; format colonnes en option)
+✔ POST /api/rapprochement : recalcul de l'année (1 requête, rapprochement.py)
+✔ /admin/rapprochement : page HTML (bouton « Recalculer »)
+✔ Résultat périmé (paiements, caisse ou dépenses modifiés depuis le
+  calcul) signalé par "a_jour": false
+"""
+
+from flask import Blueprint, jsonify, request, render_template, redirect, url_for
+
+from rapprochement import ANOMALIES, rapprocher, resume, lire_jours
+from compression import format_colonnes, en_colonnes
+from commun import (
+    require_role, require_api_role, annee_demandee, get_db_connection
+)
+
+bp = Blueprint("rapprochement", __name__)
+
+
+def _lire(annee, anomalies_seules):
+    """
+    (résumé, jours) du dernier calcul ; (None, []) si jamais calculé.
+    """
+    conn = get_db_connection()
+    try:
+        r = resume(conn, annee)
+        return r, (lire_jours(conn, annee, anomalies_seules) if r else [])
+    finally:
+        conn.close()
+
+
+#==================================
+#   ROUTE /api/rapprochement
+#==================================
+
+@bp.route("/api/rapprochement")
+@require_api_role("admin", "compta")
+def api_rapprochement():
+    annee = annee_demandee()
+    try:
+        r, jours = _lire(annee, request.args.get("anomalies") == "1")
+    except Exception as e:
+        print("❌ ERREUR RAPPROCHEMENT :", e)
+        return jsonify({"error": "Erreur serveur rapprochement"}), 500
+
+    if r is None:
+        return jsonify({
+            "error": "Rapprochement jamais calculé pour cette année",
+            "annee_scolaire": annee,
+        }), 404
+
+    data = {"resume": r, "nb": len(jours), "jours": jours}
+    if format_colonnes():
+        data["champs"], data["jours"] = en_colonnes(jours)
+
+    return jsonify(data)
+
+
+@bp.route("/api/rapprochement", methods=["POST"])
+@require_api_role("admin", "compta")
+def api_rapprochement_calculer():
+    annee = annee_demandee()
+    conn = None
+    try:
+        conn = get_db_connection()
+        return jsonify({"resume": rapprocher(conn, annee)})
+
+    except Exception as e:
+        print("❌ ERREUR CALCUL RAPPROCHEMENT :", e)
+        return jsonify({"error": "Erreur serveur rapprochement"}), 500
+
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+#==================================
+#   PAGE /admin/rapprochement
+#==================================
+
+@bp.route("/admin/rapprochement", methods=["GET", "POST"])
+@require_role("admin", "compta")
+def admin_rapprochement():
+    annee = annee_demandee()
+    tous = request.args.get("tous") == "1"
+
+    if request.method == "POST":
+        conn = get_db_connection()
+        try:
+            rapprocher(conn, annee)
+        finally:
+            conn.close()
+        return redirect(url_for(
+            "rapprochement.admin_rapprochement",
+            annee=annee, **({"tous": "1"} if tous else {})
+        ))
+
+    r, jours = _lire(annee, not tous)
+
+    return render_template(
+        "rapprochement.html",
+        annee=annee,
+        resume=r,
+        jours=jours,
+        tous=tous,
+        anomalies=ANOMALIES,
+    )
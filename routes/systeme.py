@@ -0,0 +1,53 @@
+"""
+routes/systeme.py — DIAGNOSTIC
+
+✔ /api/ping, /test, /db-test
+✔ /admin/sql_stats : empreintes SQL du worker (journal_sql.py)
+"""
+
+from flask import Blueprint, jsonify, request, render_template
+
+import journal_sql
+from commun import require_role, get_conn
+
+bp = Blueprint("systeme", __name__)
+
+
+@bp.route("/test")
+def test():
+    return render_template("test.html")
+
+
+@bp.route("/db-test")
+def db_test():
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM caisse_journaliere")
+            total = cur.fetchone()[0]
+
+    return render_template("db_test.html", total=total)
+
+
+
+@bp.route("/api/ping")
+def ping():
+    return jsonify({"message": "API en ligne"})
+
+
+#===============================================
+#   ROUTE /admin/sql_stats (journal_sql.py)
+#=================================================
+
+@bp.route("/admin/sql_stats")
+@require_role("admin")
+def admin_sql_stats():
+    """
+    Empreintes SQL de ce worker : nombre, temps total / moyen / max,
+    requêtes lentes (plans dans SQL_LENTES_FICHIER).
+    """
+    limite = request.args.get("limite", 50, type=int)
+    return jsonify({
+        "seuil_lente_ms": journal_sql.SEUIL_LENTE_MS,
+        "journal": journal_sql.FICHIER_JOURNAL,
+        "empreintes": journal_sql.statistiques(limite)
+    })
@@ -0,0 +1,407 @@
+"""
+schema_annee.py — PARTITIONNEMENT PAR ANNÉE SCOLAIRE
+
+✔ paiements, depense, caisse_journaliere partitionnées (LIST annee_scolaire)
+✔ 1 partition par année (ex : paiements_2025_2026) + partition DEFAULT
+✔ Routage : annee_scolaire_from_date() (Python) / annee_scolaire_de() (SQL)
+✔ Migration des données existantes (python schema_annee.py migrer)
+✔ Contraintes ON CONFLICT conservées (+ annee_scolaire, clé de partition)
+✔ Index (annee_scolaire, eleve_id) et (annee_scolaire, mois)
+"""
+
+import os
+import re
+import sys
+from datetime import datetime
+
+import psycopg
+from psycopg import sql
+
+from metier import annee_scolaire_from_date
+
+# ======================================================
+# CONFIGURATION
+# ======================================================
+
+# table → colonne date utilisée pour déduire l'année + contraintes uniques
+# (la clé de partition annee_scolaire est ajoutée à chaque contrainte)
+TABLES_PARTITIONNEES = {
+    "paiements": {
+        "date": "datepaiement",
+        "uniques": [("numrecu",)],
+    },
+    "depense": {
+        "date": "date_depense",
+        "uniques": [("ref_dp", "date_depense")],
+    },
+    "caisse_journaliere": {
+        "date": "date_operation",
+        "uniques": [("date_operation",)],
+    },
+}
+
+# Valeur d'année pour les lignes sans année ni date (partition DEFAULT)
+ANNEE_INCONNUE = "inconnue"
+
+FORMAT_ANNEE = re.compile(r"^(\d{4})-(\d{4})$")
+
+# Partitions déjà garanties dans ce processus (évite le DDL répété)
+_partitions_ok = set()
+
+
+def log(msg):
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {msg}")
+
+
+# ======================================================
+# OUTILS
+# ======================================================
+
+def annee_valide(annee):
+    """
+    '2025-2026' → True ; '2025/2026', '2025-2027', None → False
+    """
+    m = FORMAT_ANNEE.match(str(annee or ""))
+    return bool(m) and int(m.group(2)) == int(m.group(1)) + 1
+
+
+def nom_partition(table, annee):
+    return f"{table}_{annee.replace('-', '_')}"
+
+
+def annee_de_ligne(annee, d):
+    """
+    Année scolaire d'une ligne importée : valeur Excel si présente,
+    sinon déduite de la date (règle du 06 septembre).
+    """
+    if annee:
+        return str(annee).strip()
+    if d:
+        return annee_scolaire_from_date(d)
+    return ANNEE_INCONNUE
+
+
+def est_partitionnee(conn, table):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT 1
+            FROM pg_partitioned_table pt
+            JOIN pg_class c ON c.oid = pt.partrelid
+            WHERE c.relname = %s
+              AND c.relnamespace = 'public'::regnamespace
+        """, (table,))
+        return cur.fetchone() is not None
+
+
+# ======================================================
+# ROUTAGE (PARTITIONS À LA DEMANDE)
+# ======================================================
+
+def assurer_partitions(conn, table, annees):
+    """
+    Crée les partitions manquantes pour les années données.
+
+    À appeler AVANT d'insérer des lignes d'une nouvelle année :
+    sinon elles tomberaient dans la partition DEFAULT.
+    Sans effet si la table n'est pas (encore) partitionnée.
+    """
+    a_creer = {
+        a for a in annees
+        if annee_valide(a) and (table, a) not in _partitions_ok
+    }
+    if not a_creer:
+        return
+
+    if not est_partitionnee(conn, table):
+        return
+
+    with conn.cursor() as cur:
+        for annee in sorted(a_creer):
+            cur.execute(
+                "SELECT to_regclass(%s) IS NOT NULL",
+                (nom_partition(table, annee),)
+            )
+            if not cur.fetchone()[0]:
+                _creer_partition(cur, table, annee)
+            _partitions_ok.add((table, annee))
+
+    conn.commit()
+
+
+def _colonnes_inserables(cur, table):
+    """
+    Colonnes de la table, sans les colonnes générées (GENERATED ALWAYS).
+    """
+    cur.execute("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = %s::regclass
+          AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+        ORDER BY attnum
+    """, (table,))
+    return [c for (c,) in cur.fetchall()]
+
+
+def _creer_partition(cur, table, annee):
+    """
+    Crée la partition d'une année. Les lignes de cette année déjà
+    présentes dans la partition DEFAULT y sont déplacées.
+    Sans effet si un autre worker l'a créée entre-temps.
+    """
+    defaut = sql.Identifier(f"{table}_defaut")
+    partition = sql.Identifier(nom_partition(table, annee))
+
+    cur.execute(sql.SQL("LOCK TABLE {} IN ACCESS EXCLUSIVE MODE").format(
+        sql.Identifier(table)
+    ))
+    # Revérifié sous le verrou : 2 workers peuvent voir la partition
+    # absente en même temps (1er paiement d'une nouvelle année)
+    cur.execute(
+        "SELECT to_regclass(%s) IS NOT NULL", (nom_partition(table, annee),)
+    )
+    if cur.fetchone()[0]:
+        return
+    # (CREATE TABLE AS n'accepte pas de paramètre lié → Literal)
+    cur.execute(sql.SQL("""
+        CREATE TEMP TABLE _a_deplacer ON COMMIT DROP AS
+        SELECT * FROM {} WHERE annee_scolaire = {}
+    """).format(defaut, sql.Literal(annee)))
+    # Par la table mère (les lignes sont encore toutes dans DEFAULT) : les
+    # triggers d'instruction (cube_finance, sync_mobile) voient le retrait
+    # comme la réinsertion ci-dessous
+    cur.execute(sql.SQL("DELETE FROM {} WHERE annee_scolaire = %s").format(
+        sql.Identifier(table)
+    ), (annee,))
+
+    cur.execute(sql.SQL(
+        "CREATE TABLE {} PARTITION OF {} FOR VALUES IN ({})"
+    ).format(partition, sql.Identifier(table), sql.Literal(annee)))
+
+    # Colonnes générées (paiements.mois_unique) : recalculées à l'insertion
+    colonnes = sql.SQL(", ").join(
+        sql.Identifier(c) for c in _colonnes_inserables(cur, table)
+    )
+    cur.execute(sql.SQL("INSERT INTO {} ({}) SELECT {} FROM _a_deplacer").format(
+        sql.Identifier(table), colonnes, colonnes
+    ))
+    cur.execute("DROP TABLE _a_deplacer")
+
+    log(f"Partition créée : {nom_partition(table, annee)}")
+
+
+# ======================================================
+# MIGRATION (TABLE CLASSIQUE → TABLE PARTITIONNÉE)
+# ======================================================
+
+def init_fonctions_annee(conn):
+    """
+    Fonction SQL miroir de annee_scolaire_from_date().
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION annee_scolaire_de(d DATE)
+            RETURNS TEXT
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE
+            AS $$
+                SELECT CASE
+                    WHEN EXTRACT(MONTH FROM d) < 9
+                      OR (EXTRACT(MONTH FROM d) = 9 AND EXTRACT(DAY FROM d) < 6)
+                    THEN (EXTRACT(YEAR FROM d)::int - 1) || '-' || EXTRACT(YEAR FROM d)::int
+                    ELSE EXTRACT(YEAR FROM d)::int || '-' || (EXTRACT(YEAR FROM d)::int + 1)
+                END
+            $$;
+        """)
+    conn.commit()
+
+
+def migrer_table(conn, table):
+    """
+    Remplace `table` par une table partitionnée par annee_scolaire.
+
+    - l'ancienne table est conservée sous <table>_avant_partition
+    - les années manquantes sont déduites de la date (annee_scolaire_de)
+    - une seule transaction : tout ou rien
+    """
+    if est_partitionnee(conn, table):
+        log(f"{table} : déjà partitionnée")
+        return
+
+    conf = TABLES_PARTITIONNEES[table]
+    t = sql.Identifier(table)
+    ancienne = sql.Identifier(f"{table}_avant_partition")
+    col_date = sql.Identifier(conf["date"])
+
+    with conn.cursor() as cur:
+
+        cur.execute(sql.SQL("LOCK TABLE {} IN ACCESS EXCLUSIVE MODE").format(t))
+
+        # ---------- 1. Années manquantes ----------
+        cur.execute(sql.SQL("""
+            UPDATE {t}
+            SET annee_scolaire = COALESCE(annee_scolaire_de({d}), %s)
+            WHERE annee_scolaire IS NULL OR btrim(annee_scolaire) = ''
+        """).format(t=t, d=col_date), (ANNEE_INCONNUE,))
+        log(f"{table} : {cur.rowcount} ligne(s) sans année complétée(s)")
+
+        # ---------- 2. Renommage (table, index) + séquence ----------
+        cur.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = 'public' AND table_name = %s
+              AND column_name = 'id'
+        """, (table,))
+        a_id = cur.fetchone() is not None
+
+        sequence = None
+        if a_id:
+            cur.execute(
+                "SELECT pg_get_serial_sequence(%s, 'id')", (table,)
+            )
+            sequence = cur.fetchone()[0]
+
+        cur.execute("""
+            SELECT c.relname
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = %s::regclass
+        """, (table,))
+        for (index,) in cur.fetchall():
+            # Libère les noms (ex : paiements_pkey) pour la nouvelle table
+            cur.execute(sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+                sql.Identifier(index),
+                sql.Identifier(f"{index[:50]}_avant_part")
+            ))
+
+        cur.execute(sql.SQL("ALTER TABLE {} RENAME TO {}").format(t, ancienne))
+
+        # Contraintes FK (recréées sur la nouvelle table)
+        cur.execute("""
+            SELECT pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f'
+        """, (f"{table}_avant_partition",))
+        fks = [r[0] for r in cur.fetchall()]
+
+        # ---------- 3. Table partitionnée ----------
+        cur.execute(sql.SQL("""
+            CREATE TABLE {t} (
+                LIKE {ancienne} INCLUDING DEFAULTS INCLUDING GENERATED
+            ) PARTITION BY LIST (annee_scolaire)
+        """).format(t=t, ancienne=ancienne))
+
+        cur.execute(sql.SQL(
+            "ALTER TABLE {} ALTER COLUMN annee_scolaire SET NOT NULL"
+        ).format(t))
+
+        if a_id:
+            cur.execute(sql.SQL(
+                "ALTER TABLE {} ADD PRIMARY KEY (id, annee_scolaire)"
+            ).format(t))
+
+        for cols in conf["uniques"]:
+            cur.execute(sql.SQL("ALTER TABLE {} ADD UNIQUE ({})").format(
+                t,
+                sql.SQL(", ").join(
+                    sql.Identifier(c) for c in (*cols, "annee_scolaire")
+                )
+            ))
+
+        for fk in fks:
+            cur.execute(sql.SQL("ALTER TABLE {} ADD {}").format(t, sql.SQL(fk)))
+
+        if sequence:
+            cur.execute(sql.SQL("ALTER SEQUENCE {} OWNED BY {}.id").format(
+                sql.SQL(sequence), t
+            ))
+
+        # ---------- 4. Partitions ----------
+        cur.execute(sql.SQL(
+            "CREATE TABLE {} PARTITION OF {} DEFAULT"
+        ).format(sql.Identifier(f"{table}_defaut"), t))
+
+        cur.execute(sql.SQL(
+            "SELECT DISTINCT annee_scolaire FROM {}"
+        ).format(ancienne))
+        annees = sorted(a for (a,) in cur.fetchall() if annee_valide(a))
+
+        for annee in annees:
+            cur.execute(sql.SQL(
+                "CREATE TABLE {} PARTITION OF {} FOR VALUES IN ({})"
+            ).format(
+                sql.Identifier(nom_partition(table, annee)),
+                t,
+                sql.Literal(annee)
+            ))
+
+        # ---------- 5. Copie des données ----------
+        cur.execute(sql.SQL("INSERT INTO {} SELECT * FROM {}").format(
+            t, ancienne
+        ))
+        log(f"{table} : {cur.rowcount} ligne(s) migrée(s), "
+            f"{len(annees)} partition(s) : {', '.join(annees) or '-'}")
+
+    conn.commit()
+
+
+def init_index_annee(conn):
+    """
+    Index composites des calculs FIP limités à une année :
+    - (annee_scolaire, eleve_id) : fiche élève, PDF classe
+    - (annee_scolaire, mois)     : FIP par mois / par section
+    Sur une table partitionnée, l'index est créé sur chaque partition.
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS paiements_annee_eleve_idx
+            ON paiements (annee_scolaire, eleve_id)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS paiements_annee_mois_idx
+            ON paiements (annee_scolaire, mois)
+        """)
+    conn.commit()
+
+
+def migrer(conn):
+    init_fonctions_annee(conn)
+    for table in TABLES_PARTITIONNEES:
+        migrer_table(conn, table)
+    init_index_annee(conn)
+
+
+# ======================================================
+# MAIN
+# ======================================================
+
+USAGE = """Usage :
+  python schema_annee.py migrer               partitionne les 3 tables (+ index)
+  python schema_annee.py index                index par année seulement
+  python schema_annee.py partition <annee>    ex : partition 2026-2027
+"""
+
+if __name__ == "__main__":
+    DATABASE_URL = os.environ.get("DATABASE_URL")
+    if not DATABASE_URL:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+
+    args = sys.argv[1:]
+
+    with psycopg.connect(
+        DATABASE_URL,
+        sslmode="require" if "render.com" in DATABASE_URL else "disable"
+    ) as conn:
+
+        if args == ["migrer"]:
+            migrer(conn)
+            log("✅ MIGRATION TERMINÉE")
+
+        elif args == ["index"]:
+            init_index_annee(conn)
+            log("✅ INDEX PRÊTS")
+
+        elif len(args) == 2 and args[0] == "partition" and annee_valide(args[1]):
+            for table in TABLES_PARTITIONNEES:
+                assurer_partitions(conn, table, [args[1]])
+            log("✅ PARTITIONS PRÊTES")
+
+        else:
+            print(USAGE)
+            sys.exit(1)
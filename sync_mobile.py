@@ -0,0 +1,224 @@
+"""
+sync_mobile.py — SYNCHRONISATION MOBILE PAR DELTA (HORS LIGNE D'ABORD)
+
+✔ Table sync_eleves : 1 ligne par élève, transaction (xid8) de sa
+  dernière modification (élève ou paiements), élèves supprimés inclus
+✔ Tenue à jour par triggers d'instruction (tables de transition) :
+  1 upsert par instruction, même pour un COPY de 100 000 paiements
+✔ Jeton = xmin du snapshot du serveur : une transaction encore en
+  cours au moment de la synchro sera vue à la suivante, jamais perdue
+✔ Pagination par clé (xid, eleve_id) : index seul, pas d'OFFSET
+✔ Lignes compactes (champs une fois, lignes en tableaux) : élève +
+  mois payés + total payé + solde de l'année
+"""
+
+from metier import MOIS_SCOLAIRE
+
+# Champs d'une ligne élève (ordre des tableaux renvoyés)
+CHAMPS = [
+    "matricule", "nom", "classe", "section", "categorie",
+    "fip_mensuel", "total_paye", "solde", "mois_payes",
+]
+
+LIMITE_DEFAUT = 500
+LIMITE_MAX = 2000
+
+
+# ======================================================
+# SCHÉMA
+# ======================================================
+
+def init_sync_mobile(conn):
+    """
+    Table sync_eleves, triggers sur eleves et paiements, remplissage
+    initial (idempotent).
+    """
+    with conn.cursor() as cur:
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS sync_eleves (
+                eleve_id  INTEGER PRIMARY KEY,
+                matricule TEXT NOT NULL,
+                xid       XID8 NOT NULL,
+                supprime  BOOLEAN NOT NULL DEFAULT false
+            );
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS sync_eleves_xid_idx
+            ON sync_eleves (xid, eleve_id)
+        """)
+
+        # ---------- eleves : INSERT / UPDATE / DELETE ----------
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION sync_depuis_eleves()
+            RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    INSERT INTO sync_eleves (eleve_id, matricule, xid, supprime)
+                    SELECT id, matricule, pg_current_xact_id(), true
+                    FROM anciennes
+                    ON CONFLICT (eleve_id) DO UPDATE SET
+                        xid = EXCLUDED.xid, supprime = true;
+                ELSE
+                    INSERT INTO sync_eleves (eleve_id, matricule, xid)
+                    SELECT id, matricule, pg_current_xact_id()
+                    FROM nouvelles
+                    ON CONFLICT (eleve_id) DO UPDATE SET
+                        matricule = EXCLUDED.matricule,
+                        xid = EXCLUDED.xid,
+                        supprime = false;
+                END IF;
+                RETURN NULL;
+            END
+            $$;
+        """)
+
+        # ---------- paiements : le solde des élèves touchés change ----------
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION sync_depuis_paiements()
+            RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO sync_eleves (eleve_id, matricule, xid)
+                    SELECT id, matricule, pg_current_xact_id() FROM eleves
+                    WHERE id IN (SELECT eleve_id FROM nouvelles)
+                    ON CONFLICT (eleve_id) DO UPDATE SET xid = EXCLUDED.xid;
+                ELSIF TG_OP = 'UPDATE' THEN
+                    INSERT INTO sync_eleves (eleve_id, matricule, xid)
+                    SELECT id, matricule, pg_current_xact_id() FROM eleves
+                    WHERE id IN (SELECT eleve_id FROM nouvelles
+                                 UNION SELECT eleve_id FROM anciennes)
+                    ON CONFLICT (eleve_id) DO UPDATE SET xid = EXCLUDED.xid;
+                ELSE
+                    INSERT INTO sync_eleves (eleve_id, matricule, xid)
+                    SELECT id, matricule, pg_current_xact_id() FROM eleves
+                    WHERE id IN (SELECT eleve_id FROM anciennes)
+                    ON CONFLICT (eleve_id) DO UPDATE SET xid = EXCLUDED.xid;
+                END IF;
+                RETURN NULL;
+            END
+            $$;
+        """)
+
+        for table, fonction in (
+            ("eleves", "sync_depuis_eleves"),
+            ("paiements", "sync_depuis_paiements"),
+        ):
+            for evenement, transition in (
+                ("INSERT", "NEW TABLE AS nouvelles"),
+                ("UPDATE", "OLD TABLE AS anciennes NEW TABLE AS nouvelles"),
+                ("DELETE", "OLD TABLE AS anciennes"),
+            ):
+                nom = f"{table}_sync_{evenement.lower()}"
+                cur.execute(f"DROP TRIGGER IF EXISTS {nom} ON {table}")
+                cur.execute(f"""
+                    CREATE TRIGGER {nom}
+                    AFTER {evenement} ON {table}
+                    REFERENCING {transition}
+                    FOR EACH STATEMENT
+                    EXECUTE FUNCTION {fonction}()
+                """)
+
+        # ---------- remplissage initial ----------
+        cur.execute("""
+            INSERT INTO sync_eleves (eleve_id, matricule, xid)
+            SELECT id, matricule, pg_current_xact_id()
+            FROM eleves
+            ON CONFLICT (eleve_id) DO NOTHING
+        """)
+
+    conn.commit()
+
+
+# ======================================================
+# LECTURE DES CHANGEMENTS
+# ======================================================
+
+def borne_superieure(conn):
+    """
+    xmin du snapshot courant : toutes les transactions de xid inférieur
+    sont terminées (validées ou annulées).
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text")
+        return int(cur.fetchone()[0])
+
+
+def lire_changements(conn, annee, depuis, jusqua, apres=(0, 0),
+                     limite=LIMITE_DEFAUT):
+    """
+    Élèves modifiés dans [depuis, jusqua[ après le curseur `apres`
+    (xid, eleve_id), au plus `limite`.
+
+    Retourne (lignes, supprimes, curseur) : lignes au format CHAMPS,
+    matricules supprimés, curseur de la page suivante (None si fini).
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT s.xid::text, s.eleve_id, s.supprime, s.matricule,
+                   e.nom, e.classe, e.section, e.categorie,
+                   COALESCE(t.fip_mensuel, 0),
+                   COALESCE(p.total, 0),
+                   COALESCE(p.mois, '{}')
+            FROM sync_eleves s
+            LEFT JOIN eleves e ON e.id = s.eleve_id
+            LEFT JOIN tarif_fip t
+              ON t.annee_scolaire = %(annee)s
+             AND t.classe = classe_canonique(e.classe)
+            LEFT JOIN LATERAL (
+                SELECT SUM(m.montant) AS total,
+                       -- « Ac.Sept » : mois payé en partie (< FIP mensuel)
+                       array_agg(
+                           CASE WHEN m.montant >= COALESCE(t.fip_mensuel, 0)
+                                THEN m.mois ELSE 'Ac.' || m.mois END
+                           ORDER BY array_position(%(ordre)s, m.mois)
+                       ) FILTER (WHERE m.montant <> 0) AS mois
+                FROM (
+                    SELECT mois_canonique(mois) AS mois, SUM(fip) AS montant
+                    FROM paiements
+                    WHERE annee_scolaire = %(annee)s
+                      AND eleve_id = s.eleve_id
+                      AND mois_canonique(mois) IS NOT NULL
+                    GROUP BY 1
+                ) m
+            ) p ON NOT s.supprime
+            WHERE s.xid >= %(depuis)s::xid8
+              AND s.xid <  %(jusqua)s::xid8
+              AND (s.xid, s.eleve_id) > (%(apres_xid)s::xid8, %(apres_id)s)
+            ORDER BY s.xid, s.eleve_id
+            LIMIT %(limite)s
+        """, {
+            "annee": annee,
+            "ordre": MOIS_SCOLAIRE,
+            "depuis": str(depuis),
+            "jusqua": str(jusqua),
+            "apres_xid": str(apres[0]),
+            "apres_id": apres[1],
+            "limite": limite + 1,
+        })
+        rangees = cur.fetchall()
+
+    suite = len(rangees) > limite
+    rangees = rangees[:limite]
+
+    lignes, supprimes = [], []
+    for (xid, eleve_id, supprime, matricule, nom, classe, section,
+         categorie, fip_mensuel, total, mois) in rangees:
+        if supprime or nom is None:
+            supprimes.append(matricule)
+            continue
+        fip_mensuel, total = float(fip_mensuel), float(total)
+        # Même calcul que calcul_fip_eleve (/api/mobile/eleve), « Ac. » compris
+        lignes.append([
+            matricule, nom, classe, section, categorie,
+            fip_mensuel, round(total, 2),
+            round(fip_mensuel * len(MOIS_SCOLAIRE) - total, 2),
+            list(mois),
+        ])
+
+    curseur = (int(rangees[-1][0]), rangees[-1][1]) if suite else None
+    return lignes, supprimes, curseur
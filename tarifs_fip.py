@@ -0,0 +1,253 @@
+"""
+tarifs_fip.py — TARIFS FIP / FF PAR CLASSE ET PAR ANNÉE SCOLAIRE
+
+✔ Table tarif_fip (annee_scolaire, classe → FIP mensuel, FF mensuel)
+✔ FF (frais de fonctionnement) : 0 par défaut, fixé classe par classe
+✔ Fonction SQL classe_canonique() (miroir de canonical_classe)
+✔ Jointure directe eleves ⨝ tarif_fip (SUM côté PostgreSQL)
+✔ Chargement en dict (une requête par année, lecture seule : année
+  sans tarif → {})
+✔ Nouvelle année initialisée par la migration 11 ou la CLI
+  (initialiser / fixer), jamais par une lecture
+✔ Tarifs modifiables par année sans redéploiement (CLI)
+"""
+
+import os
+import sys
+from decimal import Decimal
+
+import psycopg
+
+from data_version import bump_version
+
+# ======================================================
+# TARIFS PAR DÉFAUT (ANCIENNES RÈGLES CODÉES EN DUR)
+# ======================================================
+
+_GROUPES_DEFAUT = {
+    40: ["1M", "2M", "3M", "1P", "2P", "3P", "4P", "5P", "6P"],
+    45: [
+        "7EB", "8EB",
+        "1HP", "1LIT", "1SC",
+        "2HP", "2LIT", "2SC",
+        "3HP", "3LIT", "3SC"
+    ],
+    55: [
+        "1CG", "1MG", "1TCC", "1EL", "1ELCTRO", "1CONS",
+        "2CG", "2MG", "2TCC", "2EL",
+        "3CG", "3MG", "3TCC", "3EL"
+    ],
+    80: ["4CG", "4MG", "4TCC", "4EL", "4HP", "4SC", "4LIT"],
+}
+
+TARIFS_FIP_DEFAUT = {
+    classe: montant
+    for montant, classes in _GROUPES_DEFAUT.items()
+    for classe in classes
+}
+
+# Frais → colonne de tarif_fip
+FRAIS = {"fip": "fip_mensuel", "ff": "ff_mensuel"}
+
+
+# ======================================================
+# SCHÉMA
+# ======================================================
+
+def init_tarifs_fip(conn):
+    """
+    Crée la table tarif_fip (FIP et FF) et la fonction SQL
+    classe_canonique().
+    """
+    with conn.cursor() as cur:
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS tarif_fip (
+                annee_scolaire TEXT NOT NULL,
+                classe         VARCHAR(20) NOT NULL,
+                fip_mensuel    NUMERIC(10,2) NOT NULL,
+                ff_mensuel     NUMERIC(10,2) NOT NULL DEFAULT 0,
+                PRIMARY KEY (annee_scolaire, classe)
+            );
+        """)
+        # Bases créées avant le suivi des FF (migration 8)
+        cur.execute("""
+            ALTER TABLE tarif_fip
+            ADD COLUMN IF NOT EXISTS ff_mensuel NUMERIC(10,2) NOT NULL DEFAULT 0
+        """)
+
+        # Même règle que canonical_classe() (sans liste blanche :
+        # la jointure avec tarif_fip joue ce rôle)
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION classe_canonique(raw TEXT)
+            RETURNS TEXT
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE
+            AS $$
+                SELECT m[1] || CASE m[2]
+                    WHEN 'ELECTRO'      THEN 'ELCTRO'
+                    WHEN 'SCIENCE'      THEN 'SC'
+                    WHEN 'LITTERATURE'  THEN 'LIT'
+                    WHEN 'LITT'         THEN 'LIT'
+                    WHEN 'CONSTRUCTION' THEN 'CONS'
+                    ELSE m[2]
+                END
+                FROM (
+                    SELECT regexp_match(
+                        regexp_replace(UPPER(raw), '[^A-Z0-9]', '', 'g'),
+                        '^([0-9]+)([A-Z]+)$'
+                    ) AS m
+                ) t
+            $$;
+        """)
+
+    conn.commit()
+
+
+def initialiser_annee(conn, annee):
+    """
+    Copie les tarifs de l'année précédente (ou les tarifs par défaut)
+    si l'année n'a encore aucun tarif. Ne touche pas une année existante.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT 1 FROM tarif_fip WHERE annee_scolaire = %s LIMIT 1",
+            (annee,)
+        )
+        if cur.fetchone():
+            return False
+
+        cur.execute("""
+            SELECT classe, fip_mensuel, ff_mensuel
+            FROM tarif_fip
+            WHERE annee_scolaire = (
+                SELECT MAX(annee_scolaire)
+                FROM tarif_fip
+                WHERE annee_scolaire < %s
+            )
+        """, (annee,))
+        tarifs = cur.fetchall() or [
+            (c, m, 0) for c, m in TARIFS_FIP_DEFAUT.items()
+        ]
+
+        cur.executemany("""
+            INSERT INTO tarif_fip (annee_scolaire, classe, fip_mensuel, ff_mensuel)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (annee_scolaire, classe) DO NOTHING
+        """, [(annee, c, fip, ff) for c, fip, ff in tarifs])
+
+        bump_version(conn, "tarif_fip")
+
+    conn.commit()
+    return True
+
+
+# ======================================================
+# LECTURE
+# ======================================================
+
+def _montant(v):
+    """
+    NUMERIC → int si entier (40), sinon float (42.5).
+    """
+    v = Decimal(v)
+    return int(v) if v == v.to_integral_value() else float(v)
+
+
+def charger_tarifs(conn, annee, frais="fip"):
+    """
+    Retourne {classe canonique: montant mensuel} pour l'année scolaire
+    (frais : "fip" ou "ff").
+    Année sans tarif : {} (comme les jointures SQL sur tarif_fip).
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT classe, {FRAIS[frais]}
+            FROM tarif_fip
+            WHERE annee_scolaire = %s
+        """, (annee,))
+        rows = cur.fetchall()
+    conn.commit()
+
+    return {classe: _montant(m) for classe, m in rows}
+
+
+def fixer_tarif(conn, annee, classe, montant, frais="fip"):
+    """
+    Crée ou modifie le tarif d'une classe pour une année
+    (frais : "fip" ou "ff" ; une classe nouvelle a 0 pour l'autre).
+    """
+    initialiser_annee(conn, annee)
+
+    colonne = FRAIS[frais]
+    fip, ff = (montant, 0) if frais == "fip" else (0, montant)
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            INSERT INTO tarif_fip (annee_scolaire, classe, fip_mensuel, ff_mensuel)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (annee_scolaire, classe) DO UPDATE SET
+                {colonne} = EXCLUDED.{colonne}
+        """, (annee, classe, fip, ff))
+
+        bump_version(conn, "tarif_fip")
+
+    conn.commit()
+
+
+# ======================================================
+# MAIN (administration des tarifs)
+# ======================================================
+
+USAGE = """Usage :
+  python tarifs_fip.py liste <annee>                    ex : liste 2025-2026
+  python tarifs_fip.py initialiser <annee>              ex : initialiser 2027-2028
+  python tarifs_fip.py fixer <annee> <classe> <fip>     ex : fixer 2026-2027 4CG 85
+  python tarifs_fip.py fixer-ff <annee> <classe> <ff>   ex : fixer-ff 2026-2027 4CG 10
+"""
+
+if __name__ == "__main__":
+    DATABASE_URL = os.environ.get("DATABASE_URL")
+    if not DATABASE_URL:
+        raise RuntimeError("❌ DATABASE_URL non définie")
+
+    # Import local : commun importe ce module
+    from commun import canonical_classe
+    from schema_annee import annee_valide
+
+    args = sys.argv[1:]
+    if len(args) >= 2 and not annee_valide(args[1]):
+        print(f"❌ Année invalide : {args[1]} (format AAAA-AAAA)")
+        sys.exit(1)
+
+    classe = canonical_classe(args[2]) if len(args) == 4 else None
+    if len(args) == 4 and classe is None:
+        print(f"❌ Classe inconnue : {args[2]}")
+        sys.exit(1)
+
+    with psycopg.connect(
+        DATABASE_URL,
+        sslmode="require" if "render.com" in DATABASE_URL else "disable"
+    ) as conn:
+
+        if len(args) == 2 and args[0] == "liste":
+            ff = charger_tarifs(conn, args[1], "ff")
+            print(f"{'CLASSE':<10} {'FIP':>8} {'FF':>8}")
+            tarifs = charger_tarifs(conn, args[1])
+            for c, montant in sorted(tarifs.items()):
+                print(f"{c:<10} {montant:>8} {ff.get(c, 0):>8}")
+            if not tarifs:
+                print(f"(aucun tarif : python tarifs_fip.py initialiser {args[1]})")
+
+        elif len(args) == 2 and args[0] == "initialiser":
+            if initialiser_annee(conn, args[1]):
+                print(f"✅ Tarifs {args[1]} initialisés")
+            else:
+                print(f"ℹ️ Tarifs {args[1]} déjà présents (inchangés)")
+
+        elif len(args) == 4 and args[0] in ("fixer", "fixer-ff"):
+            frais = "ff" if args[0] == "fixer-ff" else "fip"
+            fixer_tarif(conn, args[1], classe, Decimal(args[3]), frais)
+            print(f"✅ {frais.upper()} {classe} = {args[3]} pour {args[1]}")
+
+        else:
+            print(USAGE)
+            sys.exit(1)